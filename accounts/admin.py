@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.utils import timezone
 from django.utils.html import format_html
-from .models import User, OTP
+from .models import User, OTP, EmailOutbox
 
 
 @admin.register(User)
@@ -142,4 +143,25 @@ class OTPAdmin(admin.ModelAdmin):
                 otp.delete()
                 count += 1
         self.message_user(request, f'{count} expired OTP(s) deleted.')
-    delete_expired_otps.short_description = "Delete expired OTPs"
\ No newline at end of file
+    delete_expired_otps.short_description = "Delete expired OTPs"
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    """Admin for queued outgoing email"""
+
+    list_display = ('to_email', 'subject', 'category', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'category')
+    search_fields = ('to_email', 'subject')
+    ordering = ('-created_at',)
+    readonly_fields = ('created_at', 'sent_at', 'attempts', 'last_error')
+
+    actions = ['retry_now']
+
+    def retry_now(self, request, queryset):
+        """Queue selected messages for immediate redelivery"""
+        updated = queryset.exclude(status='sent').update(
+            status='pending', attempts=0, next_attempt_at=timezone.now()
+        )
+        self.message_user(request, f'{updated} email(s) queued for retry.')
+    retry_now.short_description = "Retry selected emails now"
@@ -1,6 +1,63 @@
+import copy
+import logging
+import threading
+
+from cachetools import TTLCache
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework.exceptions import AuthenticationFailed
 from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------
+# PER-PROCESS USER CACHE
+# ---------------------------------------------------------
+# user_id -> ((token user-version, User.auth_version), User). The User signals
+# (accounts/signals.py) bump User.auth_version on role/active/password changes
+# and publish it under auth_user_version:<id> in the default cache; a cached
+# user is served only while that shared version still matches, so every
+# worker sees the change on its next request. Needs a shared cache
+# (REDIS_URL): with the per-process default, other workers only catch up
+# after AUTH_USER_CACHE_TTL seconds.
+
+AUTH_USER_CACHE_SIZE = getattr(settings, "AUTH_USER_CACHE_SIZE", 1024)
+AUTH_USER_CACHE_TTL = getattr(settings, "AUTH_USER_CACHE_TTL", 60)
+AUTH_USER_VERSION_TTL = 24 * 60 * 60
+
+_user_cache = TTLCache(maxsize=max(AUTH_USER_CACHE_SIZE, 1), ttl=AUTH_USER_CACHE_TTL)
+_user_cache_lock = threading.Lock()
+
+
+def token_user_version(validated_token):
+    """simplejwt's revoke claim (password-hash digest) when CHECK_REVOKE_TOKEN is on, else None"""
+    if api_settings.CHECK_REVOKE_TOKEN:
+        return validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+    return None
+
+
+def user_version_key(user_id):
+    return f"auth_user_version:{user_id}"
+
+
+def publish_user_version(user_id, version):
+    """Make every worker's cached copy of this user stale (None: user deleted)"""
+    if version is None:
+        cache.delete(user_version_key(user_id))
+    else:
+        cache.set(user_version_key(user_id), version, AUTH_USER_VERSION_TTL)
+
+
+def invalidate_cached_user(user_id):
+    with _user_cache_lock:
+        _user_cache.pop(str(user_id), None)
+
+
+def clear_user_cache():
+    with _user_cache_lock:
+        _user_cache.clear()
 
 
 class CookieJWTAuthentication(JWTAuthentication):
@@ -8,37 +65,79 @@ class CookieJWTAuthentication(JWTAuthentication):
     Custom JWT authentication that reads tokens from HTTP-only cookies
     Falls back to Authorization header if cookies not present
     """
-    
+
     def authenticate(self, request):
         # Try to get token from cookie first
         access_token = request.COOKIES.get('access')
-        
+
         # Fallback to Authorization header
         if not access_token:
             header = self.get_header(request)
             if header is None:
                 return None
-            
+
             raw_token = self.get_raw_token(header)
             if raw_token is None:
                 return None
         else:
             raw_token = access_token
-        
+
         # Validate the token
         try:
-            validated_token = self.get_validated_token(raw_token)
+            # already decoded by TokenRefreshMiddleware
+            stashed = getattr(request, "validated_access_token", None)
+            if stashed is not None and stashed[0] == raw_token:
+                validated_token = stashed[1]
+            else:
+                validated_token = self.get_validated_token(raw_token)
             user = self.get_user(validated_token)
-            
-            # Debug logging
-            print(f"✅ Authenticated user: {user.email}")
-            
+
+            logger.debug("Authenticated user %s", user.pk)
+
             return (user, validated_token)
-            
+
         except AuthenticationFailed as e:
-            print(f"❌ Authentication failed: {str(e)}")
+            logger.debug("Authentication failed: %s", e)
             # Don't raise - return None to allow AllowAny views
             return None
-        except Exception as e:
-            print(f"❌ Unexpected auth error: {str(e)}")
-            return None
\ No newline at end of file
+        except Exception:
+            logger.warning("Unexpected auth error", exc_info=True)
+            return None
+
+    def get_user(self, validated_token):
+        """
+        User for the token, from the per-process cache when the cached row was
+        loaded for the same (user_id, token user-version) and its auth_version is
+        still the shared one. Each request gets its own copy so views can't
+        mutate the shared instance.
+        """
+        if AUTH_USER_CACHE_SIZE <= 0:
+            return super().get_user(validated_token)
+
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)  # raises InvalidToken
+
+        try:
+            shared_version = cache.get(user_version_key(user_id))
+        except Exception:
+            logger.warning("Shared cache unavailable; loading user %s", user_id, exc_info=True)
+            return super().get_user(validated_token)
+
+        key = str(user_id)
+        if shared_version is not None:
+            version = (token_user_version(validated_token), shared_version)
+            with _user_cache_lock:
+                entry = _user_cache.get(key)
+            if entry is not None and entry[0] == version:
+                return copy.copy(entry[1])
+
+        # inactive users, unknown ids and revoked tokens raise here and are never cached
+        user = super().get_user(validated_token)
+        if shared_version is None:
+            # add, not set: never overwrite a newer version published meanwhile
+            cache.add(user_version_key(user_id), user.auth_version, AUTH_USER_VERSION_TTL)
+        version = (token_user_version(validated_token), user.auth_version)
+        with _user_cache_lock:
+            _user_cache[key] = (version, user)
+        return copy.copy(user)
@@ -0,0 +1,73 @@
+# accounts/cookies.py
+"""
+JWT auth cookies: one place for the cookie options shared by the login views,
+RefreshTokenView, LogoutView and TokenRefreshMiddleware.
+"""
+
+from django.conf import settings
+
+ACCESS_COOKIE_MAX_AGE = 3600  # 1 hour
+REFRESH_COOKIE_MAX_AGE = 1209600  # 14 days (Safari works better with longer expiry)
+
+
+def cookie_options():
+    """Path/domain/samesite/secure for the auth cookies (Safari-compatible)"""
+    options = {
+        "secure": not settings.DEBUG,  # True in production (HTTPS required)
+        "samesite": "None" if not settings.DEBUG else "Lax",  # None for cross-site
+        "path": "/",
+    }
+    # Add domain only if configured (critical for subdomains, e.g. .tconnects.in)
+    cookie_domain = getattr(settings, "COOKIE_DOMAIN", None)
+    if cookie_domain:
+        options["domain"] = cookie_domain
+    return options
+
+
+def add_cors_headers(response, request):
+    # CRITICAL for Safari - explicit CORS headers
+    origin = request.headers.get('Origin', settings.FRONTEND_URL)
+    response['Access-Control-Allow-Origin'] = origin
+    response['Access-Control-Allow-Credentials'] = 'true'
+
+
+def set_auth_cookies(response, tokens, request=None):
+    """
+    Set JWT tokens as HTTP-only cookies. `tokens` has "access" and, unless the
+    refresh token is unchanged, "refresh".
+    """
+    options = cookie_options()
+
+    response.set_cookie(
+        key="access",
+        value=str(tokens["access"]),
+        max_age=ACCESS_COOKIE_MAX_AGE,
+        httponly=True,
+        **options
+    )
+    if tokens.get("refresh") is not None:
+        response.set_cookie(
+            key="refresh",
+            value=str(tokens["refresh"]),
+            max_age=REFRESH_COOKIE_MAX_AGE,
+            httponly=True,
+            **options
+        )
+
+    if request:
+        add_cors_headers(response, request)
+    return response
+
+
+def clear_auth_cookies(response, request=None):
+    """Clear the auth cookies; path/domain/samesite must match set_auth_cookies"""
+    options = cookie_options()
+    # delete_cookie() derives `secure` itself (from the samesite=None / __Secure- rules)
+    options.pop("secure")
+
+    response.delete_cookie("access", **options)
+    response.delete_cookie("refresh", **options)
+
+    if request:
+        add_cors_headers(response, request)
+    return response
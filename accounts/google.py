@@ -0,0 +1,185 @@
+# accounts/google.py
+"""
+Google ID-token verification with cached signing certificates.
+
+One module-level GoogleTokenVerifier keeps a pooled requests.Session and the
+PEM certificates from GOOGLE_CERTS_URL, cached until the response's
+Cache-Control max-age (less Age) runs out. Within GOOGLE_CERTS_REFRESH_MARGIN
+seconds of expiry a background thread refetches them while requests keep using
+the cached set; only a cold or fully expired cache fetches on the request
+thread (one fetch at a time). A token signed with an unknown key id triggers
+one forced refetch, rate-limited, to pick up Google's key rotation.
+"""
+
+import logging
+import re
+import threading
+import time
+
+import requests
+from django.conf import settings
+from google.auth import exceptions as google_exceptions
+from google.auth import jwt
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+DEFAULT_MAX_AGE = 60 * 60
+FORCED_REFRESH_MIN_INTERVAL = 30
+FETCH_TIMEOUT = 5
+
+
+class GoogleTokenError(ValueError):
+    pass
+
+
+def cache_lifetime(headers):
+    """Seconds the certs may be cached for, from Cache-Control max-age minus Age"""
+    match = MAX_AGE_RE.search(headers.get("Cache-Control", ""))
+    max_age = int(match.group(1)) if match else DEFAULT_MAX_AGE
+    try:
+        age = int(headers.get("Age", 0))
+    except ValueError:
+        age = 0
+    return max(max_age - age, 0)
+
+
+class GoogleTokenVerifier:
+
+    def __init__(self, certs_url=GOOGLE_CERTS_URL, refresh_margin=300, session=None):
+        self.certs_url = certs_url
+        self.refresh_margin = refresh_margin
+        self.session = session or self._new_session()
+
+        self._certs = None
+        self._expires_at = 0.0
+        self._last_forced = float("-inf")
+        self._fetch_lock = threading.Lock()
+        self._refreshing = False
+
+    @staticmethod
+    def _new_session():
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=10, max_retries=2)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    # ---------------------------------------------------------
+    # CERTIFICATES
+    # ---------------------------------------------------------
+
+    def _fetch(self):
+        """Download the certs; any network, HTTP or payload failure raises GoogleTokenError"""
+        try:
+            response = self.session.get(self.certs_url, timeout=FETCH_TIMEOUT)
+            response.raise_for_status()
+            certs = response.json()
+        except (requests.RequestException, ValueError) as exc:
+            raise GoogleTokenError("Could not fetch Google signing keys") from exc
+        self._certs = certs
+        self._expires_at = time.monotonic() + cache_lifetime(response.headers)
+        return certs
+
+    def _refresh_in_background(self):
+        try:
+            with self._fetch_lock:
+                self._fetch()
+        except Exception:
+            logger.warning("Background refresh of Google certs failed", exc_info=True)
+        finally:
+            self._refreshing = False
+
+    def certs(self):
+        now = time.monotonic()
+        certs = self._certs
+        if certs is not None and now < self._expires_at:
+            if self._expires_at - now <= self.refresh_margin and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._refresh_in_background, daemon=True).start()
+            return certs
+
+        with self._fetch_lock:
+            # another thread may have fetched while we waited
+            if self._certs is not None and time.monotonic() < self._expires_at:
+                return self._certs
+            try:
+                return self._fetch()
+            except GoogleTokenError:
+                if self._certs is None:
+                    raise
+                logger.warning("Google certs refetch failed; using expired copy", exc_info=True)
+                return self._certs
+
+    def force_refresh(self):
+        """
+        Refetch now (for an unknown key id); at most once per FORCED_REFRESH_MIN_INTERVAL.
+        On failure the cached certs stay in use and False is returned.
+        """
+        with self._fetch_lock:
+            now = time.monotonic()
+            if now - self._last_forced < FORCED_REFRESH_MIN_INTERVAL:
+                return False
+            self._last_forced = now
+            try:
+                self._fetch()
+            except GoogleTokenError:
+                logger.warning("Forced refetch of Google certs failed; keeping cached copy", exc_info=True)
+                return False
+            return True
+
+    # ---------------------------------------------------------
+    # VERIFICATION
+    # ---------------------------------------------------------
+
+    def verify(self, token, audience):
+        """Decoded claims of a Google-issued ID token, or GoogleTokenError"""
+        try:
+            header = jwt.decode_header(token)
+        except (ValueError, TypeError) as exc:
+            raise GoogleTokenError(f"Malformed token: {exc}")
+
+        certs = self.certs()
+        if header.get("kid") not in certs and self.force_refresh():
+            certs = self._certs
+
+        try:
+            claims = jwt.decode(token, certs=certs, audience=audience)
+        except (ValueError, google_exceptions.GoogleAuthError) as exc:
+            raise GoogleTokenError(str(exc))
+
+        if claims.get("iss") not in GOOGLE_ISSUERS:
+            raise GoogleTokenError(f"Wrong issuer: {claims.get('iss')}")
+        return claims
+
+
+_verifier = None
+_verifier_lock = threading.Lock()
+
+
+def get_verifier():
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                _verifier = GoogleTokenVerifier(
+                    certs_url=getattr(settings, "GOOGLE_CERTS_URL", GOOGLE_CERTS_URL),
+                    refresh_margin=getattr(settings, "GOOGLE_CERTS_REFRESH_MARGIN", 300),
+                )
+    return _verifier
+
+
+def google_client_id():
+    client_id = getattr(settings, "GOOGLE_CLIENT_ID", "")
+    if not client_id:
+        providers = getattr(settings, "SOCIALACCOUNT_PROVIDERS", {})
+        client_id = providers.get("google", {}).get("APP", {}).get("client_id", "")
+    return client_id
+
+
+def verify_google_id_token(token):
+    return get_verifier().verify(token, google_client_id())
@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.authentication import CookieJWTAuthentication, clear_user_cache
+from accounts.models import User
+
+
+class WhoAmIView(APIView):
+    authentication_classes = [CookieJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response({"id": request.user.pk})
+
+
+class Command(BaseCommand):
+    help = "Measure authenticated request throughput with and without the per-process user cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        count = options["requests"]
+
+        # throwaway user; everything is rolled back at the end
+        with transaction.atomic():
+            user = User.objects.create_user(email="benchmark-auth@example.invalid", full_name="Benchmark")
+            access = str(RefreshToken.for_user(user).access_token)
+
+            factory = RequestFactory()
+            view = WhoAmIView.as_view()
+
+            def run(cold):
+                clear_user_cache()
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    for _ in range(count):
+                        if cold:
+                            clear_user_cache()
+                        request = factory.get("/whoami/")
+                        request.COOKIES["access"] = access
+                        response = view(request)
+                        assert response.status_code == 200, response.status_code
+                    elapsed = time.perf_counter() - started
+                return count / elapsed, len(queries) / count
+
+            for label, cold in (("uncached", True), ("cached", False)):
+                rate, per_request = run(cold)
+                self.stdout.write(f"{label:>9}: {rate:8.0f} req/s, {per_request:.2f} queries/request")
+
+            transaction.set_rollback(True)
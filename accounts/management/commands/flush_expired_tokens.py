@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.tokens import flush_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete expired outstanding and blacklisted refresh tokens in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep running and flush periodically.")
+        parser.add_argument("--interval", type=float, default=3600.0, help="Seconds between flushes with --loop.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = flush_expired_tokens(batch_size=options["batch_size"])
+            if deleted:
+                self.stdout.write(f"Deleted {deleted} expired token(s).")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
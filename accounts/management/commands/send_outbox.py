@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    help = "Deliver queued EmailOutbox messages over a reused mail connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep running and poll for new messages.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds between polls with --loop.")
+        parser.add_argument("--batch-size", type=int, default=50)
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = deliver_pending(batch_size=options["batch_size"])
+            if sent or failed:
+                self.stdout.write(f"Sent {sent} email(s), {failed} failed.")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
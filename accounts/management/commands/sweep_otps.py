@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.utils import sweep_otps
+
+
+class Command(BaseCommand):
+    help = "Delete used and expired OTP codes in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep running and sweep periodically.")
+        parser.add_argument("--interval", type=float, default=300.0, help="Seconds between sweeps with --loop.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = sweep_otps(batch_size=options["batch_size"])
+            if deleted:
+                self.stdout.write(f"Deleted {deleted} OTP(s).")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
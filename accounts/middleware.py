@@ -0,0 +1,79 @@
+# accounts/middleware.py
+"""
+Transparent access-token refresh.
+
+When an /api/ request carries a `refresh` cookie but its `access` cookie is
+missing or no longer valid, TokenRefreshMiddleware rotates the refresh token
+up front, lets the request authenticate with the new access token and sets
+the new cookies on the response. The client no longer needs the
+401 -> /api/auth/refresh/ -> retry round trips.
+
+A still-valid access token is decoded here once and handed to
+CookieJWTAuthentication, so the middleware adds no extra decode.
+
+Browsers fire several requests at once after the access token expires; all
+of them carry the same refresh token, which can only be rotated once under
+BLACKLIST_AFTER_ROTATION. tokens.refresh_with_grace lets exactly one of them
+rotate and hands the new pair to the rest; see accounts/tokens.py for the
+grace window and why it needs a shared cache (Redis) across workers.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .authentication import CookieJWTAuthentication
+from .cookies import set_auth_cookies
+from .tokens import refresh_with_grace
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXEMPT_PATHS = ("/api/auth/refresh/", "/api/auth/logout/")
+
+
+class TokenRefreshMiddleware:
+
+    def __init__(self, get_response):
+        if not getattr(settings, "AUTH_COOKIE_AUTO_REFRESH", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefixes = tuple(getattr(settings, "AUTH_COOKIE_REFRESH_PATHS", ("/api/",)))
+        self.exempt = frozenset(getattr(settings, "AUTH_COOKIE_REFRESH_EXEMPT_PATHS", DEFAULT_EXEMPT_PATHS))
+        self.authenticator = CookieJWTAuthentication()
+
+    def __call__(self, request):
+        tokens = self.process(request)
+        response = self.get_response(request)
+        # login/logout views set (or clear) the cookies themselves
+        if tokens and "access" not in response.cookies:
+            set_auth_cookies(response, tokens)
+        return response
+
+    def process(self, request):
+        """New tokens when the request had to be reauthenticated, else None"""
+        raw_refresh = request.COOKIES.get("refresh")
+        path = request.path_info
+        if not raw_refresh or not path.startswith(self.prefixes) or path in self.exempt:
+            return None
+
+        raw_access = request.COOKIES.get("access")
+        if raw_access:
+            try:
+                request.validated_access_token = (raw_access, self.authenticator.get_validated_token(raw_access))
+                return None
+            except InvalidToken:
+                pass  # expired (or otherwise unusable): fall through to the refresh
+
+        tokens = self.refresh(raw_refresh)
+        if tokens:
+            request.COOKIES["access"] = tokens["access"]
+        return tokens
+
+    def refresh(self, raw_refresh):
+        try:
+            return refresh_with_grace(raw_refresh)
+        except TokenError as e:
+            logger.debug("Transparent refresh skipped: %s", e)
+            return None
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='otp',
+            index=models.Index(fields=['email', 'code', 'is_used', '-created_at'], name='otp_verify_lookup'),
+        ),
+        migrations.AddIndex(
+            model_name='otp',
+            index=models.Index(fields=['created_at'], name='otp_created_at'),
+        ),
+    ]
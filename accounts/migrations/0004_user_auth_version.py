@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_otp_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='auth_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -34,6 +34,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_staff = models.BooleanField(default=False)
     is_verified = models.BooleanField(default=False)  # email verified/OTP
     date_joined = models.DateTimeField(default=timezone.now)
+    # Bumped by accounts.signals on every save except last_login; stales cached auth users
+    auth_version = models.PositiveIntegerField(default=0, editable=False)
 
     objects = UserManager()
 
@@ -43,6 +45,9 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.email
     
+OTP_VALIDITY_SECONDS = 600
+
+
 class OTP(models.Model):
     email = models.EmailField()
     code = models.CharField(max_length=6)
@@ -51,6 +56,12 @@ class OTP(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # VerifyOTPView: filter(email, code, is_used=False).latest('created_at')
+            models.Index(fields=['email', 'code', 'is_used', '-created_at'], name='otp_verify_lookup'),
+            # sweep_otps: expired rows
+            models.Index(fields=['created_at'], name='otp_created_at'),
+        ]
 
     def __str__(self):
         return f"{self.email} - {self.code}"
@@ -58,5 +69,40 @@ class OTP(models.Model):
     @property
     def is_expired(self):
         """OTP expires after 10 minutes"""
-        return (timezone.now() - self.created_at).total_seconds() > 600
+        return (timezone.now() - self.created_at).total_seconds() > OTP_VALIDITY_SECONDS
+
+
+
+class EmailOutbox(models.Model):
+    """
+    Outgoing email, written in the request's transaction and delivered after
+    commit or by `manage.py send_outbox` (see accounts/outbox.py)
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    category = models.CharField(max_length=50, blank=True)  # e.g. "otp"
+    to_email = models.EmailField()
+    from_email = models.CharField(max_length=254, blank=True)  # blank = DEFAULT_FROM_EMAIL
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
 
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.to_email} - {self.subject} ({self.status})"
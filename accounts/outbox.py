@@ -0,0 +1,216 @@
+# accounts/outbox.py
+"""
+Transactional email outbox.
+
+Request code only inserts an EmailOutbox row (`enqueue`), so it never waits on
+SMTP. With send_now=True (OTP codes) the row is delivered right after the
+transaction commits by the process's single sender thread (fed through a
+bounded queue, so a burst never opens more than one extra DB connection);
+without it, when that first attempt fails, or when the queue is full, the row
+waits for `manage.py send_outbox --loop`, which claims due rows in batches and
+sends each batch over one reused backend connection. Failures are retried with exponential backoff until
+EMAIL_OUTBOX_MAX_ATTEMPTS, then marked failed. OTP rows whose code has expired
+(OTP_VALIDITY_SECONDS) are failed instead of sent.
+"""
+
+import logging
+import os
+import queue
+import random
+import threading
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection as db_connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import EmailOutbox, OTP_VALIDITY_SECONDS
+
+logger = logging.getLogger(__name__)
+
+SEND_QUEUE_SIZE = 1000
+SEND_BATCH_SIZE = 50
+
+_send_queue = queue.Queue(maxsize=SEND_QUEUE_SIZE)
+_sender_lock = threading.Lock()
+_sender_pid = None  # the sender thread does not survive a fork
+
+
+def max_attempts():
+    return getattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 5)
+
+
+def backoff_base():
+    return getattr(settings, "EMAIL_OUTBOX_BACKOFF", 30)
+
+
+def backoff_max():
+    return getattr(settings, "EMAIL_OUTBOX_BACKOFF_MAX", 60 * 60)
+
+
+def claim_lease():
+    """Seconds a claimed row is hidden from other workers (covers a worker dying mid-batch)"""
+    return getattr(settings, "EMAIL_OUTBOX_LEASE", 5 * 60)
+
+
+def enqueue(to_email, subject, body, category="", html_body="", from_email="", send_now=False):
+    """
+    Queue one email. With `send_now` it is also sent as soon as the surrounding
+    transaction commits; otherwise `send_outbox` picks it up.
+    """
+    row = EmailOutbox.objects.create(
+        to_email=to_email,
+        subject=subject,
+        body=body,
+        html_body=html_body,
+        from_email=from_email,
+        category=category,
+    )
+    if send_now:
+        transaction.on_commit(partial(send_soon, row.pk))
+    return row
+
+
+def send_soon(row_id):
+    """Hand one committed row to the sender thread; a failure or full queue leaves it for send_outbox"""
+    start_sender()
+    try:
+        _send_queue.put_nowait(row_id)
+    except queue.Full:
+        logger.warning("Immediate send queue full; email %s left for send_outbox", row_id)
+
+
+def start_sender():
+    global _sender_pid
+    if _sender_pid == os.getpid():
+        return
+    with _sender_lock:
+        if _sender_pid == os.getpid():
+            return
+        _sender_pid = os.getpid()
+    threading.Thread(target=_send_forever, name="outbox-send", daemon=True).start()
+
+
+def _send_forever():
+    while True:
+        ids = [_send_queue.get()]
+        while len(ids) < SEND_BATCH_SIZE:
+            try:
+                ids.append(_send_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            deliver_batch(ids=ids)
+        except Exception:
+            logger.exception("Immediate delivery of %d email(s) failed; left for send_outbox", len(ids))
+        finally:
+            db_connection.close()
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter, capped at EMAIL_OUTBOX_BACKOFF_MAX"""
+    delay = min(backoff_base() * 2 ** max(attempts - 1, 0), backoff_max())
+    return delay * random.uniform(0.8, 1.0)
+
+
+def expire_otp_emails(now=None):
+    """Fail queued OTP emails whose code can no longer be used; returns rows failed"""
+    now = now or timezone.now()
+    return EmailOutbox.objects.filter(
+        status="pending",
+        category="otp",
+        created_at__lt=now - timedelta(seconds=OTP_VALIDITY_SECONDS),
+    ).update(status="failed", last_error="OTP expired before delivery")
+
+
+@transaction.atomic
+def claim_batch(batch_size, ids=None):
+    """Lease up to `batch_size` due rows (only `ids`, if given) and count the attempt"""
+    now = timezone.now()
+    expire_otp_emails(now)
+    due = EmailOutbox.objects.filter(status="pending", next_attempt_at__lte=now).order_by("next_attempt_at", "id")
+    if ids is not None:
+        due = due.filter(id__in=ids)
+
+    skip_locked = db_connection.features.has_select_for_update_skip_locked
+    ids = list(due.select_for_update(skip_locked=skip_locked).values_list("id", flat=True)[:batch_size])
+    if not ids:
+        return []
+
+    EmailOutbox.objects.filter(id__in=ids).update(
+        attempts=F("attempts") + 1,
+        next_attempt_at=now + timedelta(seconds=claim_lease()),
+    )
+    return list(EmailOutbox.objects.filter(id__in=ids).order_by("next_attempt_at", "id"))
+
+
+def build_message(row, connection):
+    message = EmailMultiAlternatives(
+        subject=row.subject,
+        body=row.body,
+        from_email=row.from_email or settings.DEFAULT_FROM_EMAIL,
+        to=[row.to_email],
+        connection=connection,
+    )
+    if row.html_body:
+        message.attach_alternative(row.html_body, "text/html")
+    return message
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+def deliver_batch(batch_size=50, ids=None):
+    """Send one claimed batch over a single connection. Returns (sent, failed)."""
+    rows = claim_batch(batch_size, ids)
+    if not rows:
+        return 0, 0
+
+    connection = get_connection(fail_silently=False)
+    sent = failed = 0
+    try:
+        for row in rows:
+            try:
+                connection.open()  # no-op while the connection is still up
+                if not connection.send_messages([build_message(row, connection)]):
+                    raise RuntimeError("Backend accepted no messages")
+            except Exception as exc:
+                # drop the connection; the next row reconnects
+                _close_quietly(connection)
+                row.last_error = f"{type(exc).__name__}: {exc}"[:1000]
+                if row.attempts >= max_attempts():
+                    row.status = "failed"
+                    logger.error("Email %s to %s failed permanently: %s", row.pk, row.to_email, row.last_error)
+                else:
+                    row.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay(row.attempts))
+                    logger.warning("Email %s to %s failed (attempt %s): %s", row.pk, row.to_email, row.attempts, row.last_error)
+                row.save(update_fields=["status", "last_error", "next_attempt_at"])
+                failed += 1
+            else:
+                # marked per row so a crash mid-batch can't resend what already went out
+                row.status = "sent"
+                row.sent_at = timezone.now()
+                row.last_error = ""
+                row.save(update_fields=["status", "sent_at", "last_error"])
+                sent += 1
+    finally:
+        _close_quietly(connection)
+    return sent, failed
+
+
+def deliver_pending(batch_size=50):
+    """Deliver batches until nothing is due. Returns (sent, failed)."""
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = deliver_batch(batch_size)
+        if not sent and not failed:
+            return total_sent, total_failed
+        total_sent += sent
+        total_failed += failed
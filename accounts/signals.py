@@ -0,0 +1,33 @@
+# accounts/signals.py
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .authentication import invalidate_cached_user, publish_user_version
+from .models import User
+
+
+# ---------------------------------------------------------
+# AUTH USER CACHE — any save (role change, deactivation, password) bumps
+# auth_version, which stales the cached user in every worker
+# ---------------------------------------------------------
+
+@receiver(post_save, sender=User)
+def bump_auth_version(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    if created or raw or (update_fields is not None and set(update_fields) <= {"last_login"}):
+        return
+
+    invalidate_cached_user(instance.pk)
+    User.objects.filter(pk=instance.pk).update(auth_version=F("auth_version") + 1)
+    instance.auth_version = User.objects.values_list("auth_version", flat=True).get(pk=instance.pk)
+    version = instance.auth_version
+    transaction.on_commit(lambda: publish_user_version(instance.pk, version))
+
+
+@receiver(post_delete, sender=User)
+def drop_cached_user(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+    user_id = instance.pk
+    transaction.on_commit(lambda: publish_user_version(user_id, None))
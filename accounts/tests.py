@@ -1,3 +1,665 @@
-from django.test import TestCase
+import hashlib
+import json
+import queue
+import smtplib
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-# Create your tests here.
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends import locmem
+from django.test import TestCase, override_settings
+from django.test.client import RequestFactory
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, jwt
+
+from . import outbox, throttling
+from .google import GoogleTokenError, GoogleTokenVerifier
+from . import tokens as token_helpers
+from .tokens import BloomFilter, RefreshToken as BloomRefreshToken, blacklist_filter, flush_expired_tokens
+from .utils import issue_otp, sweep_otps
+from .authentication import CookieJWTAuthentication, clear_user_cache
+from .models import User, OTP, EmailOutbox
+
+
+class CookieJWTUserCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        clear_user_cache()
+        self.addCleanup(clear_user_cache)
+        self.user = User.objects.create_user(email="cached@example.com", full_name="Cached", password="pw")
+        self.access = str(RefreshToken.for_user(self.user).access_token)
+
+    def authenticate(self):
+        request = RequestFactory().get("/")
+        request.COOKIES["access"] = self.access
+        return CookieJWTAuthentication().authenticate(request)
+
+    def test_repeat_requests_skip_user_query(self):
+        with self.assertNumQueries(1):
+            self.authenticate()
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate()
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_cached_user_is_a_copy(self):
+        first, _ = self.authenticate()
+        first.role = "recruiter"
+        second, _ = self.authenticate()
+        self.assertEqual(second.role, "candidate")
+
+    def test_role_change_and_deactivation_invalidate(self):
+        self.authenticate()
+
+        self.user.role = "recruiter"
+        self.user.save()
+        with self.assertNumQueries(1):
+            user, _ = self.authenticate()
+        self.assertEqual(user.role, "recruiter")
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(self.authenticate())
+
+    def test_changes_saved_by_another_worker_invalidate(self):
+        self.authenticate()
+
+        # another process saves the user: this process's entry is not dropped locally
+        with mock.patch("accounts.signals.invalidate_cached_user"):
+            with self.captureOnCommitCallbacks(execute=True):
+                User.objects.filter(pk=self.user.pk).update(role="recruiter")
+                self.user.refresh_from_db()
+                self.user.save()
+        with self.assertNumQueries(1):
+            user, _ = self.authenticate()
+        self.assertEqual(user.role, "recruiter")
+        with self.assertNumQueries(0):
+            self.authenticate()
+
+        with mock.patch("accounts.signals.invalidate_cached_user"):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.delete()
+        self.assertIsNone(self.authenticate())
+
+    def test_login_timestamp_does_not_invalidate(self):
+        self.authenticate()
+        self.user.last_login = timezone.now()
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=["last_login"])
+        with self.assertNumQueries(0):
+            self.authenticate()
+
+
+class CountingBackend(locmem.EmailBackend):
+    """locmem backend that counts connections and refuses listed recipients"""
+    opened = 0
+    refuse = set()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.is_open = False
+
+    def open(self):
+        if self.is_open:
+            return False
+        CountingBackend.opened += 1
+        self.is_open = True
+        return True
+
+    def close(self):
+        self.is_open = False
+
+    def send_messages(self, messages):
+        for message in messages:
+            refused = set(message.to) & self.refuse
+            if refused:
+                raise smtplib.SMTPRecipientsRefused({r: (550, b"refused") for r in refused})
+        return super().send_messages(messages)
+
+
+@override_settings(
+    EMAIL_BACKEND="accounts.tests.CountingBackend",
+    EMAIL_OUTBOX_MAX_ATTEMPTS=2,
+    EMAIL_OUTBOX_BACKOFF=60,
+)
+class EmailOutboxTests(TestCase):
+
+    def setUp(self):
+        CountingBackend.opened = 0
+        CountingBackend.refuse = set()
+
+    def send_otp(self):
+        User.objects.create_user(email="otp@example.com", full_name="OTP")
+        # run the post-commit delivery inline instead of on the sender thread
+        with mock.patch("accounts.outbox.send_soon", lambda pk: outbox.deliver_batch(ids=[pk])):
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                response = APIClient().post("/api/auth/send-otp/", {"email": "otp@example.com"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        return callbacks
+
+    def test_send_otp_is_delivered_after_commit(self):
+        self.assertEqual(len(self.send_otp()), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(OTP.objects.get().code, mail.outbox[0].body)
+        row = EmailOutbox.objects.get()
+        self.assertEqual((row.category, row.status, row.attempts), ("otp", "sent", 1))
+
+    def test_failed_otp_send_is_left_for_retry(self):
+        CountingBackend.refuse = {"otp@example.com"}
+        self.send_otp()
+        row = EmailOutbox.objects.get()
+        self.assertEqual((row.status, row.attempts), ("pending", 1))
+
+        CountingBackend.refuse = set()
+        EmailOutbox.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(outbox.deliver_pending(), (1, 0))
+
+    def test_expired_otp_emails_are_dropped(self):
+        CountingBackend.refuse = {"otp@example.com"}
+        self.send_otp()
+        EmailOutbox.objects.update(
+            next_attempt_at=timezone.now(), created_at=timezone.now() - timedelta(minutes=11)
+        )
+        CountingBackend.refuse = set()
+
+        self.assertEqual(outbox.deliver_pending(), (0, 0))
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(EmailOutbox.objects.get().status, "failed")
+
+    def test_otp_burst_shares_one_sender_thread(self):
+        with mock.patch("accounts.outbox._sender_pid", None), \
+                mock.patch("accounts.outbox._send_queue", queue.Queue(maxsize=3)) as pending, \
+                mock.patch("accounts.outbox.threading.Thread") as thread:
+            with self.assertLogs("accounts.outbox", "WARNING"):
+                for pk in range(5):
+                    outbox.send_soon(pk)
+            thread.assert_called_once()
+            self.assertEqual(pending.qsize(), 3)  # the rest wait for send_outbox
+
+    def test_sender_delivers_queued_rows_in_one_batch(self):
+        class Stop(Exception):
+            pass
+
+        rows = [outbox.enqueue(f"user{n}@example.com", "Hello", "Body") for n in range(3)]
+        pending = queue.Queue()
+        for row in rows:
+            pending.put(row.pk)
+        with mock.patch("accounts.outbox._send_queue", pending), \
+                mock.patch("accounts.outbox.db_connection") as db_connection:
+            db_connection.close.side_effect = Stop
+            with self.assertRaises(Stop):
+                outbox._send_forever()
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(CountingBackend.opened, 1)
+
+    def test_batch_reuses_one_connection(self):
+        for n in range(5):
+            outbox.enqueue(f"user{n}@example.com", "Hello", "Body")
+
+        self.assertEqual(outbox.deliver_pending(), (5, 0))
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(CountingBackend.opened, 1)
+        self.assertFalse(EmailOutbox.objects.exclude(status="sent").exists())
+
+    def test_failures_back_off_then_give_up(self):
+        CountingBackend.refuse = {"bad@example.com"}
+        bad = outbox.enqueue("bad@example.com", "Hello", "Body")
+        outbox.enqueue("good@example.com", "Hello", "Body")
+
+        self.assertEqual(outbox.deliver_pending(), (1, 1))
+        bad.refresh_from_db()
+        self.assertEqual((bad.status, bad.attempts), ("pending", 1))
+        self.assertGreater(bad.next_attempt_at, timezone.now() + timedelta(seconds=40))
+        self.assertIn("SMTPRecipientsRefused", bad.last_error)
+
+        # not due yet
+        self.assertEqual(outbox.deliver_pending(), (0, 0))
+
+        EmailOutbox.objects.filter(pk=bad.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(outbox.deliver_pending(), (0, 1))
+        bad.refresh_from_db()
+        self.assertEqual((bad.status, bad.attempts), ("failed", 2))
+
+
+class OTPLifecycleTests(TestCase):
+
+    @override_settings(OTP_MAX_OUTSTANDING=3)
+    def test_outstanding_codes_are_capped(self):
+        codes = [issue_otp("cap@example.com") for _ in range(5)]
+
+        outstanding = OTP.objects.filter(email="cap@example.com", is_used=False)
+        self.assertEqual(outstanding.count(), 3)
+        self.assertEqual(set(outstanding.values_list("code", flat=True)), set(codes[-3:]))
+
+    def test_sweep_deletes_used_and_expired_in_chunks(self):
+        fresh = OTP.objects.create(email="a@example.com", code="111111")
+        OTP.objects.create(email="a@example.com", code="222222", is_used=True)
+        for n in range(5):
+            OTP.objects.create(email=f"old{n}@example.com", code="333333")
+        OTP.objects.exclude(pk=fresh.pk).filter(is_used=False).update(
+            created_at=timezone.now() - timedelta(minutes=11)
+        )
+
+        self.assertEqual(sweep_otps(batch_size=2), 6)
+        self.assertEqual(list(OTP.objects.values_list("pk", flat=True)), [fresh.pk])
+
+
+@override_settings(RATELIMIT_POLICIES={"otp_send": {"ip": "4/m", "email": "2/m"}})
+class SlidingWindowThrottleTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        for n in range(3):
+            User.objects.create_user(email=f"limit{n}@example.com", full_name="Limit")
+
+    def send(self, email):
+        return APIClient().post("/api/auth/send-otp/", {"email": email}, format="json")
+
+    def test_email_and_ip_limits(self):
+        self.assertEqual(self.send("limit0@example.com").status_code, 200)
+        self.assertEqual(self.send("LIMIT0@example.com ").status_code, 404)  # counted under the same email
+
+        response = self.send("limit0@example.com")
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+
+        # other addresses pass until the per-IP limit (4/m, two already counted)
+        self.assertEqual(self.send("limit1@example.com").status_code, 200)
+        self.assertEqual(self.send("limit2@example.com").status_code, 200)
+        self.assertEqual(self.send("limit2@example.com").status_code, 429)
+        self.assertEqual(OTP.objects.count(), 3)
+
+    def test_spoofed_forwarded_for_does_not_reset_the_ip_limit(self):
+        # behind one proxy, only the hop it appended identifies the client
+        statuses = [
+            APIClient().post(
+                "/api/auth/send-otp/", {"email": f"limit{n % 3}@example.com"}, format="json",
+                HTTP_X_FORWARDED_FOR=f"10.0.0.{n}, 203.0.113.7",
+            ).status_code
+            for n in range(5)
+        ]
+        self.assertEqual(statuses, [200, 200, 200, 200, 429])
+
+        throttle = throttling.SlidingWindowThrottle()
+        request = RequestFactory().get("/", HTTP_X_FORWARDED_FOR="1.1.1.1, 203.0.113.7", REMOTE_ADDR="10.1.1.1")
+        with override_settings(REST_FRAMEWORK={"NUM_PROXIES": None}):
+            self.assertEqual(throttle.get_ident(request), "10.1.1.1")
+        self.assertEqual(throttle.get_ident(request), "203.0.113.7")
+
+    def test_previous_window_decays(self):
+        checks = [("ip", "1.2.3.4", 10, 60)]
+        for _ in range(10):
+            self.assertIsNone(throttling.hit("test", checks, now=59.0))
+        # new window, but the previous one still weighs 10 * 59/60
+        self.assertEqual(throttling.hit("test", checks, now=61.0), 5)
+
+        self.assertIsNotNone(throttling.hit("test", checks, now=65.0))  # 10 * 55/60 > 9
+        self.assertIsNone(throttling.hit("test", checks, now=66.0))     # 10 * 54/60 = 9
+
+    def test_falls_back_to_local_memory(self):
+        broken = mock.Mock(get_many=mock.Mock(side_effect=ConnectionError("down")))
+        checks = [("ip", "5.6.7.8", 1, 60)]
+        with mock.patch.object(throttling, "_cache", return_value=broken), \
+                self.assertLogs("accounts.throttling", "WARNING"):
+            self.assertIsNone(throttling.hit("fallback", checks))
+            self.assertIsNotNone(throttling.hit("fallback", checks))
+
+
+@override_settings(TOKEN_BLACKLIST_SYNC_INTERVAL=3600)
+class RefreshTokenBlacklistTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        blacklist_filter.reset()
+        self.addCleanup(cache.clear)
+        self.addCleanup(blacklist_filter.reset)
+        self.user = User.objects.create_user(email="tokens@example.com", full_name="Tokens")
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(1000)
+        for n in range(1000):
+            bloom.add(f"jti-{n}")
+        self.assertTrue(all(f"jti-{n}" in bloom for n in range(1000)))
+        false_positives = sum(f"other-{n}" in bloom for n in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_clean_tokens_skip_the_blacklist_query(self):
+        BloomRefreshToken.for_user(self.user).blacklist()
+        token = str(BloomRefreshToken.for_user(self.user))
+
+        BloomRefreshToken(token)  # first check loads the filter
+        with self.assertNumQueries(0):
+            BloomRefreshToken(token)
+
+    def test_blacklisted_token_is_rejected(self):
+        raw = str(BloomRefreshToken.for_user(self.user))
+        BloomRefreshToken(raw)
+        BloomRefreshToken(raw).blacklist()
+
+        with self.assertRaises(TokenError):
+            BloomRefreshToken(raw)
+
+    def test_rotation_blacklists_previous_token(self):
+        raw = str(BloomRefreshToken.for_user(self.user))
+        client = APIClient()
+        client.cookies["refresh"] = raw
+        self.assertEqual(client.post("/api/auth/refresh/").status_code, 200)
+
+        cache.clear()  # past the grace window
+        client.cookies["refresh"] = raw
+        self.assertEqual(client.post("/api/auth/refresh/").status_code, 401)
+
+    def test_concurrent_refresh_calls_share_one_rotation(self):
+        raw = str(BloomRefreshToken.for_user(self.user))
+        first, second = APIClient(), APIClient()
+        first.cookies["refresh"] = second.cookies["refresh"] = raw
+
+        one, two = first.post("/api/auth/refresh/"), second.post("/api/auth/refresh/")
+
+        self.assertEqual((one.status_code, two.status_code), (200, 200))
+        self.assertEqual(one.cookies["refresh"].value, two.cookies["refresh"].value)
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+    @override_settings(TOKEN_BLACKLIST_BLOOM_CAPACITY=10)
+    def test_filter_grows_with_the_blacklist(self):
+        for _ in range(20):
+            BloomRefreshToken.for_user(self.user).blacklist()
+        blacklist_filter.reset()
+        raw = str(BloomRefreshToken.for_user(self.user))
+
+        with mock.patch("accounts.tokens.threading.Thread") as thread:
+            for _ in range(50):
+                BloomRefreshToken(raw)
+        thread.assert_not_called()
+        self.assertGreaterEqual(blacklist_filter._bloom.capacity, 40)
+
+    def test_periodic_rebuild_runs_off_the_request_thread(self):
+        raw = str(BloomRefreshToken.for_user(self.user))
+        BloomRefreshToken(raw)  # first build happens in-line
+        other = BloomRefreshToken.for_user(self.user)
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=other["jti"]))
+
+        with override_settings(TOKEN_BLACKLIST_REBUILD_INTERVAL=0), \
+                mock.patch("accounts.tokens.threading.Thread") as thread:
+            with self.assertNumQueries(0):
+                BloomRefreshToken(raw)
+            thread.assert_called_once()
+            thread.return_value.start.assert_called_once()
+            BloomRefreshToken(raw)
+            thread.assert_called_once()  # no second rebuild while one is running
+
+        blacklist_filter.add("added-during-rebuild")
+        blacklist_filter.rebuild()
+        self.assertTrue(blacklist_filter.might_contain(other["jti"]))
+        self.assertTrue(blacklist_filter.might_contain("added-during-rebuild"))
+
+    def test_flush_expired_tokens(self):
+        BloomRefreshToken.for_user(self.user).blacklist()
+        BloomRefreshToken.for_user(self.user)
+        keep = BloomRefreshToken.for_user(self.user)
+        OutstandingToken.objects.exclude(jti=keep["jti"]).update(expires_at=timezone.now() - timedelta(days=1))
+
+        self.assertEqual(flush_expired_tokens(batch_size=1), 2)
+        self.assertEqual(list(OutstandingToken.objects.values_list("jti", flat=True)), [keep["jti"]])
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+
+def make_signing_key(kid):
+    """(signer, PEM certificate) for a throwaway self-signed RSA key"""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, kid)])
+    now = timezone.now()
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    pem_key = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    signer = crypt.RSASigner.from_string(pem_key, key_id=kid)
+    return signer, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+class KeyServer(ThreadingHTTPServer):
+    """Local stand-in for Google's certs endpoint"""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), KeyServerHandler)
+        self.certs = {}
+        self.max_age = 3600
+        self.status = 200
+        self.hits = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}/certs"
+
+
+class KeyServerHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        self.server.hits += 1
+        body = json.dumps(self.server.certs).encode()
+        self.send_response(self.server.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Cache-Control", f"public, max-age={self.server.max_age}, must-revalidate")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class GoogleTokenVerifierTests(TestCase):
+    audience = "client-123.apps.googleusercontent.com"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.signer, cls.cert = make_signing_key("key-1")
+        cls.rotated_signer, cls.rotated_cert = make_signing_key("key-2")
+
+    def setUp(self):
+        self.server = KeyServer()
+        self.server.certs = {"key-1": self.cert}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.verifier = GoogleTokenVerifier(certs_url=self.server.url, refresh_margin=0)
+
+    def token(self, signer=None, **claims):
+        now = int(time.time())
+        payload = {
+            "iss": "https://accounts.google.com",
+            "aud": self.audience,
+            "sub": "1234",
+            "email": "google@example.com",
+            "iat": now,
+            "exp": now + 600,
+            **claims,
+        }
+        return jwt.encode(signer or self.signer, payload)
+
+    def test_certs_are_fetched_once(self):
+        for _ in range(5):
+            claims = self.verifier.verify(self.token(), self.audience)
+        self.assertEqual(claims["email"], "google@example.com")
+        self.assertEqual(self.server.hits, 1)
+
+    def test_refetch_after_max_age(self):
+        self.server.max_age = 0
+        self.verifier.verify(self.token(), self.audience)
+        self.verifier.verify(self.token(), self.audience)
+        self.assertEqual(self.server.hits, 2)
+
+    def test_background_refresh_near_expiry(self):
+        self.verifier.refresh_margin = 3600
+        self.verifier.verify(self.token(), self.audience)
+        self.verifier.verify(self.token(), self.audience)  # served from cache, refresh started
+
+        for _ in range(50):
+            if self.server.hits == 2 and not self.verifier._refreshing:
+                break
+            time.sleep(0.02)
+        self.assertEqual(self.server.hits, 2)
+
+    def test_unknown_key_forces_one_refetch(self):
+        self.verifier.verify(self.token(), self.audience)
+
+        self.server.certs = {"key-1": self.cert, "key-2": self.rotated_cert}
+        self.verifier.verify(self.token(self.rotated_signer), self.audience)
+        self.assertEqual(self.server.hits, 2)
+
+        # forced refetches are rate limited
+        stranger, _ = make_signing_key("key-3")
+        with self.assertRaises(GoogleTokenError):
+            self.verifier.verify(self.token(stranger), self.audience)
+        self.assertEqual(self.server.hits, 2)
+
+    def test_fetch_failures_surface_as_token_errors(self):
+        self.server.status = 503
+        with self.assertRaisesMessage(GoogleTokenError, "Could not fetch Google signing keys"):
+            self.verifier.verify(self.token(), self.audience)
+
+        self.server.status = 200
+        self.verifier.verify(self.token(), self.audience)
+
+        # unknown kid while Google is down: the cached certs keep verifying known keys
+        self.server.status = 503
+        with self.assertLogs("accounts.google", "WARNING"), self.assertRaises(GoogleTokenError):
+            self.verifier.verify(self.token(self.rotated_signer), self.audience)
+        self.verifier.verify(self.token(), self.audience)
+
+    def test_rejects_wrong_audience_and_issuer(self):
+        with self.assertRaises(GoogleTokenError):
+            self.verifier.verify(self.token(aud="someone-else"), self.audience)
+        with self.assertRaises(GoogleTokenError):
+            self.verifier.verify(self.token(iss="https://evil.example.com"), self.audience)
+
+
+class SessionRoutingMiddlewareTests(TestCase):
+
+    def test_api_requests_skip_the_session_stack(self):
+        client = APIClient()
+        client.cookies["sessionid"] = "stale-admin-session"
+        with self.assertNumQueries(0):
+            response = client.post("/api/auth/send-otp/", {}, format="json")
+        self.assertNotIn("X-Frame-Options", response)
+        self.assertFalse(hasattr(response.wsgi_request, "session"))
+
+    def test_admin_keeps_sessions(self):
+        admin = User.objects.create_superuser(email="admin@example.com", password="pw")
+        client = APIClient()
+        client.force_login(admin)
+
+        response = client.get("/admin/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Frame-Options"], "DENY")
+        self.assertEqual(response.wsgi_request.user, admin)
+
+
+class TokenRefreshMiddlewareTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        blacklist_filter.reset()
+        self.addCleanup(cache.clear)
+        self.addCleanup(blacklist_filter.reset)
+        self.user = User.objects.create_user(email="refresh@example.com", full_name="Refresh")
+        self.refresh = str(BloomRefreshToken.for_user(self.user))
+        expired = AccessToken.for_user(self.user)
+        expired.set_exp(lifetime=-timedelta(minutes=1))
+        self.expired_access = str(expired)
+
+    def check(self, access=None, refresh=None):
+        client = APIClient()
+        if access:
+            client.cookies["access"] = access
+        if refresh:
+            client.cookies["refresh"] = refresh
+        return client.get("/api/auth/check/")
+
+    def test_expired_access_is_refreshed_in_line(self):
+        response = self.check(self.expired_access, self.refresh)
+
+        self.assertTrue(response.data["authenticated"])
+        self.assertNotEqual(response.cookies["access"].value, self.expired_access)
+        self.assertNotEqual(response.cookies["refresh"].value, self.refresh)
+        self.assertTrue(response.cookies["access"]["httponly"])
+
+        # the new access token works on its own; the old refresh token is spent
+        self.assertTrue(self.check(response.cookies["access"].value).data["authenticated"])
+        cache.clear()
+        self.assertFalse(self.check(None, self.refresh).data["authenticated"])
+
+    def test_concurrent_requests_share_one_rotation(self):
+        first = self.check(self.expired_access, self.refresh)
+        second = self.check(self.expired_access, self.refresh)
+
+        self.assertTrue(second.data["authenticated"])
+        self.assertEqual(first.cookies["refresh"].value, second.cookies["refresh"].value)
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+    def test_racing_refresh_waits_for_the_winners_pair(self):
+        digest = hashlib.sha256(self.refresh.encode()).hexdigest()
+        pair = {"access": "new-access", "refresh": "new-refresh"}
+        cache.add("auth:refreshing:" + digest, 1)  # another request is mid-rotation
+        timer = threading.Timer(0.2, cache.set, ("auth:refreshed:" + digest, pair))
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        self.assertEqual(token_helpers.refresh_with_grace(self.refresh), pair)
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+    @mock.patch("accounts.tokens.REFRESH_WAIT", 0.1)
+    def test_racing_refresh_gives_up_without_rotating(self):
+        digest = hashlib.sha256(self.refresh.encode()).hexdigest()
+        cache.add("auth:refreshing:" + digest, 1)
+
+        response = self.check(self.expired_access, self.refresh)
+
+        self.assertFalse(response.data["authenticated"])
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+    def test_valid_access_is_left_alone(self):
+        access = str(AccessToken.for_user(self.user))
+        response = self.check(access, self.refresh)
+        self.assertTrue(response.data["authenticated"])
+        self.assertNotIn("access", response.cookies)
+
+    def test_invalid_refresh_stays_unauthenticated(self):
+        response = self.check(self.expired_access, "not-a-token")
+        self.assertFalse(response.data["authenticated"])
+        self.assertNotIn("access", response.cookies)
+
+    def test_logout_clears_cookies(self):
+        client = APIClient()
+        client.cookies["refresh"] = self.refresh
+        response = client.post("/api/auth/logout/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.cookies["access"]["max-age"], 0)
+        self.assertEqual(response.cookies["refresh"].value, "")
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
@@ -0,0 +1,181 @@
+# accounts/throttling.py
+"""
+Sliding-window rate limiting for DRF views.
+
+A view opts in with
+
+    throttle_classes = [SlidingWindowThrottle]
+    throttle_scope = "otp_send"
+
+and the limits come from settings.RATELIMIT_POLICIES[scope], e.g.
+{"ip": "20/h", "email": "5/15m"}. Supported keys: "ip" (client address),
+"email" (request body field, normalized) and "user" (authenticated user id).
+The client address is the NUM_PROXIES-th hop from the end of X-Forwarded-For,
+so prefixes a client adds to that header don't change it.
+
+Each key is counted with the sliding-window-counter approximation: the
+current fixed window's count plus the previous window's count weighted by
+how much of it still overlaps the sliding window. That is two cache keys per
+limit, one get_many and one add/incr per allowed request. Counters live in
+RATELIMIT_CACHE; if that cache errors, a per-process LocMemCache takes over so
+limits still apply (per worker) instead of failing open.
+"""
+
+import hashlib
+import logging
+import math
+import re
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+RATE_RE = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*([smhd])\w*\s*$")
+PERIOD_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+_local_cache = LocMemCache("ratelimit-fallback", {"OPTIONS": {"MAX_ENTRIES": 100_000}})
+_last_fallback_warning = 0.0
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """'5/15m' -> (5, 900); '100/h' -> (100, 3600)"""
+    match = RATE_RE.match(rate)
+    if not match:
+        raise ValueError(f"Invalid rate {rate!r}; expected e.g. '10/m' or '5/15m'")
+    limit, multiplier, unit = match.groups()
+    return int(limit), int(multiplier or 1) * PERIOD_SECONDS[unit]
+
+
+def get_policy(scope):
+    if not scope or not getattr(settings, "RATELIMIT_ENABLED", True):
+        return None
+    return getattr(settings, "RATELIMIT_POLICIES", {}).get(scope)
+
+
+def _cache():
+    return caches[getattr(settings, "RATELIMIT_CACHE", "default")]
+
+
+def _warn_fallback():
+    global _last_fallback_warning
+    now = time.monotonic()
+    if now - _last_fallback_warning > 60:
+        _last_fallback_warning = now
+        logger.warning("Rate-limit cache unavailable; using per-process memory", exc_info=True)
+
+
+def _window_keys(scope, kind, ident, window, now):
+    index = int(now // window)
+    base = f"rl:{scope}:{kind}:{ident}:{window}"
+    return f"{base}:{index}", f"{base}:{index - 1}", now - index * window
+
+
+def _retry_after(limit, window, elapsed, previous, current):
+    """Seconds until one more request fits under `limit`"""
+    if current < limit and previous:
+        # wait for the previous window's weight to drop far enough
+        weight = (limit - 1 - current) / previous
+        return max(window * (1 - weight) - elapsed, 1)
+    # the current window alone is full: wait for it to roll over and decay
+    decay = window * (1 - (limit - 1) / current) if current else 0
+    return max(window - elapsed + decay, 1)
+
+
+def hit(scope, checks, now=None):
+    """
+    `checks` is a list of (kind, ident, limit, window). Counts one request against
+    every check if all are under their limit and returns None; otherwise counts
+    nothing and returns the seconds to wait.
+    """
+    now = time.time() if now is None else now
+    planned = []
+    for kind, ident, limit, window in checks:
+        current_key, previous_key, elapsed = _window_keys(scope, kind, ident, window, now)
+        planned.append((current_key, previous_key, elapsed, limit, window))
+
+    try:
+        return _hit(_cache(), planned)
+    except Exception:
+        _warn_fallback()
+        return _hit(_local_cache, planned)
+
+
+def _hit(cache, planned):
+    keys = [key for current_key, previous_key, *_ in planned for key in (current_key, previous_key)]
+    counts = cache.get_many(keys)
+
+    wait = None
+    for current_key, previous_key, elapsed, limit, window in planned:
+        current = counts.get(current_key, 0)
+        previous = counts.get(previous_key, 0)
+        estimate = previous * (1 - elapsed / window) + current
+        if estimate + 1 > limit:
+            seconds = _retry_after(limit, window, elapsed, previous, current)
+            wait = seconds if wait is None else max(wait, seconds)
+    if wait is not None:
+        return math.ceil(wait)
+
+    for current_key, _, _, _, window in planned:
+        # the key must outlive the next window, where it is read as "previous"
+        if current_key in counts or not cache.add(current_key, 1, timeout=2 * window):
+            try:
+                cache.incr(current_key)
+            except ValueError:
+                cache.add(current_key, 1, timeout=2 * window)  # expired in between
+    return None
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Applies settings.RATELIMIT_POLICIES[view.throttle_scope]"""
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        scope = getattr(view, "throttle_scope", None)
+        policy = get_policy(scope)
+        if not policy:
+            return True
+
+        checks = []
+        for kind, rate in policy.items():
+            ident = self.identify(kind, request)
+            if ident is not None:
+                limit, window = parse_rate(rate)
+                checks.append((kind, ident, limit, window))
+        if not checks:
+            return True
+
+        self.wait_seconds = hit(scope, checks)
+        return self.wait_seconds is None
+
+    def get_ident(self, request):
+        """
+        DRF's client address, except that an unset NUM_PROXIES falls back to
+        REMOTE_ADDR instead of keying on the whole client-supplied X-Forwarded-For
+        """
+        if api_settings.NUM_PROXIES is None:
+            return request.META.get("REMOTE_ADDR")
+        return super().get_ident(request)
+
+    def identify(self, kind, request):
+        if kind == "ip":
+            return self.get_ident(request)
+        if kind == "user":
+            user = request.user
+            return user.pk if user and user.is_authenticated else None
+        if kind == "email":
+            email = request.data.get("email") if hasattr(request.data, "get") else None
+            if not email or not isinstance(email, str):
+                return None
+            # hashed: arbitrary input must not end up in cache keys
+            return hashlib.sha1(email.strip().lower().encode()).hexdigest()[:20]
+        raise ValueError(f"Unknown rate-limit key {kind!r}")
+
+    def wait(self):
+        return self.wait_seconds
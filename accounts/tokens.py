@@ -0,0 +1,269 @@
+# accounts/tokens.py
+"""
+Refresh-token blacklist helpers.
+
+RefreshToken checks the blacklist against a per-process bloom filter of
+blacklisted JTIs first, so the usual "not blacklisted" answer needs no query;
+only a filter hit goes to the database. The filter is topped up with new
+BlacklistedToken rows every TOKEN_BLACKLIST_SYNC_INTERVAL seconds and rebuilt
+from scratch every TOKEN_BLACKLIST_REBUILD_INTERVAL seconds (dropping expired
+tokens). Only the very first build runs on a request thread; later rebuilds
+run in a background thread while requests keep using the current filter.
+Tokens blacklisted in this process are added immediately; ones blacklisted
+by another process are seen after at most one sync interval.
+
+`refresh_tokens` issues a new access token (and rotated refresh token);
+`refresh_with_grace` wraps it for RefreshTokenView and TokenRefreshMiddleware
+so concurrent
+requests carrying the same refresh token share one rotation instead of all
+but the first failing against the blacklist. Only the first caller rotates
+(under a `cache.add` lock keyed by the token's hash); the others wait for
+the new pair it caches under that hash for AUTH_COOKIE_REFRESH_GRACE
+seconds. For that window anyone holding the old, already-rotated refresh
+token also gets the new pair, so keep it short. The lock and the cached pair
+live in the default cache: across workers this needs a shared cache (Redis);
+with LocMemCache the sharing only works within one process.
+
+`flush_expired_tokens` removes expired outstanding/blacklisted rows in chunks.
+"""
+
+import hashlib
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection as db_connection
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+
+logger = logging.getLogger(__name__)
+
+# Re-read this many ids below the high-water mark on each sync, so rows whose
+# transaction committed after a higher id was already seen are not missed.
+SYNC_ID_OVERLAP = 100
+
+# A rotation holds its lock for at most this long; callers that lose the race
+# poll for the winner's pair every REFRESH_POLL seconds for up to REFRESH_WAIT.
+REFRESH_LOCK_TIMEOUT = 10
+REFRESH_WAIT = 2.0
+REFRESH_POLL = 0.05
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings (double hashing on one blake2b digest)"""
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = max(capacity, 1)
+        self.size = max(int(-self.capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / self.capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        new = False
+        for pos in self._positions(value):
+            mask = 1 << (pos & 7)
+            if not self.bits[pos >> 3] & mask:
+                self.bits[pos >> 3] |= mask
+                new = True
+        # values already present (e.g. re-read sync overlap) don't count towards capacity
+        self.count += new
+
+    def __contains__(self, value):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+
+def bloom_capacity():
+    return getattr(settings, "TOKEN_BLACKLIST_BLOOM_CAPACITY", 100_000)
+
+
+def sync_interval():
+    return getattr(settings, "TOKEN_BLACKLIST_SYNC_INTERVAL", 5)
+
+
+def refresh_grace():
+    return getattr(settings, "AUTH_COOKIE_REFRESH_GRACE", 10)
+
+
+def rebuild_interval():
+    return getattr(settings, "TOKEN_BLACKLIST_REBUILD_INTERVAL", 60 * 60)
+
+
+class BlacklistFilter:
+    """Per-process, incrementally maintained bloom filter of blacklisted JTIs"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._bloom = None
+            self._high_water = 0
+            self._synced_at = self._built_at = self._retry_at = float("-inf")
+            self._rebuilding = False
+            self._pending = []  # JTIs added while a background rebuild is running
+
+    def _rows(self, **filters):
+        return BlacklistedToken.objects.filter(**filters).values_list("id", "token__jti").order_by()
+
+    def _build(self):
+        live = self._rows(token__expires_at__gt=timezone.now())
+        # room to double before the next count-triggered rebuild
+        bloom = BloomFilter(max(bloom_capacity(), 2 * live.count()))
+        high_water = 0
+        for pk, jti in live.iterator(chunk_size=2000):
+            bloom.add(jti)
+            high_water = max(high_water, pk)
+        return bloom, high_water
+
+    def _install(self, bloom, high_water, now):
+        for jti in self._pending:
+            bloom.add(jti)
+        self._pending = []
+        self._bloom, self._high_water = bloom, high_water
+        self._built_at = self._synced_at = now
+
+    def rebuild(self):
+        """Build a fresh filter without holding the lock, then swap it in"""
+        bloom, high_water = self._build()
+        with self._lock:
+            self._install(bloom, high_water, time.monotonic())
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        except Exception:
+            logger.exception("Blacklist filter rebuild failed; keeping the current filter")
+            with self._lock:
+                self._retry_at = time.monotonic() + sync_interval()
+        finally:
+            with self._lock:
+                self._rebuilding = False
+            db_connection.close()
+
+    def _sync(self):
+        now = time.monotonic()
+        if self._bloom is None:
+            # nothing to fall back on yet
+            self._install(*self._build(), now)
+            return
+        if (
+            not self._rebuilding
+            and now >= self._retry_at
+            and (
+                now - self._built_at >= rebuild_interval()
+                or (self._bloom.count > self._bloom.capacity and now - self._built_at >= sync_interval())
+            )
+        ):
+            self._rebuilding = True
+            threading.Thread(target=self._rebuild_in_background, daemon=True).start()
+        if now - self._synced_at >= sync_interval():
+            for pk, jti in self._rows(id__gt=self._high_water - SYNC_ID_OVERLAP):
+                self._bloom.add(jti)
+                self._high_water = max(self._high_water, pk)
+            self._synced_at = now
+
+    def might_contain(self, jti):
+        with self._lock:
+            self._sync()
+            return jti in self._bloom
+
+    def add(self, jti):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+            if self._rebuilding:
+                self._pending.append(jti)
+
+
+blacklist_filter = BlacklistFilter()
+
+
+class RefreshToken(BaseRefreshToken):
+    """simplejwt RefreshToken whose blacklist check goes through the bloom filter"""
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if blacklist_filter.might_contain(jti) and BlacklistedToken.objects.filter(token__jti=jti).exists():
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        result = super().blacklist()
+        blacklist_filter.add(self.payload[api_settings.JTI_CLAIM])
+        return result
+
+
+def refresh_tokens(refresh):
+    """
+    {"access": ..., "refresh": ...} for a validated refresh token. With
+    ROTATE_REFRESH_TOKENS the refresh token gets a new jti/exp (the old one is
+    blacklisted first under BLACKLIST_AFTER_ROTATION); otherwise "refresh" is None.
+    """
+    access = refresh.access_token
+    if not api_settings.ROTATE_REFRESH_TOKENS:
+        return {"access": access, "refresh": None}
+
+    if api_settings.BLACKLIST_AFTER_ROTATION:
+        refresh.blacklist()
+    refresh.set_jti()
+    refresh.set_exp()
+    return {"access": access, "refresh": refresh}
+
+
+def refresh_with_grace(raw_refresh):
+    """
+    refresh_tokens() for a raw refresh token as {"access": str, "refresh": str | None},
+    sharing one rotation between concurrent callers. Raises TokenError.
+    """
+    digest = hashlib.sha256(raw_refresh.encode()).hexdigest()
+    key, lock = "auth:refreshed:" + digest, "auth:refreshing:" + digest
+
+    deadline = time.monotonic() + REFRESH_WAIT
+    while True:
+        tokens = cache.get(key)
+        if tokens is not None:
+            return tokens
+        if cache.add(lock, 1, timeout=REFRESH_LOCK_TIMEOUT):
+            break
+        if time.monotonic() >= deadline:
+            raise TokenError(_("Token refresh already in progress"))
+        time.sleep(REFRESH_POLL)
+
+    try:
+        # the winner may have cached its pair and released the lock between our get and add
+        tokens = cache.get(key)
+        if tokens is not None:
+            return tokens
+        issued = refresh_tokens(RefreshToken(raw_refresh))
+        tokens = {name: str(token) if token is not None else None for name, token in issued.items()}
+        cache.set(key, tokens, timeout=refresh_grace())
+        return tokens
+    finally:
+        cache.delete(lock)
+
+
+def flush_expired_tokens(batch_size=1000):
+    """Delete expired outstanding tokens (and their blacklist rows) in chunks; returns tokens deleted"""
+    expired = OutstandingToken.objects.filter(expires_at__lte=timezone.now()).order_by()
+    deleted = 0
+    while True:
+        ids = list(expired.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        BlacklistedToken.objects.filter(token_id__in=ids).delete()
+        OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
@@ -1,6 +1,12 @@
 import random
-from django.core.mail import send_mail
+from datetime import timedelta
+
 from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OTP, OTP_VALIDITY_SECONDS
+from .outbox import enqueue
 
 
 def generate_otp():
@@ -8,8 +14,37 @@ def generate_otp():
     return str(random.randint(100000, 999999))
 
 
-def send_otp_email(email, code):
-    """Send OTP via email"""
+def issue_otp(email):
+    """
+    Create a new OTP for `email`, first discarding outstanding codes beyond
+    OTP_MAX_OUTSTANDING - 1 (oldest first) so verify lookups stay bounded.
+    Call inside the transaction that queues the email.
+    """
+    cap = max(getattr(settings, "OTP_MAX_OUTSTANDING", 5), 1)
+    outstanding = OTP.objects.filter(email=email, is_used=False)
+    keep = list(outstanding.order_by("-created_at").values_list("id", flat=True)[:cap - 1])
+    outstanding.exclude(id__in=keep).delete()
+
+    code = generate_otp()
+    OTP.objects.create(email=email, code=code)
+    return code
+
+
+def sweep_otps(batch_size=1000):
+    """Delete used and expired OTPs in chunks of `batch_size`; returns rows deleted"""
+    cutoff = timezone.now() - timedelta(seconds=OTP_VALIDITY_SECONDS)
+    stale = OTP.objects.filter(Q(is_used=True) | Q(created_at__lt=cutoff)).order_by()
+
+    deleted = 0
+    while True:
+        ids = list(stale.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += OTP.objects.filter(id__in=ids).delete()[0]
+
+
+def queue_otp_email(email, code):
+    """Queue the OTP email; it is sent when the transaction commits, retried by `manage.py send_outbox`"""
     subject = "Your TConnects Login OTP"
     message = f"""
 Hello,
@@ -23,19 +58,5 @@ If you didn't request this OTP, please ignore this email.
 Best regards,
 TConnects Team
     """.strip()
-    
-    try:
-        result = send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[email],
-            fail_silently=False,  # Raise exceptions so we can catch them
-        )
-        
-        print(f"✅ send_mail returned: {result}")
-        return result
-        
-    except Exception as e:
-        print(f"❌ send_mail raised exception: {type(e).__name__}: {str(e)}")
-        raise  # Re-raise so the view can handle it
\ No newline at end of file
+
+    return enqueue(email, subject, message, category="otp", send_now=True)
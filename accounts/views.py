@@ -1,22 +1,25 @@
+import logging
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from django.contrib.auth import authenticate
-from django.utils import timezone
 from django.conf import settings
-from django.core.mail import send_mail
-
-from rest_framework_simplejwt.tokens import RefreshToken
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
+from django.db import transaction
 
+from .cookies import add_cors_headers, clear_auth_cookies, set_auth_cookies
+from .google import GoogleTokenError, verify_google_id_token
 from .models import User, OTP
 from .serializers import RegisterSerializer, UserSerializer
-from .utils import generate_otp, send_otp_email
+from .throttling import SlidingWindowThrottle
+from .tokens import RefreshToken, refresh_with_grace
+from .utils import issue_otp, queue_otp_email
+
+logger = logging.getLogger(__name__)
 
 
 # ---------------------------------------------------------
-# TOKEN / COOKIE UTILITIES - SAFARI OPTIMIZED
+# TOKEN UTILITIES (cookies: accounts/cookies.py)
 # ---------------------------------------------------------
 
 def get_tokens_for_user(user):
@@ -28,83 +31,6 @@ def get_tokens_for_user(user):
     }
 
 
-def set_auth_cookies(response, tokens, request=None):
-    """
-    Set JWT tokens as HTTP-only cookies
-    SAFARI OPTIMIZED - with explicit headers and longer token lifetime
-    """
-    # Get cookie domain from settings (e.g., .tconnects.in)
-    cookie_domain = getattr(settings, "COOKIE_DOMAIN", None)
-    
-    # Safari-compatible cookie options
-    cookie_options = {
-        "httponly": True,
-        "secure": not settings.DEBUG,  # True in production (HTTPS required)
-        "samesite": "None" if not settings.DEBUG else "Lax",  # None for cross-site
-        "path": "/",
-    }
-    
-    # Add domain only if configured (critical for subdomains)
-    if cookie_domain:
-        cookie_options["domain"] = cookie_domain
-    
-    # Set access token cookie (1 hour)
-    response.set_cookie(
-        key="access",
-        value=str(tokens["access"]),
-        max_age=3600,  # 1 hour
-        **cookie_options
-    )
-    
-    # Set refresh token cookie (14 days for Safari compatibility)
-    response.set_cookie(
-        key="refresh",
-        value=str(tokens["refresh"]),
-        max_age=1209600,  # 14 days (Safari works better with longer expiry)
-        **cookie_options
-    )
-    
-    # CRITICAL for Safari - Add explicit CORS headers
-    if request:
-        origin = request.headers.get('Origin', settings.FRONTEND_URL)
-        response['Access-Control-Allow-Origin'] = origin
-        response['Access-Control-Allow-Credentials'] = 'true'
-    
-    return response
-
-
-def clear_auth_cookies(response, request=None):
-    """
-    Clear authentication cookies
-    SAFARI OPTIMIZED - uses same settings as set_auth_cookies
-    """
-    # Get cookie domain from settings
-    cookie_domain = getattr(settings, "COOKIE_DOMAIN", None)
-    
-    # Cookie deletion options - MUST match the set_cookie options
-    cookie_options = {
-        "path": "/",
-        "samesite": "None" if not settings.DEBUG else "Lax",
-        "secure": not settings.DEBUG,
-    }
-    
-    # Add domain only if configured
-    if cookie_domain:
-        cookie_options["domain"] = cookie_domain
-    
-    # Delete both cookies with explicit settings
-    response.delete_cookie("access", **cookie_options)
-    response.delete_cookie("refresh", **cookie_options)
-    
-    # CRITICAL for Safari - Add explicit CORS headers
-    if request:
-        origin = request.headers.get('Origin', settings.FRONTEND_URL)
-        response['Access-Control-Allow-Origin'] = origin
-        response['Access-Control-Allow-Credentials'] = 'true'
-    
-    return response
-
-
 # ---------------------------------------------------------
 # REGISTER - SAFARI OPTIMIZED
 # ---------------------------------------------------------
@@ -136,6 +62,8 @@ class RegisterView(APIView):
 
 class PasswordLoginView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [SlidingWindowThrottle]
+    throttle_scope = "login"
 
     def post(self, request):
         email = request.data.get("email")
@@ -179,6 +107,8 @@ class PasswordLoginView(APIView):
 
 class SendOTPView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [SlidingWindowThrottle]
+    throttle_scope = "otp_send"
 
     def post(self, request):
         email = request.data.get("email")
@@ -203,59 +133,22 @@ class SendOTPView(APIView):
                 status=404
             )
 
-        code = generate_otp()
-        OTP.objects.create(email=email, code=code)
-        
-        print("="*60)
-        print(f"📧 SENDING OTP")
-        print(f"   To: {email}")
-        print(f"   Code: {code}")
-        print("="*60)
-        
-        # Send the email synchronously
-        try:
-            subject = "Your TConnects Login OTP"
-            message = f"""
-Hello,
+        # Sent from a background thread once this commits; failures are retried by send_outbox
+        with transaction.atomic():
+            code = issue_otp(email)
+            queue_otp_email(email, code)
 
-Your One-Time Password (OTP) for logging into TConnects is: {code}
+        logger.info("OTP queued for user %s", user.pk)
 
-This OTP is valid for 10 minutes.
+        response = Response({
+            "detail": "OTP sent successfully",
+            "message": "Please check your email for the OTP"
+        })
 
-If you didn't request this OTP, please ignore this email.
+        # Add CORS headers for Safari
+        add_cors_headers(response, request)
 
-Best regards,
-TConnects Team
-            """.strip()
-            
-            result = send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[email],
-                fail_silently=False,
-            )
-            
-            print(f"✅ Email sent! Result: {result}")
-            
-            response = Response({
-                "detail": "OTP sent successfully",
-                "message": "Please check your email for the OTP"
-            })
-            
-            # Add CORS headers for Safari
-            origin = request.headers.get('Origin', settings.FRONTEND_URL)
-            response['Access-Control-Allow-Origin'] = origin
-            response['Access-Control-Allow-Credentials'] = 'true'
-            
-            return response
-            
-        except Exception as exc:
-            print(f"❌ EMAIL ERROR: {type(exc).__name__}: {str(exc)}")
-            return Response({
-                "detail": "Failed to send OTP email. Please try again.",
-                "error": str(exc)
-            }, status=500)
+        return response
 
 
 # ---------------------------------------------------------
@@ -264,6 +157,8 @@ TConnects Team
 
 class VerifyOTPView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [SlidingWindowThrottle]
+    throttle_scope = "otp_verify"
 
     def post(self, request):
         email = request.data.get("email")
@@ -289,7 +184,7 @@ class VerifyOTPView(APIView):
             )
 
         # Check if expired (10 minutes)
-        if (timezone.now() - otp.created_at).total_seconds() > 600:
+        if otp.is_expired:
             return Response(
                 {"detail": "OTP expired. Please request a new one."}, 
                 status=400
@@ -350,11 +245,7 @@ class GoogleLoginView(APIView):
             )
 
         try:
-            google_info = id_token.verify_oauth2_token(
-                token,
-                google_requests.Request(),
-                settings.SOCIALACCOUNT_PROVIDERS['google']['APP']['client_id']
-            )
+            google_info = verify_google_id_token(token)
 
             email = google_info["email"]
             name = google_info.get("name", "")
@@ -384,12 +275,18 @@ class GoogleLoginView(APIView):
             # Set cookies with Safari optimization
             return set_auth_cookies(response, tokens, request)
             
-        except Exception as e:
-            print(f"❌ Google auth error: {str(e)}")
+        except GoogleTokenError as e:
+            logger.info("Google token rejected: %s", e)
             return Response(
                 {"detail": f"Google authentication failed: {str(e)}"}, 
                 status=400
             )
+        except Exception:
+            logger.exception("Google auth error")
+            return Response(
+                {"detail": "Google authentication failed"},
+                status=400
+            )
 
 
 # ---------------------------------------------------------
@@ -404,9 +301,7 @@ class MeView(APIView):
         response = Response(UserSerializer(request.user).data)
         
         # Add CORS headers for Safari
-        origin = request.headers.get('Origin', settings.FRONTEND_URL)
-        response['Access-Control-Allow-Origin'] = origin
-        response['Access-Control-Allow-Credentials'] = 'true'
+        add_cors_headers(response, request)
         
         return response
 
@@ -436,9 +331,7 @@ class CheckAuthView(APIView):
             })
         
         # Add CORS headers for Safari
-        origin = request.headers.get('Origin', settings.FRONTEND_URL)
-        response['Access-Control-Allow-Origin'] = origin
-        response['Access-Control-Allow-Credentials'] = 'true'
+        add_cors_headers(response, request)
         
         return response
 
@@ -464,63 +357,14 @@ class RefreshTokenView(APIView):
             )
         
         try:
-            refresh = RefreshToken(refresh_token)
-            
-            # Get new access token
-            access_token = str(refresh.access_token)
-            
-            # Optionally rotate refresh token (recommended for security)
-            if settings.SIMPLE_JWT.get('ROTATE_REFRESH_TOKENS', False):
-                refresh.set_jti()
-                refresh.set_exp()
-                new_refresh_token = str(refresh)
-            else:
-                new_refresh_token = refresh_token
-            
+            tokens = refresh_with_grace(refresh_token)
             response = Response({
                 'message': 'Token refreshed successfully'
             })
-            
-            # Get cookie domain
-            cookie_domain = getattr(settings, "COOKIE_DOMAIN", None)
-            
-            # Cookie options
-            cookie_options = {
-                "httponly": True,
-                "secure": not settings.DEBUG,
-                "samesite": "None" if not settings.DEBUG else "Lax",
-                "path": "/",
-            }
-            
-            if cookie_domain:
-                cookie_options["domain"] = cookie_domain
-            
-            # Set new access token
-            response.set_cookie(
-                key="access",
-                value=access_token,
-                max_age=3600,
-                **cookie_options
-            )
-            
-            # Update refresh token if rotated
-            if new_refresh_token != refresh_token:
-                response.set_cookie(
-                    key="refresh",
-                    value=new_refresh_token,
-                    max_age=1209600,
-                    **cookie_options
-                )
-            
-            # Add CORS headers for Safari
-            origin = request.headers.get('Origin', settings.FRONTEND_URL)
-            response['Access-Control-Allow-Origin'] = origin
-            response['Access-Control-Allow-Credentials'] = 'true'
-            
-            return response
+            return set_auth_cookies(response, tokens, request)
             
         except Exception as e:
-            print(f"❌ Token refresh error: {str(e)}")
+            logger.debug("Token refresh failed: %s", e)
             return Response(
                 {'error': 'Invalid or expired refresh token'}, 
                 status=status.HTTP_401_UNAUTHORIZED
@@ -541,10 +385,9 @@ class LogoutView(APIView):
             if refresh_token:
                 token = RefreshToken(refresh_token)
                 token.blacklist()
-                print("✅ Refresh token blacklisted")
         except Exception as e:
             # Token might be invalid or already blacklisted - that's okay
-            print(f"⚠️ Token blacklist warning: {str(e)}")
+            logger.debug("Token blacklist skipped: %s", e)
         
         response = Response({
             "detail": "Logged out successfully",
@@ -603,8 +446,6 @@ class DebugView(APIView):
         response = Response(debug_info)
         
         # Add CORS headers
-        origin = request.headers.get('Origin', settings.FRONTEND_URL)
-        response['Access-Control-Allow-Origin'] = origin
-        response['Access-Control-Allow-Credentials'] = 'true'
+        add_cors_headers(response, request)
         
         return response
\ No newline at end of file
@@ -21,25 +21,10 @@ def build_candidate_snapshot(user):
     except CandidateProfile.DoesNotExist:
         raise serializers.ValidationError("Candidate profile not found. Complete your profile first.")
 
-    # ⭐ REQUIRED FIELD VALIDATION
-    missing_fields = []
-
-    if not user.full_name:
-        missing_fields.append("full name")
-    if not profile.phone_number:
-        missing_fields.append("phone number")
-    if not profile.location:
-        missing_fields.append("location")
-    if not profile.skills:
-        missing_fields.append("skills")
-    if not profile.bio:
-        missing_fields.append("bio")
-    if not profile.resume:
-        missing_fields.append("resume")
-
-    if missing_fields:
+    # ⭐ REQUIRED FIELD VALIDATION (precomputed on profile save)
+    if not profile.is_complete:
         raise serializers.ValidationError(
-            f"Please complete your profile before applying. Missing: {', '.join(missing_fields)}"
+            f"Please complete your profile before applying. Missing: {', '.join(profile.missing_fields)}"
         )
 
     return {
@@ -28,6 +28,7 @@ from .serializers import SavedInternshipSerializer
 from internships.models import Internship
 from .models import JobApplication, InternshipApplication, SavedJob, SavedInternship
 from courses.models import Enrollment
+from accounts.throttling import SlidingWindowThrottle
 
 # ============================================================
 # PERMISSIONS
@@ -54,6 +55,8 @@ class ApplyJobView(CreateAPIView):
     """
     permission_classes = [IsCandidate]
     serializer_class = JobApplicationCreateSerializer
+    throttle_classes = [SlidingWindowThrottle]
+    throttle_scope = "apply"
 
 
 # ============================================================
@@ -67,6 +70,8 @@ class ApplyInternshipView(CreateAPIView):
     """
     permission_classes = [IsCandidate]
     serializer_class = InternshipApplicationCreateSerializer
+    throttle_classes = [SlidingWindowThrottle]
+    throttle_scope = "apply"
 
 
 # ============================================================
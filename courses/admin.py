@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Course, Module, Lesson, Assignment, AssignmentQuestion, Enrollment, LessonProgress, AssignmentSubmission
+from .models import Course, Module, Lesson, Assignment, AssignmentQuestion, Enrollment, LessonProgress, AssignmentSubmission, LessonWatchTime, CourseFunnelDaily, CourseCertificate
+from .grading import regrade_assignment
 
 class LessonInline(admin.TabularInline):
     model = Lesson
@@ -16,6 +17,13 @@ class AssignmentQuestionInline(admin.TabularInline):
 class AssignmentAdmin(admin.ModelAdmin):
     list_display = ("module", "title")
     inlines = [AssignmentQuestionInline]
+    actions = ["regrade_submissions"]
+
+    def regrade_submissions(self, request, queryset):
+        """Re-score submissions after an answer key correction"""
+        changed = sum(regrade_assignment(a) for a in queryset.select_related("module__course"))
+        self.message_user(request, f"{changed} submission score(s) updated.")
+    regrade_submissions.short_description = "Regrade all submissions"
 
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
@@ -31,4 +39,26 @@ admin.site.register(Lesson)
 admin.site.register(Assignment, AssignmentAdmin)
 admin.site.register(Enrollment)
 admin.site.register(LessonProgress)
+admin.site.register(LessonWatchTime)
 admin.site.register(AssignmentSubmission)
+
+
+@admin.register(CourseFunnelDaily)
+class CourseFunnelDailyAdmin(admin.ModelAdmin):
+    list_display = (
+        "day", "course", "module", "enrollments", "lesson_completions",
+        "module_completions", "assignment_submissions", "assignment_passes",
+    )
+    list_filter = ("course",)
+    date_hierarchy = "day"
+    list_select_related = ("course", "module")
+    readonly_fields = list_display
+
+
+@admin.register(CourseCertificate)
+class CourseCertificateAdmin(admin.ModelAdmin):
+    list_display = ("serial", "user", "course", "status", "attempts", "issued_at", "rendered_at")
+    list_filter = ("status",)
+    search_fields = ("serial", "user__email", "course__title")
+    list_select_related = ("user", "course")
+    readonly_fields = ("serial", "image", "attempts", "error", "issued_at", "rendered_at")
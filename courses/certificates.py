@@ -0,0 +1,225 @@
+# courses/certificates.py
+"""
+Course completion certificates.
+
+Requests only create a pending CourseCertificate row; `manage.py render_certificates`
+claims pending rows in batches, draws them with Pillow onto a template that is
+loaded once per worker process, and stores each PNG once as
+certificates/<serial>.png, which is then served as an ordinary media file.
+"""
+
+import io
+import logging
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import Exists, F, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Now
+from django.utils import timezone
+from PIL import Image, ImageDraw, ImageFont
+
+from .models import CourseCertificate, Enrollment, LessonProgress
+
+logger = logging.getLogger(__name__)
+
+CERTIFICATE_SIZE = (1600, 1130)
+BACKGROUND = (255, 253, 247)
+ACCENT = (30, 64, 175)
+INK = (31, 41, 55)
+MUTED = (107, 114, 128)
+
+
+def max_attempts():
+    return getattr(settings, "CERTIFICATE_MAX_ATTEMPTS", 3)
+
+
+def render_timeout():
+    return getattr(settings, "CERTIFICATE_RENDER_TIMEOUT", 300)
+
+
+# ---------------------------------------------------------
+# TEMPLATE ASSETS — loaded once per process
+# ---------------------------------------------------------
+
+@lru_cache(maxsize=1)
+def template_image():
+    """CERTIFICATE_TEMPLATE if configured, otherwise a plain bordered canvas"""
+    path = getattr(settings, "CERTIFICATE_TEMPLATE", "")
+    if path:
+        with Image.open(path) as template:
+            return template.convert("RGB")
+
+    image = Image.new("RGB", CERTIFICATE_SIZE, BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    width, height = CERTIFICATE_SIZE
+    draw.rectangle([30, 30, width - 30, height - 30], outline=ACCENT, width=12)
+    draw.rectangle([60, 60, width - 60, height - 60], outline=ACCENT, width=2)
+    _centered(draw, 200, "CERTIFICATE OF COMPLETION", font(64), ACCENT, width)
+    _centered(draw, 380, "This certifies that", font(36), MUTED, width)
+    _centered(draw, 640, "has successfully completed", font(36), MUTED, width)
+    return image
+
+
+@lru_cache(maxsize=None)
+def font(size):
+    path = getattr(settings, "CERTIFICATE_FONT", "")
+    if path:
+        return ImageFont.truetype(path, size)
+    return ImageFont.load_default(size=size)
+
+
+def _centered(draw, y, text, typeface, fill, width):
+    left, _, right, _ = draw.textbbox((0, 0), text, font=typeface)
+    draw.text(((width - (right - left)) / 2, y), text, font=typeface, fill=fill)
+
+
+def _fit(draw, text, size, max_width):
+    """Largest font size <= `size` at which `text` fits in `max_width`"""
+    while size > 24:
+        left, _, right, _ = draw.textbbox((0, 0), text, font=font(size))
+        if right - left <= max_width:
+            break
+        size -= 4
+    return font(size)
+
+
+def render_image(name, course_title, issued_on, serial):
+    """PNG bytes for one certificate"""
+    image = template_image().copy()
+    draw = ImageDraw.Draw(image)
+    width = image.width
+    max_width = width - 240
+
+    _centered(draw, 470, name, _fit(draw, name, 80, max_width), INK, width)
+    _centered(draw, 730, course_title, _fit(draw, course_title, 60, max_width), INK, width)
+    _centered(draw, 900, f"Issued on {issued_on:%d %B %Y}", font(30), MUTED, width)
+    _centered(draw, 950, f"Certificate ID: {serial}", font(24), MUTED, width)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+# ---------------------------------------------------------
+# QUEUE
+# ---------------------------------------------------------
+
+def completed_enrollments():
+    """Completed enrollments, annotated with `completed_at` (the last lesson completion)"""
+    last_completion = (
+        LessonProgress.objects.filter(
+            user_id=OuterRef("user_id"),
+            lesson__module__course_id=OuterRef("course_id"),
+            completed=True,
+        )
+        .order_by()
+        .values("user_id")
+        .annotate(at=Max("completed_at"))
+        .values("at")
+    )
+    return Enrollment.objects.filter(
+        total_lessons__gt=0, completed_lessons__gte=F("total_lessons")
+    ).annotate(completed_at=Coalesce(Subquery(last_completion), "last_activity_at", Now()))
+
+
+def request_certificate(user, course_id):
+    """Certificate row for a completed enrollment (queued if new), or None if not completed"""
+    completed_at = (
+        completed_enrollments().filter(user=user, course_id=course_id)
+        .values_list("completed_at", flat=True).first()
+    )
+    if completed_at is None:
+        return None
+    certificate, _ = CourseCertificate.objects.get_or_create(
+        user=user, course_id=course_id, defaults={"issued_at": completed_at}
+    )
+    return certificate
+
+
+def queue_completed():
+    """Create pending rows for every completed enrollment that has no certificate yet"""
+    missing = completed_enrollments().filter(
+        ~Exists(CourseCertificate.objects.filter(user_id=OuterRef("user_id"), course_id=OuterRef("course_id")))
+    ).values_list("user_id", "course_id", "completed_at")
+    created = CourseCertificate.objects.bulk_create(
+        [CourseCertificate(user_id=uid, course_id=cid, issued_at=at) for uid, cid, at in missing],
+        ignore_conflicts=True,
+    )
+    return len(created)
+
+
+@transaction.atomic
+def claim_batch(batch_size):
+    """
+    Mark up to `batch_size` renderable rows as rendering and return them. Rows left
+    in rendering longer than CERTIFICATE_RENDER_TIMEOUT (a worker died) are reclaimed,
+    unless they have used up CERTIFICATE_MAX_ATTEMPTS, in which case they are failed.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=render_timeout())
+    CourseCertificate.objects.filter(
+        status="rendering", updated_at__lt=stale, attempts__gte=max_attempts()
+    ).update(status="failed", error="Rendering did not finish (worker lost).", updated_at=now)
+
+    rows = CourseCertificate.objects.filter(
+        Q(status="pending")
+        | Q(status="failed", attempts__lt=max_attempts())
+        | Q(status="rendering", updated_at__lt=stale, attempts__lt=max_attempts())
+    ).order_by("id")
+
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    ids = list(rows.select_for_update(skip_locked=skip_locked).values_list("id", flat=True)[:batch_size])
+    if not ids:
+        return []
+
+    CourseCertificate.objects.filter(id__in=ids).update(
+        status="rendering", attempts=F("attempts") + 1, updated_at=timezone.now()
+    )
+    return list(CourseCertificate.objects.filter(id__in=ids).select_related("user", "course"))
+
+
+def render_batch(batch_size=50):
+    """Render one claimed batch; returns the number of certificates processed"""
+    certificates = claim_batch(batch_size)
+    now = timezone.now()
+
+    for certificate in certificates:
+        name = f"certificates/{certificate.serial}.png"
+        try:
+            data = render_image(
+                certificate.user.full_name or certificate.user.email,
+                certificate.course.title,
+                timezone.localdate(certificate.issued_at),
+                certificate.serial,
+            )
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            certificate.image.name = default_storage.save(name, ContentFile(data))
+            certificate.status = "ready"
+            certificate.error = ""
+            certificate.rendered_at = now
+        except Exception as exc:
+            logger.exception("Rendering certificate %s failed", certificate.serial)
+            certificate.status = "failed"
+            certificate.error = str(exc)[:1000]
+        certificate.updated_at = now
+
+    CourseCertificate.objects.bulk_update(
+        certificates, ["image", "status", "error", "rendered_at", "updated_at"]
+    )
+    return len(certificates)
+
+
+def render_pending(batch_size=50):
+    """Queue newly completed courses, then render until nothing is left. Returns certificates processed."""
+    queue_completed()
+    processed = 0
+    while True:
+        done = render_batch(batch_size)
+        if not done:
+            return processed
+        processed += done
@@ -0,0 +1,188 @@
+# courses/funnel.py
+"""
+Course funnel analytics (enrollment -> module completion -> assignment pass),
+kept in CourseFunnelDaily rows keyed by (course, module, day).
+
+Counters are bumped with single F() UPDATEs from the enroll, lesson-complete
+and submit paths, so reading a funnel never scans learner tables.
+`manage.py rebuild_course_funnel` recomputes the rollups from source rows.
+"""
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import AssignmentSubmission, CourseFunnelDaily, Enrollment, Lesson, LessonProgress, Module
+
+FUNNEL_COUNTERS = (
+    "enrollments",
+    "lesson_completions",
+    "module_completions",
+    "assignment_submissions",
+    "assignment_passes",
+)
+
+
+def pass_score():
+    return getattr(settings, "COURSE_ASSIGNMENT_PASS_SCORE", 60.0)
+
+
+def bump(course_id, module_id=None, day=None, **deltas):
+    """Add `deltas` to one rollup row, creating it on first touch"""
+    deltas = {field: n for field, n in deltas.items() if n}
+    if not deltas:
+        return
+    day = day or timezone.localdate()
+
+    rows = CourseFunnelDaily.objects.filter(course_id=course_id, module_id=module_id, day=day)
+    updates = {field: F(field) + n for field, n in deltas.items()}
+    if rows.update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            CourseFunnelDaily.objects.create(course_id=course_id, module_id=module_id, day=day, **deltas)
+    except IntegrityError:
+        rows.update(**updates)  # created concurrently
+
+
+def record_enrollment(course_id):
+    bump(course_id, enrollments=1)
+
+
+def record_lesson_completions(user, lessons):
+    """
+    `lessons` is an iterable of (module_id, course_id), one per *newly* completed
+    lesson. A module counts as completed when this brings the user's completed
+    lessons in it up to the module's lesson count.
+    """
+    per_module = defaultdict(int)
+    module_course = {}
+    for module_id, course_id in lessons:
+        per_module[module_id] += 1
+        module_course[module_id] = course_id
+    if not per_module:
+        return
+
+    finished = {
+        row["module_id"]
+        for row in Lesson.objects.filter(module_id__in=per_module)
+        .values("module_id")
+        .annotate(
+            total=Count("id"),
+            done=Count("progress", filter=Q(progress__user=user, progress__completed=True)),
+        )
+        if row["done"] >= row["total"]
+    }
+
+    for module_id, n in per_module.items():
+        bump(
+            module_course[module_id], module_id,
+            lesson_completions=n,
+            module_completions=1 if module_id in finished else 0,
+        )
+
+
+def record_submission(assignment, previous_score, score):
+    """`previous_score` is None for a learner's first submission"""
+    threshold = pass_score()
+    first = previous_score is None
+    newly_passed = score >= threshold and (first or previous_score < threshold)
+    bump(
+        assignment.module.course_id, assignment.module_id,
+        assignment_submissions=1 if first else 0,
+        assignment_passes=1 if newly_passed else 0,
+    )
+
+
+def course_funnel(course, start=None, end=None):
+    """Funnel totals per module and per day for `course`, read from the rollups only"""
+    rows = CourseFunnelDaily.objects.filter(course=course)
+    if start:
+        rows = rows.filter(day__gte=start)
+    if end:
+        rows = rows.filter(day__lte=end)
+
+    sums = {field: Sum(field) for field in FUNNEL_COUNTERS}
+    by_module = {row["module_id"]: row for row in rows.values("module_id").annotate(**sums).order_by()}
+    daily = [
+        {field: row[field] or 0 for field in ("day",) + FUNNEL_COUNTERS}
+        for row in rows.values("day").annotate(**sums).order_by("day")
+    ]
+
+    enrollments = (by_module.get(None) or {}).get("enrollments") or 0
+    modules = []
+    for module in Module.objects.filter(course=course).order_by("order").only("id", "title", "order"):
+        row = by_module.get(module.id, {})
+        completed = row.get("module_completions") or 0
+        submitted = row.get("assignment_submissions") or 0
+        passed = row.get("assignment_passes") or 0
+        modules.append({
+            "module_id": module.id,
+            "title": module.title,
+            "order": module.order,
+            "lesson_completions": row.get("lesson_completions") or 0,
+            "module_completions": completed,
+            "completion_rate": round(completed / enrollments * 100, 1) if enrollments else 0.0,
+            "assignment_submissions": submitted,
+            "assignment_passes": passed,
+            "pass_rate": round(passed / submitted * 100, 1) if submitted else 0.0,
+        })
+
+    return {"enrollments": enrollments, "modules": modules, "daily": daily}
+
+
+@transaction.atomic
+def rebuild(course_ids=None):
+    """Recompute rollups from Enrollment / LessonProgress / AssignmentSubmission. Returns rows written."""
+    counts = defaultdict(lambda: dict.fromkeys(FUNNEL_COUNTERS, 0))
+
+    def scoped(qs, course_path):
+        return qs.filter(**{f"{course_path}__in": course_ids}) if course_ids is not None else qs.all()
+
+    enrollments = scoped(Enrollment.objects, "course_id").annotate(day=TruncDate("enrolled_at"))
+    for row in enrollments.values("course_id", "day").annotate(n=Count("id")).order_by():
+        counts[(row["course_id"], None, row["day"])]["enrollments"] = row["n"]
+
+    completed = scoped(LessonProgress.objects.filter(completed=True), "lesson__module__course_id")
+    for row in (
+        completed.annotate(day=TruncDate("completed_at"))
+        .values("lesson__module_id", "lesson__module__course_id", "day")
+        .annotate(n=Count("id")).order_by()
+    ):
+        key = (row["lesson__module__course_id"], row["lesson__module_id"], row["day"])
+        counts[key]["lesson_completions"] = row["n"]
+
+    module_totals = dict(
+        scoped(Lesson.objects, "module__course_id")
+        .values("module_id").annotate(n=Count("id")).order_by().values_list("module_id", "n")
+    )
+    for row in (
+        completed.values("user_id", "lesson__module_id", "lesson__module__course_id")
+        .annotate(done=Count("id"), last=Max("completed_at")).order_by()
+    ):
+        if row["last"] and row["done"] >= module_totals.get(row["lesson__module_id"], 0):
+            key = (row["lesson__module__course_id"], row["lesson__module_id"], timezone.localdate(row["last"]))
+            counts[key]["module_completions"] += 1
+
+    submissions = scoped(AssignmentSubmission.objects, "assignment__module__course_id")
+    for row in (
+        submissions.annotate(day=TruncDate("submitted_at"))
+        .values("assignment__module_id", "assignment__module__course_id", "day")
+        .annotate(n=Count("id"), passed=Count("id", filter=Q(score__gte=pass_score()))).order_by()
+    ):
+        key = (row["assignment__module__course_id"], row["assignment__module_id"], row["day"])
+        counts[key]["assignment_submissions"] = row["n"]
+        counts[key]["assignment_passes"] = row["passed"]
+
+    rollups = [
+        CourseFunnelDaily(course_id=course_id, module_id=module_id, day=day, **values)
+        for (course_id, module_id, day), values in counts.items()
+        if day is not None
+    ]
+    scoped(CourseFunnelDaily.objects, "course_id").delete()
+    CourseFunnelDaily.objects.bulk_create(rollups, batch_size=500)
+    return len(rollups)
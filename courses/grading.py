@@ -0,0 +1,70 @@
+# courses/grading.py
+"""
+MCQ grading against a cached per-assignment answer key.
+
+The key ({question_id: correct_answer}) is cached under the course's
+content_version, which changes whenever an AssignmentQuestion is edited,
+so a corrected key is picked up immediately.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import AssignmentQuestion, AssignmentSubmission
+
+
+def answer_key_cache_key(assignment):
+    return f"answer_key:{assignment.pk}:{assignment.module.course.content_version}"
+
+
+def get_answer_key(assignment):
+    """{str(question_id): str(correct_answer)} for the assignment, cached"""
+    key = answer_key_cache_key(assignment)
+    answer_key = cache.get(key)
+    if answer_key is None:
+        answer_key = {
+            str(qid): str(correct)
+            for qid, correct in AssignmentQuestion.objects.filter(
+                assignment=assignment
+            ).values_list("id", "correct_answer")
+        }
+        cache.set(key, answer_key, getattr(settings, "COURSE_OUTLINE_CACHE_TIMEOUT", 60 * 60))
+    return answer_key
+
+
+def grade(answer_key, answers):
+    """Returns (total, correct, score) for one set of answers"""
+    answers = {str(k): v for k, v in (answers or {}).items()}  # accept int or string keys
+    total = len(answer_key)
+    correct = sum(
+        1 for qid, expected in answer_key.items()
+        if answers.get(qid) is not None and str(answers[qid]) == expected
+    )
+    score = (correct / total) * 100 if total else 0.0
+    return total, correct, score
+
+
+def regrade_assignment(assignment, batch_size=500):
+    """
+    Re-score every submission of `assignment` against the current key.
+    Returns the number of submissions whose score changed.
+    """
+    answer_key = get_answer_key(assignment)
+    changed = 0
+    batch = []
+
+    submissions = AssignmentSubmission.objects.filter(assignment=assignment).only("id", "answers", "score")
+    for sub in submissions.iterator(chunk_size=batch_size):
+        _, _, score = grade(answer_key, sub.answers)
+        if score != sub.score:
+            sub.score = score
+            batch.append(sub)
+        if len(batch) >= batch_size:
+            AssignmentSubmission.objects.bulk_update(batch, ["score"])
+            changed += len(batch)
+            batch = []
+
+    if batch:
+        AssignmentSubmission.objects.bulk_update(batch, ["score"])
+        changed += len(batch)
+    return changed
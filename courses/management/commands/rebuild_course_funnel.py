@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from courses.funnel import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute CourseFunnelDaily rollups from enrollments, lesson progress and submissions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("course_ids", nargs="*", type=int, help="Only rebuild these courses (default: all).")
+
+    def handle(self, *args, **options):
+        written = rebuild(options["course_ids"] or None)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} funnel rollup row(s)."))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from courses.models import Enrollment
+from courses.progress import reconcile
+
+
+class Command(BaseCommand):
+    help = "Recompute Enrollment progress counters from LessonProgress and repair drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--course", type=int, help="Only reconcile enrollments for this course id.")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        queryset = Enrollment.objects.all()
+        if options["course"]:
+            queryset = queryset.filter(course_id=options["course"])
+
+        fixed = reconcile(queryset, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {fixed} enrollment(s)."))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.grading import regrade_assignment
+from courses.models import Assignment
+
+
+class Command(BaseCommand):
+    help = "Re-score all submissions of one or more assignments against the current answer key."
+
+    def add_arguments(self, parser):
+        parser.add_argument("assignment_ids", nargs="*", type=int)
+        parser.add_argument("--all", action="store_true", help="Regrade every assignment.")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            assignments = Assignment.objects.all()
+        elif options["assignment_ids"]:
+            assignments = Assignment.objects.filter(id__in=options["assignment_ids"])
+        else:
+            raise CommandError("Pass one or more assignment ids, or --all.")
+
+        for assignment in assignments.select_related("module__course"):
+            changed = regrade_assignment(assignment, batch_size=options["batch_size"])
+            self.stdout.write(f"{assignment}: {changed} submission score(s) updated.")
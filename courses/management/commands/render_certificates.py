@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from courses.certificates import render_pending
+
+
+class Command(BaseCommand):
+    help = "Queue certificates for completed courses and render pending ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep running and poll for new certificates.")
+        parser.add_argument("--interval", type=float, default=10.0, help="Seconds between polls with --loop.")
+        parser.add_argument("--batch-size", type=int, default=50)
+
+    def handle(self, *args, **options):
+        while True:
+            processed = render_pending(batch_size=options["batch_size"])
+            if processed:
+                self.stdout.write(f"Rendered {processed} certificate(s).")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
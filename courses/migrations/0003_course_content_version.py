@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:30
+
+import courses.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_course_course_includes_course_requirements_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='content_version',
+            field=models.CharField(default=courses.models.new_content_version, editable=False, max_length=32),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:31
+
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    Enrollment = apps.get_model('courses', 'Enrollment')
+    Lesson = apps.get_model('courses', 'Lesson')
+    LessonProgress = apps.get_model('courses', 'LessonProgress')
+
+    totals = dict(
+        Lesson.objects.values_list('module__course_id').annotate(n=models.Count('id'))
+    )
+    completed = {
+        (row['user_id'], row['lesson__module__course_id']): row
+        for row in LessonProgress.objects.filter(completed=True)
+        .values('user_id', 'lesson__module__course_id')
+        .annotate(n=models.Count('id'), at=models.Max('completed_at'))
+    }
+
+    enrollments = list(Enrollment.objects.all())
+    for e in enrollments:
+        row = completed.get((e.user_id, e.course_id))
+        e.total_lessons = totals.get(e.course_id, 0)
+        e.completed_lessons = row['n'] if row else 0
+        e.last_activity_at = row['at'] if row else None
+    Enrollment.objects.bulk_update(
+        enrollments, ['total_lessons', 'completed_lessons', 'last_activity_at'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_course_content_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollment',
+            name='completed_lessons',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='last_activity_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='total_lessons',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:34
+
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, models
+
+
+def parse_price(price):
+    # Frozen copy of courses.models.parse_price as of this migration
+    text = (price or "").strip().lower()
+    if text in {"free", "0", ""}:
+        return Decimal("0")
+    match = re.search(r"\d[\d,]*(?:\.\d+)?", text)
+    if not match:
+        return None
+    try:
+        return Decimal(match.group(0).replace(",", ""))
+    except InvalidOperation:
+        return None
+
+
+def backfill_price_amount(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    courses = list(Course.objects.only('id', 'price'))
+    for course in courses:
+        course.price_amount = parse_price(course.price)
+    Course.objects.bulk_update(courses, ['price_amount'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_enrollment_progress_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='price_amount',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['-created_at'], name='courses_cou_created_c141ec_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['level'], name='courses_cou_level_bf0a39_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['language'], name='courses_cou_languag_94bd99_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['price_amount'], name='courses_cou_price_a_e2d98f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['rating'], name='courses_cou_rating_b9c925_idx'),
+        ),
+        migrations.RunPython(backfill_price_amount, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_lessonwatchtime'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseFunnelDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('enrollments', models.PositiveIntegerField(default=0)),
+                ('lesson_completions', models.PositiveIntegerField(default=0)),
+                ('module_completions', models.PositiveIntegerField(default=0)),
+                ('assignment_submissions', models.PositiveIntegerField(default=0)),
+                ('assignment_passes', models.PositiveIntegerField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='funnel_rollups', to='courses.course')),
+                ('module', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='funnel_rollups', to='courses.module')),
+            ],
+            options={
+                'ordering': ['day'],
+                'constraints': [models.UniqueConstraint(fields=('course', 'module', 'day'), name='funnel_course_module_day'), models.UniqueConstraint(condition=models.Q(('module__isnull', True)), fields=('course', 'day'), name='funnel_course_day')],
+            },
+        ),
+    ]
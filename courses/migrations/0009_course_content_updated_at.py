@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:41
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_course_certificates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='content_updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
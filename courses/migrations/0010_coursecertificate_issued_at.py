@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_course_content_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='coursecertificate',
+            name='issued_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from django.utils.text import slugify
 from django.core.validators import MinValueValidator
 
@@ -8,6 +9,32 @@ from django.db import models
 from django.utils.text import slugify
 from django.core.validators import MinValueValidator
 from django.contrib.postgres.fields import JSONField  # Only if using Postgres
+import uuid
+import re
+from decimal import Decimal, InvalidOperation
+
+FREE_PRICE_LABELS = {"free", "0", ""}
+
+
+def new_content_version():
+    return uuid.uuid4().hex
+
+
+def parse_price(price):
+    """
+    Numeric value of the free-text price ("FREE" -> 0, "₹1,499" -> 1499).
+    Returns None if no number can be found.
+    """
+    text = (price or "").strip().lower()
+    if text in FREE_PRICE_LABELS:
+        return Decimal("0")
+    match = re.search(r"\d[\d,]*(?:\.\d+)?", text)
+    if not match:
+        return None
+    try:
+        return Decimal(match.group(0).replace(",", ""))
+    except InvalidOperation:
+        return None
 
 
 class Course(models.Model):
@@ -17,6 +44,8 @@ class Course(models.Model):
     description = models.TextField(blank=True)
 
     price = models.CharField(max_length=64, default="FREE")
+    # Parsed from `price` on save so price filters/sorting can use an index
+    price_amount = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True, editable=False)
     rating = models.FloatField(default=0.0, validators=[MinValueValidator(0.0)])
     language = models.CharField(max_length=64, default="English")
 
@@ -37,14 +66,40 @@ class Course(models.Model):
     # Example: {"videos": 15, "modules": 5, "resources": 8, "access": "Lifetime"}
     course_includes = models.JSONField(default=dict, blank=True)
 
+    # Changes whenever the course or any of its modules, lessons, assignments
+    # or questions change (see courses/signals.py). Keys the cached outline.
+    content_version = models.CharField(max_length=32, default=new_content_version, editable=False)
+    # When content_version last changed; sent as Last-Modified
+    content_updated_at = models.DateTimeField(default=timezone.now, editable=False)
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at"]),
+            models.Index(fields=["level"]),
+            models.Index(fields=["language"]),
+            models.Index(fields=["price_amount"]),
+            models.Index(fields=["rating"]),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)[:255]
+        self.price_amount = parse_price(self.price)
+        self.content_version = new_content_version()
+        self.content_updated_at = timezone.now()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = set(update_fields) | {"price_amount", "content_version", "content_updated_at"}
         super().save(*args, **kwargs)
 
+    @classmethod
+    def bump_content_version(cls, **filters):
+        """Invalidate cached outlines for the course(s) matching `filters`"""
+        return cls.objects.filter(**filters).update(
+            content_version=new_content_version(), content_updated_at=timezone.now()
+        )
+
     def __str__(self):
         return f"{self.title} ({self.pk})"
 
@@ -103,9 +158,21 @@ class Enrollment(models.Model):
     course = models.ForeignKey(Course, related_name="enrollments", on_delete=models.CASCADE)
     enrolled_at = models.DateTimeField(auto_now_add=True)
 
+    # Denormalized progress, maintained by lesson_complete_view and lesson add/remove
+    # signals; `manage.py reconcile_enrollment_progress` repairs drift.
+    completed_lessons = models.PositiveIntegerField(default=0)
+    total_lessons = models.PositiveIntegerField(default=0)
+    last_activity_at = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         unique_together = ("user", "course")
 
+    @property
+    def progress(self):
+        if not self.total_lessons:
+            return 0
+        return min(int((self.completed_lessons / self.total_lessons) * 100), 100)
+
 
 class LessonProgress(models.Model):
     user = models.ForeignKey(User, related_name="lesson_progress", on_delete=models.CASCADE)
@@ -126,3 +193,70 @@ class AssignmentSubmission(models.Model):
 
     class Meta:
         unique_together = ("user", "assignment")
+
+
+class LessonWatchTime(models.Model):
+    """Accumulated video watch seconds, flushed in bulk from the heartbeat buffer (courses/watchtime.py)"""
+    user = models.ForeignKey(User, related_name="lesson_watch_times", on_delete=models.CASCADE)
+    lesson = models.ForeignKey(Lesson, related_name="watch_times", on_delete=models.CASCADE)
+    seconds = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("user", "lesson")
+
+
+class CourseFunnelDaily(models.Model):
+    """
+    Per-day funnel rollup, bumped incrementally by courses/funnel.py.
+    module=None rows hold course-level counts (enrollments); module rows hold
+    lesson/module completions and assignment submissions/passes.
+    """
+    course = models.ForeignKey(Course, related_name="funnel_rollups", on_delete=models.CASCADE)
+    module = models.ForeignKey(Module, related_name="funnel_rollups", null=True, blank=True, on_delete=models.CASCADE)
+    day = models.DateField()
+
+    enrollments = models.PositiveIntegerField(default=0)
+    lesson_completions = models.PositiveIntegerField(default=0)
+    module_completions = models.PositiveIntegerField(default=0)
+    assignment_submissions = models.PositiveIntegerField(default=0)
+    assignment_passes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["day"]
+        constraints = [
+            models.UniqueConstraint(fields=["course", "module", "day"], name="funnel_course_module_day"),
+            models.UniqueConstraint(
+                fields=["course", "day"], condition=models.Q(module__isnull=True), name="funnel_course_day"
+            ),
+        ]
+
+
+def new_certificate_serial():
+    return uuid.uuid4().hex
+
+
+class CourseCertificate(models.Model):
+    """Completion certificate, rendered once per (user, course) by `manage.py render_certificates`"""
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("rendering", "Rendering"),
+        ("ready", "Ready"),
+        ("failed", "Failed"),
+    ]
+
+    user = models.ForeignKey(User, related_name="certificates", on_delete=models.CASCADE)
+    course = models.ForeignKey(Course, related_name="certificates", on_delete=models.CASCADE)
+    # Unguessable; names the stored image so it can be served as a plain media file
+    serial = models.CharField(max_length=32, unique=True, default=new_certificate_serial, editable=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending", db_index=True)
+    image = models.FileField(upload_to="certificates/", blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    issued_at = models.DateTimeField(default=timezone.now)  # course completion time
+    updated_at = models.DateTimeField(auto_now=True)
+    rendered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ("user", "course")
@@ -0,0 +1,138 @@
+# courses/outline.py
+"""
+Cached course outline (modules -> lessons / assignment -> questions).
+
+The outline is built once from a single prefetch tree and cached under the
+course's content_version, so edits never serve a stale outline. Per-user
+state (enrolled, lesson_progress, assignment_status) is merged on top.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Exists, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from tconnects_backend.cache import get_cache
+
+from .models import Course, Module, Enrollment, LessonProgress, AssignmentSubmission
+from .serializers import CourseDetailSerializer
+
+
+def outline_prefetch():
+    return Prefetch(
+        "modules",
+        queryset=Module.objects.select_related("assignment").prefetch_related(
+            "lessons",
+            "assignment__questions",
+        ),
+    )
+
+
+def outline_cache_key(course):
+    return f"course_outline:{course.pk}:{course.content_version}"
+
+
+def build_course_outline(course):
+    course = Course.objects.prefetch_related(outline_prefetch()).get(pk=course.pk)
+    return dict(CourseDetailSerializer(course).data)
+
+
+def get_course_outline(course):
+    """Serialized CourseDetailSerializer payload for `course`, from the two-tier cache when possible"""
+    return get_cache().get_or_set(
+        outline_cache_key(course),
+        lambda: build_course_outline(course),
+        getattr(settings, "COURSE_OUTLINE_CACHE_TIMEOUT", 60 * 60),
+        tags=[f"course:{course.pk}"],
+    )
+
+
+def with_enrollment(queryset, user):
+    """
+    Annotate `enrolled` and `enrollment_activity_at` (last progress or submission,
+    else enrollment time) so the enrollment check rides along with the course lookup
+    """
+    if not user.is_authenticated:
+        return queryset
+    enrollment = Enrollment.objects.filter(user=user, course=OuterRef("pk"))
+    return queryset.annotate(
+        enrolled=Exists(enrollment),
+        enrollment_activity_at=Subquery(
+            enrollment.annotate(at=Coalesce("last_activity_at", "enrolled_at")).values("at")[:1]
+        ),
+    )
+
+
+def user_overlay(course, user, enrolled=None):
+    """Per-user learn state; two queries for an authenticated user, none otherwise"""
+    if not user.is_authenticated:
+        return {"enrolled": False, "lesson_progress": {}, "assignment_status": {}}
+
+    if enrolled is None:
+        enrolled = getattr(course, "enrolled", None)
+    if enrolled is None:
+        enrolled = Enrollment.objects.filter(user=user, course=course).exists()
+
+    lesson_progress = dict(
+        LessonProgress.objects.filter(
+            user=user, lesson__module__course=course
+        ).values_list("lesson_id", "completed")
+    )
+
+    submissions = AssignmentSubmission.objects.filter(
+        user=user, assignment__module__course=course
+    ).values_list("assignment_id", "score", "answers")
+    assignment_status = {
+        assignment_id: {
+            "submitted": True,
+            "score": score,
+            "answers": answers,
+        }
+        for assignment_id, score, answers in submissions
+    }
+
+    return {
+        "enrolled": enrolled,
+        "lesson_progress": lesson_progress,
+        "assignment_status": assignment_status,
+    }
+
+
+# ---------------------------------------------------------
+# CONDITIONAL GET — ETag / Last-Modified and 304 revalidation
+# ---------------------------------------------------------
+
+def outline_etag(course, overlay=None):
+    """Strong ETag from the content version, plus a digest of the per-user overlay if given"""
+    if overlay is None:
+        return f'"{course.content_version}"'
+    digest = hashlib.sha1(
+        json.dumps(overlay, sort_keys=True, cls=DjangoJSONEncoder).encode()
+    ).hexdigest()[:16]
+    return f'"{course.content_version}-{digest}"'
+
+
+def not_modified(request, etag, last_modified, private=False):
+    """HttpResponseNotModified if the client's copy is current, else None"""
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp())
+    )
+    if response is not None:
+        stamp(response, etag, last_modified, private)
+    return response
+
+
+def stamp(response, etag, last_modified, private=False):
+    """Validators plus revalidate-every-time caching (public unless per-user)"""
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified.timestamp())
+    if private:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
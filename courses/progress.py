@@ -0,0 +1,205 @@
+# courses/progress.py
+"""
+Denormalized enrollment progress (Enrollment.completed_lessons / total_lessons /
+last_activity_at). All counter changes are single UPDATEs with F() expressions.
+"""
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Max, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from . import funnel
+from .models import Enrollment, Lesson, LessonProgress
+
+
+def course_lesson_total(course_id):
+    return Lesson.objects.filter(module__course_id=course_id).count()
+
+
+def initial_counters(user, course_id):
+    """Defaults for a new Enrollment (progress may predate a re-enrollment)"""
+    return {
+        "total_lessons": course_lesson_total(course_id),
+        "completed_lessons": LessonProgress.objects.filter(
+            user=user, completed=True, lesson__module__course_id=course_id
+        ).count(),
+    }
+
+
+@transaction.atomic
+def complete_lesson(user, lesson, course_id, completed_at=None):
+    """
+    Mark one lesson complete and bump the enrollment counter if it was not already.
+    Returns False when the user is not enrolled.
+    """
+    completed_at = completed_at or timezone.now()
+
+    touched = Enrollment.objects.filter(user=user, course_id=course_id).update(
+        last_activity_at=completed_at
+    )
+    if not touched:
+        return False
+
+    lp, created = LessonProgress.objects.select_for_update().get_or_create(
+        user=user, lesson=lesson,
+        defaults={"completed": True, "completed_at": completed_at},
+    )
+    newly_completed = created or not lp.completed
+    if not created:
+        lp.completed = True
+        lp.completed_at = completed_at
+        lp.save(update_fields=["completed", "completed_at"])
+
+    if newly_completed:
+        Enrollment.objects.filter(user=user, course_id=course_id).update(
+            completed_lessons=F("completed_lessons") + 1
+        )
+        funnel.record_lesson_completions(user, [(lesson.module_id, course_id)])
+    return True
+
+
+def lesson_added(lesson):
+    Enrollment.objects.filter(course__modules=lesson.module_id).update(
+        total_lessons=F("total_lessons") + 1
+    )
+
+
+def lesson_removed(lesson):
+    """Call before the lesson (and its LessonProgress rows) are deleted"""
+    enrollments = Enrollment.objects.filter(course__modules=lesson.module_id)
+    completed_by = LessonProgress.objects.filter(lesson=lesson, completed=True).values("user_id")
+
+    enrollments.filter(user_id__in=completed_by).update(
+        completed_lessons=Greatest(F("completed_lessons") - 1, Value(0))
+    )
+    enrollments.update(total_lessons=Greatest(F("total_lessons") - 1, Value(0)))
+
+
+def reconcile(queryset=None, batch_size=500):
+    """Recompute counters from LessonProgress / Lesson; returns number of rows fixed"""
+    queryset = Enrollment.objects.all() if queryset is None else queryset
+
+    totals = (
+        Lesson.objects.filter(module__course_id=OuterRef("course_id"))
+        .order_by().values("module__course_id").annotate(n=Count("id")).values("n")
+    )
+    progress = LessonProgress.objects.filter(
+        user_id=OuterRef("user_id"),
+        lesson__module__course_id=OuterRef("course_id"),
+        completed=True,
+    ).order_by().values("user_id")
+    completed = progress.annotate(n=Count("id")).values("n")
+    last_completed = progress.annotate(at=Max("completed_at")).values("at")
+
+    rows = queryset.annotate(
+        actual_total=Coalesce(Subquery(totals, output_field=IntegerField()), 0),
+        actual_completed=Coalesce(Subquery(completed, output_field=IntegerField()), 0),
+        actual_last=Subquery(last_completed),
+    )
+
+    fixed = []
+    for e in rows.iterator(chunk_size=batch_size):
+        last = e.last_activity_at
+        if e.actual_last and (last is None or e.actual_last > last):
+            last = e.actual_last
+        if (e.total_lessons, e.completed_lessons, e.last_activity_at) != (e.actual_total, e.actual_completed, last):
+            e.total_lessons = e.actual_total
+            e.completed_lessons = e.actual_completed
+            e.last_activity_at = last
+            fixed.append(e)
+
+    Enrollment.objects.bulk_update(
+        fixed, ["total_lessons", "completed_lessons", "last_activity_at"], batch_size=batch_size
+    )
+    return len(fixed)
+
+
+@transaction.atomic
+def sync_completions(user, completions):
+    """
+    Batch upsert of lesson completions from offline/mobile clients.
+
+    `completions` maps lesson_id -> client completed_at (None = now; future
+    timestamps are clamped). Enrollment is checked once per course and
+    counters are bumped with one UPDATE for all courses.
+
+    Returns (accepted lesson ids, rejected lesson ids, course ids touched).
+    """
+    now = timezone.now()
+    completions = {
+        lesson_id: min(at, now) if at else now
+        for lesson_id, at in completions.items()
+    }
+
+    lesson_module = {
+        lid: (module_id, course_id)
+        for lid, module_id, course_id in Lesson.objects.filter(id__in=completions).values_list(
+            "id", "module_id", "module__course_id"
+        )
+    }
+    lesson_course = {lid: course_id for lid, (_, course_id) in lesson_module.items()}
+    # Row-locking the enrollments serializes concurrent syncs for this user, and
+    # complete_lesson (its UPDATE takes the same lock), so the LessonProgress read
+    # below already sees every row a competing completion inserted.
+    enrolled = set(
+        Enrollment.objects.select_for_update().filter(
+            user=user, course_id__in=set(lesson_course.values())
+        ).values_list("course_id", flat=True)
+    )
+
+    accepted = [lid for lid in completions if lesson_course.get(lid) in enrolled]
+    rejected = [lid for lid in completions if lid not in accepted]
+    if not accepted:
+        return accepted, rejected, set()
+
+    existing = {
+        lp.lesson_id: lp
+        for lp in LessonProgress.objects.select_for_update().filter(user=user, lesson_id__in=accepted)
+    }
+
+    to_create = []
+    to_update = []
+    newly_completed = {}
+    newly_completed_lessons = []
+    last_activity = {}
+    for lesson_id in accepted:
+        at = completions[lesson_id]
+        course_id = lesson_course[lesson_id]
+        last_activity[course_id] = max(last_activity.get(course_id, at), at)
+
+        lp = existing.get(lesson_id)
+        if lp is None:
+            to_create.append(LessonProgress(user=user, lesson_id=lesson_id, completed=True, completed_at=at))
+        elif not lp.completed:
+            lp.completed = True
+            lp.completed_at = at
+            to_update.append(lp)
+        else:
+            continue  # replayed completion; keep the original timestamp
+        newly_completed[course_id] = newly_completed.get(course_id, 0) + 1
+        newly_completed_lessons.append(lesson_module[lesson_id])
+
+    # backstop for writers outside the enrollment lock (admin, shell); their
+    # rows are skipped and `reconcile` repairs any counter drift they cause
+    LessonProgress.objects.bulk_create(to_create, ignore_conflicts=True)
+    LessonProgress.objects.bulk_update(to_update, ["completed", "completed_at"])
+
+    courses = set(last_activity)
+    Enrollment.objects.filter(user=user, course_id__in=courses).update(
+        completed_lessons=F("completed_lessons") + Case(
+            *[When(course_id=cid, then=Value(n)) for cid, n in newly_completed.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+        # never move it backwards: it is the learn page's Last-Modified
+        last_activity_at=Case(
+            *[
+                When(course_id=cid, then=Greatest(Coalesce(F("last_activity_at"), Value(at)), Value(at)))
+                for cid, at in last_activity.items()
+            ],
+            default=F("last_activity_at"),
+        ),
+    )
+    funnel.record_lesson_completions(user, newly_completed_lessons)
+    return accepted, rejected, courses
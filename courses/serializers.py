@@ -38,7 +38,7 @@ class ModuleSerializer(serializers.ModelSerializer):
 class CourseListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Course
-        fields = ("id", "title", "slug", "thumbnail", "price", "rating", "language")
+        fields = ("id", "title", "slug", "thumbnail", "price", "price_amount", "rating", "language", "level")
 
 
 class CourseDetailSerializer(serializers.ModelSerializer):
@@ -83,3 +83,16 @@ class AssignmentSubmissionSerializer(serializers.ModelSerializer):
         model = AssignmentSubmission
         fields = ("id", "user", "assignment", "answers", "score", "submitted_at")
         read_only_fields = ("user", "score", "submitted_at")
+
+
+class LessonCompletionSerializer(serializers.Serializer):
+    lesson_id = serializers.IntegerField(min_value=1)
+    completed_at = serializers.DateTimeField(required=False, allow_null=True)
+
+
+class ProgressSyncSerializer(serializers.Serializer):
+    completions = LessonCompletionSerializer(many=True, allow_empty=False, max_length=500)
+
+
+class WatchHeartbeatSerializer(serializers.Serializer):
+    seconds = serializers.IntegerField(min_value=1)
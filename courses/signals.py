@@ -0,0 +1,56 @@
+# courses/signals.py
+
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from tconnects_backend.cache import invalidate
+
+from . import progress
+from .models import Course, Module, Lesson, Assignment, AssignmentQuestion
+
+
+# ---------------------------------------------------------
+# SHARED CACHE TAGS — catalogue pages and the course itself
+# ---------------------------------------------------------
+
+@receiver([post_save, post_delete], sender=Course)
+def invalidate_course_caches(sender, instance, **kwargs):
+    invalidate("courses", f"course:{instance.pk}")
+
+
+# ---------------------------------------------------------
+# CONTENT VERSION — any outline change invalidates the cached outline
+# ---------------------------------------------------------
+
+@receiver([post_save, post_delete], sender=Module)
+def bump_version_for_module(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Course.bump_content_version(pk=instance.course_id)
+
+
+@receiver([post_save, post_delete], sender=Lesson)
+@receiver([post_save, post_delete], sender=Assignment)
+def bump_version_for_module_child(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Course.bump_content_version(modules__id=instance.module_id)
+
+
+@receiver([post_save, post_delete], sender=AssignmentQuestion)
+def bump_version_for_question(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Course.bump_content_version(modules__assignment__id=instance.assignment_id)
+
+
+# ---------------------------------------------------------
+# ENROLLMENT COUNTERS — keep total_lessons / completed_lessons in step
+# ---------------------------------------------------------
+
+@receiver(post_save, sender=Lesson)
+def count_added_lesson(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        progress.lesson_added(instance)
+
+
+@receiver(pre_delete, sender=Lesson)
+def uncount_removed_lesson(sender, instance, **kwargs):
+    progress.lesson_removed(instance)
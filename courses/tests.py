@@ -1,3 +1,672 @@
-from django.test import TestCase
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Course, Module, Lesson, Enrollment, Assignment, AssignmentQuestion, AssignmentSubmission, LessonWatchTime, CourseFunnelDaily, CourseCertificate, LessonProgress
+from tconnects_backend.cache import get_cache
+
+from . import certificates, watchtime
+from .watchtime import start_flusher
+
+User = get_user_model()
+
+
+class CourseProgressTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="learner@example.com", full_name="Learner", password="pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_course(self, lessons=3):
+        course = Course.objects.create(title=f"Course {Course.objects.count()}")
+        module = Module.objects.create(course=course, title="Module", order=0)
+        for n in range(lessons):
+            Lesson.objects.create(module=module, title=f"Lesson {n}", order=n)
+        return course
+
+    def enroll(self, course):
+        self.client.post(f"/api/courses/{course.id}/enroll/")
+
+    def complete(self, lesson):
+        return self.client.post(f"/api/courses/lesson/{lesson.id}/complete/")
+
+    def lessons(self, course):
+        return list(Lesson.objects.filter(module__course=course).order_by("order"))
+
+
+class MyCoursesQueryCountTests(CourseProgressTestCase):
+    """my_courses_view must not issue per-enrollment queries"""
+
+    def enroll_in_courses(self, count, lessons_per_course=3, completed_per_course=1):
+        for _ in range(count):
+            course = self.create_course(lessons_per_course)
+            self.enroll(course)
+            for lesson in self.lessons(course)[:completed_per_course]:
+                self.complete(lesson)
+
+    def test_query_count_is_constant(self):
+        self.enroll_in_courses(2)
+        with self.assertNumQueries(1):
+            self.client.get("/api/courses/my-courses/")
+
+        self.enroll_in_courses(30)
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/courses/my-courses/")
+
+        self.assertEqual(len(response.data), 32)
+
+    def test_progress_values(self):
+        self.enroll_in_courses(1, lessons_per_course=4, completed_per_course=1)
+        self.enroll_in_courses(1, lessons_per_course=2, completed_per_course=2)
+
+        response = self.client.get("/api/courses/my-courses/")
+        by_title = {item["title"]: item for item in response.data}
+
+        self.assertEqual(by_title["Course 0"]["progress"], 25)
+        self.assertEqual(by_title["Course 0"]["status"], "Ongoing")
+        self.assertEqual(by_title["Course 1"]["progress"], 100)
+        self.assertEqual(by_title["Course 1"]["status"], "Completed")
+
+
+class OutlineQueryCountTests(CourseProgressTestCase):
+    """Learn page: at most three queries once the outline is cached, however big the course"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        get_cache().clear_local()
+        self.addCleanup(cache.clear)
+        self.addCleanup(get_cache().clear_local)
+
+        self.course = self.create_course(lessons=4)
+        for order in range(1, 4):
+            module = Module.objects.create(course=self.course, title=f"Module {order}", order=order)
+            Lesson.objects.create(module=module, title="Lesson", order=0)
+            assignment = Assignment.objects.create(module=module, title="Quiz")
+            for n in range(3):
+                AssignmentQuestion.objects.create(assignment=assignment, question=f"Q{n}", options=["a", "b"], correct_answer="a")
+        self.enroll(self.course)
+        self.complete(self.lessons(self.course)[0])
+        self.url = f"/api/courses/{self.course.slug}/{self.course.id}/learn/"
+
+    def test_cold_outline_is_one_prefetch_tree(self):
+        # course + overlay (3), then course, modules+assignments, lessons, questions (4)
+        with self.assertNumQueries(7):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data["modules"]), 4)
+
+    def test_warm_learn_page(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data["lesson_progress"]), 1)
+
+        get_cache().clear_local()  # another worker: outline comes from the shared tier
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+        with self.assertNumQueries(1):
+            APIClient().get(self.url)
+
+
+class EnrollmentCounterTests(CourseProgressTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.course = self.create_course(lessons=3)
+        self.enroll(self.course)
+
+    def enrollment(self):
+        return Enrollment.objects.get(user=self.user, course=self.course)
+
+    def test_enroll_sets_total(self):
+        self.assertEqual(self.enrollment().total_lessons, 3)
+        self.assertEqual(self.enrollment().completed_lessons, 0)
+
+    def test_complete_is_idempotent(self):
+        lesson = self.lessons(self.course)[0]
+        self.complete(lesson)
+        self.complete(lesson)
+
+        enrollment = self.enrollment()
+        self.assertEqual(enrollment.completed_lessons, 1)
+        self.assertIsNotNone(enrollment.last_activity_at)
+
+    def test_complete_requires_enrollment(self):
+        other = self.create_course(lessons=1)
+        response = self.complete(self.lessons(other)[0])
+        self.assertEqual(response.status_code, 403)
+
+    def test_lesson_add_and_remove_adjust_counters(self):
+        first = self.lessons(self.course)[0]
+        self.complete(first)
+
+        Lesson.objects.create(module=first.module, title="Extra", order=10)
+        self.assertEqual(self.enrollment().total_lessons, 4)
+
+        first.delete()
+        enrollment = self.enrollment()
+        self.assertEqual(enrollment.total_lessons, 3)
+        self.assertEqual(enrollment.completed_lessons, 0)
+
+    def test_reconcile_repairs_drift(self):
+        self.complete(self.lessons(self.course)[0])
+        Enrollment.objects.filter(pk=self.enrollment().pk).update(total_lessons=99, completed_lessons=7)
+
+        call_command("reconcile_enrollment_progress", stdout=StringIO())
+
+        enrollment = self.enrollment()
+        self.assertEqual(enrollment.total_lessons, 3)
+        self.assertEqual(enrollment.completed_lessons, 1)
+
+
+class ProgressSyncTests(CourseProgressTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.course = self.create_course(lessons=4)
+        self.other = self.create_course(lessons=2)
+        self.enroll(self.course)
+
+    def sync(self, completions):
+        return self.client.post("/api/courses/progress/sync/", {"completions": completions}, format="json")
+
+    def test_batch_sync_updates_progress(self):
+        lessons = self.lessons(self.course)
+        foreign = self.lessons(self.other)[0]
+        self.complete(lessons[0])
+
+        response = self.sync([
+            {"lesson_id": lessons[0].id, "completed_at": "2024-01-01T00:00:00Z"},
+            {"lesson_id": lessons[1].id, "completed_at": "2024-01-02T00:00:00Z"},
+            {"lesson_id": lessons[2].id},
+            {"lesson_id": foreign.id},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(response.data["accepted"]), sorted(l.id for l in lessons[:3]))
+        self.assertEqual(response.data["rejected"], [foreign.id])
+        self.assertEqual(response.data["courses"][self.course.id]["completed_lessons"], 3)
+        self.assertEqual(response.data["courses"][self.course.id]["progress"], 75)
+
+    def test_replay_is_idempotent(self):
+        payload = [{"lesson_id": lesson.id} for lesson in self.lessons(self.course)]
+        self.sync(payload)
+        response = self.sync(payload)
+
+        self.assertEqual(response.data["courses"][self.course.id]["completed_lessons"], 4)
+        self.assertEqual(response.data["courses"][self.course.id]["progress"], 100)
+
+    def test_late_sync_does_not_move_activity_backwards(self):
+        lessons = self.lessons(self.course)
+        self.sync([{"lesson_id": lessons[0].id, "completed_at": "2024-03-01T00:00:00Z"}])
+        self.sync([{"lesson_id": lessons[1].id, "completed_at": "2024-01-01T00:00:00Z"}])
+
+        enrollment = Enrollment.objects.get(user=self.user, course=self.course)
+        self.assertEqual(enrollment.last_activity_at.isoformat(), "2024-03-01T00:00:00+00:00")
+        self.assertEqual(enrollment.completed_lessons, 2)
+
+    def test_query_count_does_not_grow_with_batch(self):
+        lessons = self.lessons(self.course)
+        self.sync([{"lesson_id": lessons[0].id}])  # creates today's funnel rollup row
+        with CaptureQueriesContext(connection) as small:
+            self.sync([{"lesson_id": lessons[1].id}])
+        with CaptureQueriesContext(connection) as large:
+            self.sync([{"lesson_id": lesson.id} for lesson in lessons[2:]])
+
+        self.assertEqual(len(small), len(large))
+
+
+class AssignmentGradingTests(CourseProgressTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.course = self.create_course(lessons=1)
+        self.enroll(self.course)
+        module = Module.objects.get(course=self.course)
+        self.assignment = Assignment.objects.create(module=module, title="Quiz")
+        self.q1 = AssignmentQuestion.objects.create(
+            assignment=self.assignment, question="1+1", options=["1", "2"], correct_answer="2"
+        )
+        self.q2 = AssignmentQuestion.objects.create(
+            assignment=self.assignment, question="2+2", options=["4", "5"], correct_answer="5"
+        )
+
+    def submit(self, answers):
+        return self.client.post(
+            f"/api/courses/assignment/{self.assignment.id}/submit/", {"answers": answers}, format="json"
+        )
+
+    def test_warm_submit_skips_question_query(self):
+        self.submit({str(self.q1.id): "2"})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.submit({str(self.q1.id): "2", str(self.q2.id): "5"})
+
+        self.assertEqual(response.data["score"], 100.0)
+        self.assertFalse(any("courses_assignmentquestion" in q["sql"] for q in queries))
+
+    def test_key_correction_and_regrade(self):
+        self.submit({str(self.q1.id): "2", str(self.q2.id): "4"})
+        self.assertEqual(AssignmentSubmission.objects.get().score, 50.0)
+
+        self.q2.correct_answer = "4"
+        self.q2.save()
+        call_command("regrade_assignment", self.assignment.id, stdout=StringIO())
+
+        self.assertEqual(AssignmentSubmission.objects.get().score, 100.0)
+
+
+class CourseCatalogueTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        Course.objects.create(title="Intro to Python", level="Beginner", price="FREE", rating=4.5)
+        Course.objects.create(title="Advanced Django", level="Advanced", price="₹1,499", rating=4.8,
+                              description="Deep dive into Python web apps")
+        Course.objects.create(title="Excel Basics", level="Beginner", language="Hindi", price="499", rating=3.9)
+
+    def titles(self, query=""):
+        response = self.client.get(f"/api/courses/{query}")
+        self.assertEqual(response.status_code, 200)
+        return [c["title"] for c in response.data["results"]]
+
+    def test_price_is_parsed(self):
+        self.assertEqual(
+            sorted(Course.objects.values_list("price_amount", flat=True)),
+            [0, 499, 1499],
+        )
+
+    def test_filters_and_search(self):
+        self.assertEqual(self.titles("?search=python&ordering=title"), ["Advanced Django", "Intro to Python"])
+        self.assertEqual(self.titles("?level=Beginner&language=Hindi"), ["Excel Basics"])
+        self.assertEqual(self.titles("?free=true"), ["Intro to Python"])
+        self.assertEqual(self.titles("?min_price=100&max_price=1000"), ["Excel Basics"])
+        self.assertEqual(self.titles("?min_rating=4.6"), ["Advanced Django"])
+
+    def test_sorting_and_cursor_pagination(self):
+        self.assertEqual(self.titles("?ordering=-price"), ["Advanced Django", "Excel Basics", "Intro to Python"])
+
+        response = self.client.get("/api/courses/?ordering=rating&page_size=2")
+        self.assertEqual([c["title"] for c in response.data["results"]], ["Excel Basics", "Intro to Python"])
+        response = self.client.get(response.data["next"])
+        self.assertEqual([c["title"] for c in response.data["results"]], ["Advanced Django"])
+
+    def test_cursor_walks_ties_exactly_once(self):
+        for n in range(7):
+            Course.objects.create(title="Same title", price="499", rating=4.5)
+
+        for ordering in ("rating", "-rating", "title", "price"):
+            seen = []
+            url = f"/api/courses/?ordering={ordering}&page_size=2"
+            while url:
+                response = self.client.get(url)
+                seen += [c["id"] for c in response.data["results"]]
+                url = response.data["next"]
+            self.assertEqual(sorted(seen), sorted(Course.objects.values_list("id", flat=True)), ordering)
+
+    def test_invalid_number(self):
+        self.assertEqual(self.client.get("/api/courses/?min_price=abc").status_code, 400)
+
+
+@override_settings(WATCH_TIME_FLUSH_INTERVAL=3600, WATCH_TIME_COMPLETE_RATIO=0.9)
+class WatchTimeTests(CourseProgressTestCase):
+
+    def setUp(self):
+        super().setUp()
+        watchtime.discard()
+        cache.clear()
+        self.course = self.create_course(lessons=3)
+        self.enroll(self.course)
+        Lesson.objects.filter(module__course=self.course).update(duration="2:00")
+
+        self.now = 1_000_000.0
+        clock = mock.patch("courses.watchtime.wall_time", lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+        # tests flush explicitly; a real flusher thread would write outside the test transaction
+        flusher = mock.patch("courses.watchtime.start_flusher")
+        self.start_flusher = flusher.start()
+        self.addCleanup(flusher.stop)
+
+    def tearDown(self):
+        watchtime.discard()
+        cache.clear()
+
+    def heartbeat(self, lesson, seconds, elapsed=None):
+        """Post a heartbeat `elapsed` seconds (default: `seconds`) after the previous one"""
+        self.now += seconds if elapsed is None else elapsed
+        return self.client.post(f"/api/courses/lesson/{lesson.id}/heartbeat/", {"seconds": seconds}, format="json")
+
+    def watched(self, lesson):
+        watchtime.flush()
+        return LessonWatchTime.objects.get(user=self.user, lesson=lesson).seconds
+
+    def test_heartbeats_faster_than_real_time_are_not_credited(self):
+        lesson = self.lessons(self.course)[0]
+        self.heartbeat(lesson, 60)  # first heartbeat: one heartbeat's worth
+        for _ in range(10):
+            self.heartbeat(lesson, 60, elapsed=1)
+        self.assertEqual(self.watched(lesson), 70)
+
+        enrollment = Enrollment.objects.get(user=self.user, course=self.course)
+        self.assertEqual(enrollment.completed_lessons, 0)
+
+    def test_idle_time_banks_at_most_one_heartbeat(self):
+        lesson = self.lessons(self.course)[0]
+        self.heartbeat(lesson, 10)
+        self.now += 3000
+        for _ in range(3):
+            self.heartbeat(lesson, 60, elapsed=0)
+        self.assertEqual(self.watched(lesson), 70)
+
+    def test_concurrent_heartbeat_for_the_same_lesson_gets_nothing(self):
+        lesson = self.lessons(self.course)[0]
+        cache.add(f"watchtime:credited:{self.user.id}:{lesson.id}:lock", 1)
+        self.assertEqual(watchtime.credit(self.user.id, lesson.id, 30), 0)
+
+    def test_heartbeats_are_buffered_then_flushed_as_one_row(self):
+        lesson = self.lessons(self.course)[0]
+        with self.assertNumQueries(0):
+            for _ in range(5):
+                self.assertEqual(self.heartbeat(lesson, 10).status_code, 202)
+        self.assertFalse(LessonWatchTime.objects.exists())
+
+        self.assertEqual(watchtime.flush(), 1)
+        self.heartbeat(lesson, 500)  # capped at WATCH_TIME_MAX_HEARTBEAT_SECONDS
+        watchtime.flush()
+
+        self.assertEqual(LessonWatchTime.objects.get(user=self.user, lesson=lesson).seconds, 110)
+
+    def test_first_heartbeat_starts_one_flusher_per_process(self):
+        lesson = self.lessons(self.course)[0]
+        self.heartbeat(lesson, 10)
+        self.start_flusher.assert_called_once()
+
+        with mock.patch("courses.watchtime._flusher_pid", None), \
+                mock.patch("courses.watchtime.threading.Thread") as thread:
+            start_flusher()
+            start_flusher()
+        thread.assert_called_once()
+        self.assertEqual(thread.call_args.kwargs["target"], watchtime._flush_periodically)
+
+    @override_settings(WATCH_TIME_FLUSH_MAX_KEYS=2)
+    def test_full_buffer_wakes_the_flusher(self):
+        first, second, _ = self.lessons(self.course)
+        with mock.patch("courses.watchtime._wake") as wake:
+            self.heartbeat(first, 10)
+            wake.set.assert_not_called()
+            self.heartbeat(second, 10)
+            wake.set.assert_called_once()
+
+    def test_flusher_writes_the_buffer_on_its_timer(self):
+        class Stop(Exception):
+            pass
+
+        lesson = self.lessons(self.course)[0]
+        self.heartbeat(lesson, 10)
+        with mock.patch("courses.watchtime._wake") as wake, \
+                mock.patch("courses.watchtime.db_connection"):
+            wake.wait.side_effect = [False, Stop]
+            with self.assertRaises(Stop):
+                watchtime._flush_periodically()
+
+        self.assertEqual(LessonWatchTime.objects.get(user=self.user, lesson=lesson).seconds, 10)
+
+    def test_unenrolled_and_unknown_lessons_are_dropped(self):
+        other = self.create_course(lessons=1)
+        self.heartbeat(self.lessons(other)[0], 30)
+        self.client.post("/api/courses/lesson/999999/heartbeat/", {"seconds": 30}, format="json")
+
+        self.assertEqual(watchtime.flush(), 0)
+        self.assertFalse(LessonWatchTime.objects.exists())
+
+    def test_crossing_threshold_completes_lesson(self):
+        first, second, _ = self.lessons(self.course)
+        self.heartbeat(first, 60)
+        self.heartbeat(first, 50)
+        self.heartbeat(second, 60)
+        watchtime.flush()
+
+        enrollment = Enrollment.objects.get(user=self.user, course=self.course)
+        self.assertEqual(enrollment.completed_lessons, 1)
+
+    def test_flush_queries_do_not_grow_with_batch(self):
+        lessons = self.lessons(self.course)
+        self.heartbeat(lessons[0], 10)
+        watchtime.flush()
+
+        # each flush mixes an existing row with a new one
+        self.heartbeat(lessons[0], 10)
+        self.heartbeat(lessons[1], 10)
+        with CaptureQueriesContext(connection) as small:
+            watchtime.flush()
+
+        for lesson in lessons:
+            self.heartbeat(lesson, 10)
+        with CaptureQueriesContext(connection) as large:
+            watchtime.flush()
+
+        self.assertEqual(len(small), len(large))
+
+    def test_parse_duration(self):
+        self.assertEqual(watchtime.parse_duration("12:30"), 750)
+        self.assertEqual(watchtime.parse_duration("1:02:03"), 3723)
+        self.assertEqual(watchtime.parse_duration("1h 5m"), 3900)
+        self.assertEqual(watchtime.parse_duration("12 min"), 720)
+        self.assertEqual(watchtime.parse_duration("10"), 600)
+        self.assertEqual(watchtime.parse_duration("soon"), 0)
+
+
+class CourseFunnelTests(CourseProgressTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.course = self.create_course(lessons=2)
+        self.module = Module.objects.get(course=self.course)
+        self.assignment = Assignment.objects.create(module=self.module, title="Quiz")
+        self.question = AssignmentQuestion.objects.create(
+            assignment=self.assignment, question="1+1", options=["1", "2"], correct_answer="2"
+        )
+        self.staff = APIClient()
+        self.staff.force_authenticate(
+            User.objects.create_user(email="staff@example.com", full_name="Staff", password="pw", is_staff=True)
+        )
+
+    def submit(self, answer):
+        return self.client.post(
+            f"/api/courses/assignment/{self.assignment.id}/submit/",
+            {"answers": {str(self.question.id): answer}}, format="json",
+        )
+
+    def funnel(self):
+        response = self.staff.get(f"/api/courses/{self.course.id}/funnel/")
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_rollups_follow_learner_actions(self):
+        self.enroll(self.course)
+        self.enroll(self.course)  # repeat enroll is not counted
+        for lesson in self.lessons(self.course):
+            self.complete(lesson)
+        self.complete(self.lessons(self.course)[0])
+        self.submit("1")
+        self.submit("2")
+        self.submit("2")
+
+        data = self.funnel()
+        module = data["modules"][0]
+        self.assertEqual(data["enrollments"], 1)
+        self.assertEqual(module["lesson_completions"], 2)
+        self.assertEqual(module["module_completions"], 1)
+        self.assertEqual(module["completion_rate"], 100.0)
+        self.assertEqual(module["assignment_submissions"], 1)
+        self.assertEqual(module["assignment_passes"], 1)
+        self.assertEqual(len(data["daily"]), 1)
+
+    def test_read_does_not_touch_learner_tables(self):
+        self.enroll(self.course)
+        with CaptureQueriesContext(connection) as queries:
+            self.funnel()
+        for table in ("courses_enrollment", "courses_lessonprogress", "courses_assignmentsubmission"):
+            self.assertFalse(any(table in q["sql"] for q in queries))
+
+    def test_staff_only(self):
+        response = self.client.get(f"/api/courses/{self.course.id}/funnel/")
+        self.assertEqual(response.status_code, 403)
+
+    def test_rebuild_matches_incremental(self):
+        self.enroll(self.course)
+        self.client.post("/api/courses/progress/sync/", {
+            "completions": [{"lesson_id": lesson.id} for lesson in self.lessons(self.course)]
+        }, format="json")
+        self.submit("2")
+        before = self.funnel()
+
+        CourseFunnelDaily.objects.all().delete()
+        call_command("rebuild_course_funnel", stdout=StringIO())
+
+        self.assertEqual(self.funnel(), before)
+
+
+class CertificateTests(CourseProgressTestCase):
+
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.course = self.create_course(lessons=2)
+        self.enroll(self.course)
+
+    def status(self):
+        return self.client.get(f"/api/courses/{self.course.id}/certificate/")
+
+    def render(self):
+        out = StringIO()
+        call_command("render_certificates", stdout=out)
+        return out.getvalue()
+
+    def test_requires_completion(self):
+        self.complete(self.lessons(self.course)[0])
+        self.assertEqual(self.status().status_code, 403)
+        self.assertFalse(CourseCertificate.objects.exists())
+
+    def test_render_once_and_serve(self):
+        for lesson in self.lessons(self.course):
+            self.complete(lesson)
+
+        response = self.status()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["status"], "pending")
+
+        self.assertIn("Rendered 1 certificate", self.render())
+        self.assertEqual(self.render(), "")
+
+        response = self.status()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["url"].endswith(f"/certificates/{response.data['serial']}.png"))
+
+        certificate = CourseCertificate.objects.get(user=self.user, course=self.course)
+        with certificate.image.open("rb") as fh:
+            self.assertEqual(fh.read(8), b"\x89PNG\r\n\x1a\n")
+
+    def test_issued_at_is_the_completion_time(self):
+        for lesson in self.lessons(self.course):
+            self.complete(lesson)
+        finished = LessonProgress.objects.filter(user=self.user).order_by("-completed_at")[0].completed_at
+        LessonProgress.objects.filter(user=self.user).update(completed_at=F("completed_at") - timedelta(days=3))
+
+        self.assertEqual(self.status().data["issued_at"], finished - timedelta(days=3))
+
+    @override_settings(CERTIFICATE_MAX_ATTEMPTS=2, CERTIFICATE_RENDER_TIMEOUT=60)
+    def test_worker_killing_certificate_is_failed_after_max_attempts(self):
+        for lesson in self.lessons(self.course):
+            self.complete(lesson)
+        self.status()
+        stuck = CourseCertificate.objects.filter(user=self.user, course=self.course)
+        long_ago = timezone.now() - timedelta(minutes=5)
+
+        # the worker dies mid-render every time: the row stays in rendering
+        for attempt in (1, 2):
+            self.assertEqual([c.pk for c in certificates.claim_batch(10)], [stuck.get().pk])
+            stuck.update(updated_at=long_ago)
+            self.assertEqual(stuck.get().attempts, attempt)
+
+        self.assertEqual(certificates.claim_batch(10), [])
+        self.assertEqual(stuck.get().status, "failed")
+        self.assertEqual(self.render(), "")
+
+    def test_worker_queues_completed_enrollments(self):
+        for lesson in self.lessons(self.course):
+            self.complete(lesson)
+        self.render()
+
+        self.assertEqual(CourseCertificate.objects.get(user=self.user, course=self.course).status, "ready")
+
+
+class ConditionalOutlineTests(CourseProgressTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.course = self.create_course(lessons=2)
+        self.detail_url = f"/api/courses/{self.course.slug}/{self.course.id}/"
+        self.learn_url = f"{self.detail_url}learn/"
+
+    def test_detail_revalidates_until_content_changes(self):
+        anonymous = APIClient()
+        response = anonymous.get(self.detail_url)
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+        self.assertIn("public", response["Cache-Control"])
+
+        response = anonymous.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        lesson = self.lessons(self.course)[0]
+        lesson.title = "Renamed"
+        lesson.save()
+
+        response = anonymous.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_learn_etag_tracks_user_progress(self):
+        self.enroll(self.course)
+        response = self.client.get(self.learn_url)
+        etag = response["ETag"]
+        self.assertIn("private", response["Cache-Control"])
+
+        self.assertEqual(self.client.get(self.learn_url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.complete(self.lessons(self.course)[0])
+        self.assertEqual(self.client.get(self.learn_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_progress_overlay(self):
+        response = self.client.get(f"/api/courses/{self.course.id}/progress/")
+        self.assertFalse(response.data["enrolled"])
+
+        self.enroll(self.course)
+        lesson = self.lessons(self.course)[0]
+        self.complete(lesson)
+
+        response = self.client.get(f"/api/courses/{self.course.id}/progress/")
+        self.assertTrue(response.data["enrolled"])
+        self.assertEqual(response.data["progress"], 50)
+        self.assertEqual(response.data["lesson_progress"], {lesson.id: True})
+        self.assertNotIn("modules", response.data)
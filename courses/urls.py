@@ -11,15 +11,30 @@ urlpatterns = [
     # Learn page
     path("<slug:slug>/<int:id>/learn/", views.course_learn_view, name="course-learn"),
 
+    # Per-user progress overlay for the learn page
+    path("<int:id>/progress/", views.course_progress_view, name="course-progress"),
+
     # Enroll (ONLY correct one)
     path("<int:id>/enroll/", views.enroll_course_view, name="course-enroll"),
 
     # Check enrolled
     path("<int:id>/is-enrolled/", views.check_is_enrolled, name="course-is-enrolled"),
 
+    # Completion certificate status
+    path("<int:id>/certificate/", views.certificate_status_view, name="course-certificate"),
+
+    # Course funnel analytics (staff)
+    path("<int:id>/funnel/", views.course_funnel_view, name="course-funnel"),
+
     # Mark lesson complete
     path("lesson/<int:lesson_id>/complete/", views.lesson_complete_view, name="lesson-complete"),
 
+    # Video watch-time heartbeat
+    path("lesson/<int:lesson_id>/heartbeat/", views.lesson_heartbeat_view, name="lesson-heartbeat"),
+
+    # Batch progress sync (offline / mobile)
+    path("progress/sync/", views.progress_sync_view, name="progress-sync"),
+
     # Submit assignment
     path("assignment/<int:assignment_id>/submit/", views.assignment_submit_view, name="assignment-submit"),
 
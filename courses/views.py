@@ -1,21 +1,123 @@
-from rest_framework import generics, status, permissions
+from rest_framework import generics, status, permissions, filters
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from django.shortcuts import get_object_or_404
-from .models import Course, Module, Lesson, Assignment, AssignmentQuestion, Enrollment, LessonProgress, AssignmentSubmission
-from .serializers import CourseListSerializer, CourseDetailSerializer, ModuleSerializer, LessonSerializer, AssignmentSerializer, EnrollmentSerializer, LessonProgressSerializer, AssignmentSubmissionSerializer
+from .models import Course, Module, Lesson, Assignment, AssignmentQuestion, Enrollment, AssignmentSubmission
+from .serializers import CourseListSerializer, CourseDetailSerializer, ModuleSerializer, LessonSerializer, AssignmentSerializer, EnrollmentSerializer, LessonProgressSerializer, AssignmentSubmissionSerializer, ProgressSyncSerializer, WatchHeartbeatSerializer
 from django.db import transaction
+from django.db.models import Q
+from datetime import date
+from decimal import Decimal, InvalidOperation
 from django.utils import timezone
 from rest_framework.permissions import IsAuthenticated
+from .outline import get_course_outline, with_enrollment, user_overlay, outline_etag, not_modified, stamp
+from . import progress
+from .grading import get_answer_key, grade
+from . import certificates, funnel, watchtime
+from tconnects_backend.cache import cached_response
+from tconnects_backend.db_router import read_replica
 
 
-# Public: list courses
+# Public: list courses (filter / search / sort / cursor pagination)
+class CourseCatalogPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+
+
+class CourseOrderingFilter(filters.OrderingFilter):
+    """
+    Exposes the parsed price_amount column as `price`, and appends `id` so
+    rows sharing a rating/title/price keep one order from page to page
+    """
+    aliases = {"price": "price_amount", "-price": "-price_amount"}
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        fields = [self.aliases.get(field, field) for field in fields]
+        return super().remove_invalid_fields(queryset, fields, view, request)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(super().get_ordering(request, queryset, view) or ())
+        if ordering and ordering[-1].lstrip("-") not in ("id", "pk"):
+            ordering.append("-id" if ordering[0].startswith("-") else "id")
+        return ordering
+
+
+@read_replica
 class CourseListAPIView(generics.ListAPIView):
-    queryset = Course.objects.all()
+    """
+    GET /api/courses/
+    Supports:
+    - ?search=python               (title / description)
+    - ?level=Beginner  ?language=English
+    - ?min_price=0&max_price=999   ?free=true
+    - ?min_rating=4
+    - ?ordering=-rating | rating | price | -price | -created_at | title
+    - ?cursor=...&page_size=20
+    """
     serializer_class = CourseListSerializer
+    pagination_class = CourseCatalogPagination
+    filter_backends = [CourseOrderingFilter]
+    ordering_fields = ["created_at", "price_amount", "rating", "title"]
+    ordering = ["-created_at"]
+
+    @cached_response(tags=["courses"])
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def _decimal_param(self, name):
+        value = self.request.query_params.get(name)
+        if value in (None, ""):
+            return None
+        try:
+            return Decimal(value)
+        except InvalidOperation:
+            raise ValidationError({name: "Must be a number."})
+
+    def get_queryset(self):
+        qs = Course.objects.all()
+        params = self.request.query_params
+
+        search = params.get("search")
+        level = params.get("level")
+        language = params.get("language")
+        min_price = self._decimal_param("min_price")
+        max_price = self._decimal_param("max_price")
+        min_rating = self._decimal_param("min_rating")
+
+        if search:
+            qs = qs.filter(Q(title__icontains=search) | Q(description__icontains=search))
+
+        if level:
+            qs = qs.filter(level=level)
+
+        if language:
+            qs = qs.filter(language=language)
+
+        if params.get("free") in ("1", "true", "True"):
+            qs = qs.filter(price_amount=0)
+
+        if min_price is not None:
+            qs = qs.filter(price_amount__gte=min_price)
+
+        if max_price is not None:
+            qs = qs.filter(price_amount__lte=max_price)
+
+        if min_rating is not None:
+            qs = qs.filter(rating__gte=min_rating)
+
+        # unpriced courses have no position in a price-ordered cursor
+        if "price" in params.get("ordering", ""):
+            qs = qs.filter(price_amount__isnull=False)
+
+        return qs
 
 
 # Public: course detail by slug + id
+@read_replica
 class CourseDetailAPIView(generics.RetrieveAPIView):
     queryset = Course.objects.all()
     serializer_class = CourseDetailSerializer
@@ -28,45 +130,54 @@ class CourseDetailAPIView(generics.RetrieveAPIView):
         obj = get_object_or_404(Course, id=course_id, slug=slug)
         return obj
 
+    def retrieve(self, request, *args, **kwargs):
+        # outline is cached per content version; revalidations are answered with 304
+        course = self.get_object()
+        etag = outline_etag(course)
+        cached = not_modified(request, etag, course.content_updated_at)
+        if cached is not None:
+            return cached
+        return stamp(Response(get_course_outline(course)), etag, course.content_updated_at)
+
 
 # Public: learn payload (modules + lessons + assignment) - check enrollment on frontend if necessary
+# The ETag covers the user's overlay too; clients that only need progress can use course_progress_view
 @api_view(["GET"])
 def course_learn_view(request, slug, id):
-    course = get_object_or_404(Course, id=id, slug=slug)
-    data = CourseDetailSerializer(course).data
-
     user = request.user
-    enrolled = False
-    lesson_progress = {}
-    assignment_submissions = {}
+    course = get_object_or_404(with_enrollment(Course.objects.all(), user), id=id, slug=slug)
 
-    if user.is_authenticated:
-        # check enrollment
-        enrolled = Enrollment.objects.filter(user=user, course=course).exists()
+    overlay = user_overlay(course, user)
+    etag = outline_etag(course, overlay)
+    last_modified = max(filter(None, [course.content_updated_at, getattr(course, "enrollment_activity_at", None)]))
+    private = user.is_authenticated
 
-        # get lesson completion map
-        progress = LessonProgress.objects.filter(
-            user=user, lesson__module__course=course
-        )
-        lesson_progress = {p.lesson_id: p.completed for p in progress}
+    cached = not_modified(request, etag, last_modified, private)
+    if cached is not None:
+        return cached
 
-        # get assignment submission map
-        submissions = AssignmentSubmission.objects.filter(
-            user=user, assignment__module__course=course
-        )
-        assignment_submissions = {
-            s.assignment_id: {
-                "submitted": True,
-                "score": s.score,
-                "answers": s.answers,
-            }
-            for s in submissions
-        }
+    data = dict(get_course_outline(course))
+    data.update(overlay)
+
+    return stamp(Response(data), etag, last_modified, private)
 
-    data["enrolled"] = enrolled
-    data["lesson_progress"] = lesson_progress
-    data["assignment_status"] = assignment_submissions
 
+# GET per-user progress overlay (small payload; keeps the outline itself cacheable)
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+def course_progress_view(request, id):
+    enrollment = Enrollment.objects.filter(user=request.user, course_id=id).first()
+    if enrollment is None:
+        get_object_or_404(Course.objects.only("id"), id=id)
+        return Response({"course_id": id, "enrolled": False, "lesson_progress": {}, "assignment_status": {}})
+
+    data = {
+        "course_id": id,
+        "completed_lessons": enrollment.completed_lessons,
+        "total_lessons": enrollment.total_lessons,
+        "progress": enrollment.progress,
+    }
+    data.update(user_overlay(id, request.user, enrolled=True))
     return Response(data)
 
 
@@ -76,7 +187,15 @@ def course_learn_view(request, slug, id):
 @permission_classes([permissions.IsAuthenticated])
 def enroll_course_view(request, id):
     course = get_object_or_404(Course, id=id)
-    enrollment, created = Enrollment.objects.get_or_create(user=request.user, course=course)
+    enrollment = Enrollment.objects.filter(user=request.user, course=course).first()
+    created = False
+    if enrollment is None:
+        enrollment, created = Enrollment.objects.get_or_create(
+            user=request.user, course=course,
+            defaults=progress.initial_counters(request.user, course.id),
+        )
+        if created:
+            funnel.record_enrollment(course.id)
     serializer = EnrollmentSerializer(enrollment)
     return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
 
@@ -85,18 +204,69 @@ def enroll_course_view(request, id):
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
 def lesson_complete_view(request, lesson_id):
-    lesson = get_object_or_404(Lesson, id=lesson_id)
-    enrollment_exists = Enrollment.objects.filter(user=request.user, course=lesson.module.course).exists()
-    if not enrollment_exists:
+    lesson = get_object_or_404(Lesson.objects.select_related("module"), id=lesson_id)
+    if not progress.complete_lesson(request.user, lesson, lesson.module.course_id):
         return Response({"detail": "Enroll to mark progress."}, status=status.HTTP_403_FORBIDDEN)
 
-    lp, created = LessonProgress.objects.get_or_create(user=request.user, lesson=lesson)
-    lp.completed = True
-    lp.completed_at = timezone.now()
-    lp.save()
     return Response({"detail": "Lesson marked complete."})
 
 
+# POST video watch heartbeat (buffered; see courses/watchtime.py)
+@api_view(["POST"])
+@permission_classes([permissions.IsAuthenticated])
+def lesson_heartbeat_view(request, lesson_id):
+    """
+    Expect payload: { "seconds": 15 }
+    Seconds watched since the previous heartbeat, capped at WATCH_TIME_MAX_HEARTBEAT_SECONDS
+    and at the wall-clock time since the previous heartbeat.
+    """
+    serializer = WatchHeartbeatSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    seconds = watchtime.credit(request.user.id, lesson_id, serializer.validated_data["seconds"])
+    if seconds:
+        watchtime.record(request.user.id, lesson_id, seconds)
+    return Response({"detail": "Heartbeat recorded."}, status=status.HTTP_202_ACCEPTED)
+
+
+# POST batch lesson-progress sync (offline / mobile clients)
+@api_view(["POST"])
+@permission_classes([permissions.IsAuthenticated])
+def progress_sync_view(request):
+    """
+    Expect payload:
+    {
+      "completions": [ { "lesson_id": 12, "completed_at": "2025-01-01T10:00:00Z" }, ... ]
+    }
+    """
+    serializer = ProgressSyncSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    completions = {}
+    for item in serializer.validated_data["completions"]:
+        at = item.get("completed_at")
+        prev = completions.get(item["lesson_id"])
+        completions[item["lesson_id"]] = min(at, prev) if at and prev else (at or prev)
+
+    accepted, rejected, course_ids = progress.sync_completions(request.user, completions)
+
+    enrollments = Enrollment.objects.filter(user=request.user, course_id__in=course_ids)
+    courses = {
+        e.course_id: {
+            "completed_lessons": e.completed_lessons,
+            "total_lessons": e.total_lessons,
+            "progress": e.progress,
+        }
+        for e in enrollments
+    }
+
+    return Response({
+        "accepted": accepted,
+        "rejected": rejected,
+        "courses": courses,
+    }, status=status.HTTP_200_OK)
+
+
 # POST submit assignment (MCQ)
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
@@ -108,27 +278,25 @@ def assignment_submit_view(request, assignment_id):
       "answers": { "<question_id>": "<chosen_option>", ... }
     }
     """
-    assignment = get_object_or_404(Assignment, id=assignment_id)
+    assignment = get_object_or_404(Assignment.objects.select_related("module__course"), id=assignment_id)
     course = assignment.module.course
-    if not Enrollment.objects.filter(user=request.user, course=course).exists():
+    # counts as learn-page activity (drives its Last-Modified)
+    if not Enrollment.objects.filter(user=request.user, course=course).update(last_activity_at=timezone.now()):
         return Response({"detail": "Enroll to submit assignment."}, status=status.HTTP_403_FORBIDDEN)
 
     answers = request.data.get("answers", {})
-    questions = list(assignment.questions.all())
-    total = len(questions)
-    correct = 0
-    for q in questions:
-        chosen = answers.get(str(q.id)) or answers.get(q.id)  # accept string keys
-        if chosen is not None and str(chosen) == str(q.correct_answer):
-            correct += 1
+    total, correct, score = grade(get_answer_key(assignment), answers)
 
-    score = (correct / total) * 100 if total else 0.0
+    previous_score = AssignmentSubmission.objects.select_for_update().filter(
+        user=request.user, assignment=assignment
+    ).values_list("score", flat=True).first()
 
     sub, created = AssignmentSubmission.objects.update_or_create(
         user=request.user,
         assignment=assignment,
         defaults={"answers": answers, "score": score}
     )
+    funnel.record_submission(assignment, previous_score, score)
 
     resp = {
         "assignment_id": assignment.id,
@@ -138,6 +306,47 @@ def assignment_submit_view(request, assignment_id):
     }
     return Response(resp, status=status.HTTP_200_OK)
 
+# GET course funnel (staff only; reads the CourseFunnelDaily rollups)
+@api_view(["GET"])
+@permission_classes([permissions.IsAdminUser])
+def course_funnel_view(request, id):
+    """
+    Optional query params: ?from=YYYY-MM-DD&to=YYYY-MM-DD (inclusive)
+    """
+    course = get_object_or_404(Course.objects.only("id", "title"), id=id)
+
+    bounds = {}
+    for param in ("from", "to"):
+        value = request.query_params.get(param)
+        if value:
+            try:
+                bounds[param] = date.fromisoformat(value)
+            except ValueError:
+                raise ValidationError({param: "Expected a date in YYYY-MM-DD format."})
+
+    data = funnel.course_funnel(course, bounds.get("from"), bounds.get("to"))
+    data.update({"course_id": course.id, "title": course.title})
+    return Response(data)
+
+
+# GET certificate status (queues rendering on first request after completion)
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+def certificate_status_view(request, id):
+    certificate = certificates.request_certificate(request.user, id)
+    if certificate is None:
+        return Response({"detail": "Complete the course to get a certificate."}, status=status.HTTP_403_FORBIDDEN)
+
+    ready = certificate.status == "ready"
+    return Response({
+        "course_id": id,
+        "serial": certificate.serial,
+        "status": certificate.status,
+        "issued_at": certificate.issued_at,
+        "url": request.build_absolute_uri(certificate.image.url) if ready else None,
+    }, status=status.HTTP_200_OK if ready else status.HTTP_202_ACCEPTED)
+
+
 # GET check if user is enrolled
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticated])
@@ -152,30 +361,21 @@ def check_is_enrolled(request, id):
 @permission_classes([permissions.IsAuthenticated])
 def my_courses_view(request):
     user = request.user
+    # progress counters are denormalized on Enrollment (see courses/progress.py)
     enrollments = Enrollment.objects.filter(user=user).select_related("course")
 
     data = []
     for e in enrollments:
         course = e.course
-        completed_lessons = LessonProgress.objects.filter(
-            user=user, lesson__module__course=course, completed=True
-        ).count()
-
-        total_lessons = Lesson.objects.filter(
-            module__course=course
-        ).count()
-
-        progress = int((completed_lessons / total_lessons) * 100) if total_lessons > 0 else 0
+        progress_pct = e.progress
 
         data.append({
             "id": course.id,
             "title": course.title,
             "thumbnail": course.thumbnail,
             "slug": course.slug,
-            "progress": progress,
-            "status": "Completed" if progress == 100 else "Ongoing",
+            "progress": progress_pct,
+            "status": "Completed" if progress_pct == 100 else "Ongoing",
         })
 
     return Response(data)
-
-
@@ -0,0 +1,278 @@
+# courses/watchtime.py
+"""
+Write-buffered video watch time.
+
+Heartbeats only add seconds to an in-process buffer keyed by (user_id, lesson_id).
+A daemon thread per process (started by the first heartbeat) swaps the buffer
+out and writes it as one bulk upsert into LessonWatchTime every
+WATCH_TIME_FLUSH_INTERVAL seconds, sooner once WATCH_TIME_FLUSH_MAX_KEYS pairs
+are pending, and once more at interpreter exit. A worker that is killed
+outright loses at most one interval of heartbeats. Pairs for unknown lessons or
+courses the user is not enrolled in are dropped at flush time, so a heartbeat
+never touches the database.
+
+Heartbeats are not trusted: credit() caps each one at the wall-clock time since
+the user's previous credited heartbeat on that lesson, tracked in the default
+(shared, with REDIS_URL) cache, so a client cannot post heartbeats faster than
+real time to auto-complete a lesson.
+
+A lesson whose watched seconds cross WATCH_TIME_COMPLETE_RATIO of its parsed
+duration is marked complete through progress.sync_completions.
+"""
+
+import atexit
+import logging
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError, IntegrityError, connection as db_connection, transaction
+from django.utils import timezone
+
+from .models import Enrollment, Lesson, LessonWatchTime
+from . import progress
+
+logger = logging.getLogger(__name__)
+
+_buffer = defaultdict(int)
+_buffer_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_last_flush = time.monotonic()
+_wake = threading.Event()
+_flusher_pid = None  # the flusher thread does not survive a fork
+
+CLOCK_RE = re.compile(r"^\s*(?:(\d+):)?(\d+):(\d{1,2})\s*$")
+UNIT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(h|hr|hrs|hours?|m|min|mins|minutes?|s|sec|secs|seconds?)?\b", re.I)
+UNIT_SECONDS = {"h": 3600, "m": 60, "s": 1}
+
+CREDIT_KEY_TTL = 60 * 60
+
+
+def flush_interval():
+    return getattr(settings, "WATCH_TIME_FLUSH_INTERVAL", 30)
+
+
+def flush_max_keys():
+    return getattr(settings, "WATCH_TIME_FLUSH_MAX_KEYS", 1000)
+
+
+def max_heartbeat_seconds():
+    return getattr(settings, "WATCH_TIME_MAX_HEARTBEAT_SECONDS", 60)
+
+
+def complete_ratio():
+    return getattr(settings, "WATCH_TIME_COMPLETE_RATIO", 0.9)
+
+
+def parse_duration(value):
+    """
+    Lesson.duration is free text: "12:30", "1:02:03", "12 min", "1h 5m", "90s".
+    A bare number is read as minutes. Returns seconds, or 0 if unparseable.
+    """
+    if not value:
+        return 0
+    clock = CLOCK_RE.match(value)
+    if clock:
+        hours, minutes, seconds = clock.groups()
+        return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds)
+
+    total = 0
+    for amount, unit in UNIT_RE.findall(value):
+        total += float(amount) * UNIT_SECONDS[(unit or "m")[0].lower()]
+    return int(total)
+
+
+def wall_time():
+    return time.time()
+
+
+def credit(user_id, lesson_id, seconds):
+    """
+    Seconds a heartbeat may add: at most WATCH_TIME_MAX_HEARTBEAT_SECONDS and at
+    most the wall-clock time not yet credited for this (user, lesson). Idle time
+    banks no more than one heartbeat's worth. A heartbeat racing another for the
+    same pair gets 0.
+    """
+    cap = max_heartbeat_seconds()
+    key = f"watchtime:credited:{user_id}:{lesson_id}"
+    if not cache.add(f"{key}:lock", 1, timeout=5):
+        return 0
+    try:
+        now = wall_time()
+        credited_until = max(cache.get(key, now - cap), now - cap)
+        seconds = max(0, min(seconds, cap, int(now - credited_until)))
+        cache.set(key, credited_until + seconds, CREDIT_KEY_TTL)
+    finally:
+        cache.delete(f"{key}:lock")
+    return seconds
+
+
+def record(user_id, lesson_id, seconds):
+    """Buffer a heartbeat; wakes the flusher early when the buffer is full"""
+    with _buffer_lock:
+        _buffer[(user_id, lesson_id)] += seconds
+        full = len(_buffer) >= flush_max_keys()
+    start_flusher()
+    if full:
+        _wake.set()
+
+
+def start_flusher():
+    global _flusher_pid
+    if _flusher_pid == os.getpid():
+        return
+    with _buffer_lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_periodically, name="watchtime-flush", daemon=True).start()
+
+
+def _flush_periodically():
+    while True:
+        _wake.wait(max(flush_interval() - (time.monotonic() - _last_flush), 1))
+        _wake.clear()
+        try:
+            flush()
+        except Exception:
+            logger.exception("Periodic watch-time flush failed")
+        finally:
+            db_connection.close()
+
+
+def pending():
+    with _buffer_lock:
+        return dict(_buffer)
+
+
+def discard():
+    global _last_flush
+    with _buffer_lock:
+        _buffer.clear()
+        _last_flush = time.monotonic()
+
+
+def _swap():
+    global _buffer, _last_flush
+    with _buffer_lock:
+        batch, _buffer = _buffer, defaultdict(int)
+        _last_flush = time.monotonic()
+    return batch
+
+
+def _requeue(batch):
+    with _buffer_lock:
+        for key, seconds in batch.items():
+            _buffer[key] += seconds
+
+
+def flush():
+    """
+    Write buffered deltas to LessonWatchTime. Returns the number of (user, lesson)
+    rows written. Only one thread per process flushes at a time; a concurrent
+    caller returns 0 and leaves its heartbeat for the next flush.
+    """
+    if not _flush_lock.acquire(blocking=False):
+        return 0
+    try:
+        batch = _swap()
+        if not batch:
+            return 0
+        try:
+            return write_batch(batch)
+        except DatabaseError:
+            logger.exception("Watch-time flush failed; %d pair(s) re-queued", len(batch))
+            _requeue(batch)
+            return 0
+    finally:
+        _flush_lock.release()
+
+
+def write_batch(batch):
+    """Upsert {(user_id, lesson_id): delta_seconds} and apply auto-completion"""
+    lessons = {
+        lid: (course_id, parse_duration(duration))
+        for lid, course_id, duration in Lesson.objects.filter(
+            id__in={lid for _, lid in batch}
+        ).values_list("id", "module__course_id", "duration")
+    }
+    enrolled = set(
+        Enrollment.objects.filter(
+            user_id__in={uid for uid, _ in batch},
+            course_id__in={course_id for course_id, _ in lessons.values()},
+        ).values_list("user_id", "course_id")
+    )
+    batch = {
+        (uid, lid): seconds for (uid, lid), seconds in batch.items()
+        if lid in lessons and (uid, lessons[lid][0]) in enrolled
+    }
+    if not batch:
+        return 0
+
+    for attempt in range(2):
+        try:
+            crossed = _upsert(batch, lessons)
+            break
+        except IntegrityError:
+            # another process inserted one of our new pairs first; the retry sees it as existing
+            if attempt:
+                raise
+
+    _complete(crossed)
+    return len(batch)
+
+
+@transaction.atomic
+def _upsert(batch, lessons):
+    now = timezone.now()
+    existing = {
+        (row.user_id, row.lesson_id): row
+        for row in LessonWatchTime.objects.select_for_update().filter(
+            user_id__in={uid for uid, _ in batch},
+            lesson_id__in={lid for _, lid in batch},
+        )
+    }
+
+    ratio = complete_ratio()
+    to_create = []
+    to_update = []
+    crossed = defaultdict(list)
+    for (uid, lid), delta in batch.items():
+        row = existing.get((uid, lid))
+        before = row.seconds if row else 0
+        if row is None:
+            to_create.append(LessonWatchTime(user_id=uid, lesson_id=lid, seconds=delta, updated_at=now))
+        else:
+            row.seconds += delta
+            row.updated_at = now
+            to_update.append(row)
+
+        duration = lessons[lid][1]
+        if ratio and duration and before < duration * ratio <= before + delta:
+            crossed[uid].append(lid)
+
+    LessonWatchTime.objects.bulk_create(to_create)
+    LessonWatchTime.objects.bulk_update(to_update, ["seconds", "updated_at"])
+    return crossed
+
+
+def _complete(crossed):
+    if not crossed:
+        return
+    users = get_user_model().objects.in_bulk(list(crossed))
+    for uid, lesson_ids in crossed.items():
+        if uid in users:
+            progress.sync_completions(users[uid], dict.fromkeys(lesson_ids))
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        flush()
+    except Exception:
+        logger.exception("Watch-time flush at exit failed")
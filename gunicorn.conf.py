@@ -0,0 +1,8 @@
+# gunicorn.conf.py — read by `gunicorn tconnects_backend.wsgi` from the project root.
+# WEB_CONCURRENCY / GUNICORN_THREADS also size the DB pool (settings.DB_POOL_MAX_SIZE).
+from decouple import config
+
+wsgi_app = "tconnects_backend.wsgi"
+workers = config("WEB_CONCURRENCY", default=2, cast=int)
+threads = config("GUNICORN_THREADS", default=4, cast=int)
+worker_class = "gthread"
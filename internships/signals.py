@@ -0,0 +1,14 @@
+# internships/signals.py
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from tconnects_backend.cache import invalidate
+
+from .models import Internship
+
+
+@receiver([post_save, post_delete], sender=Internship)
+def invalidate_internship_caches(sender, instance, **kwargs):
+    """Public listings, the internship itself, and the recruiter's company page / dashboard"""
+    invalidate("internships", f"internship:{instance.pk}", f"company:{instance.recruiter_id}")
@@ -20,6 +20,8 @@ from .serializers import (
 )
 import logging
 from accounts.permissions import IsRecruiter
+from tconnects_backend.cache import cached_response
+from tconnects_backend.db_router import read_replica
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +39,7 @@ class IsRecruiter(permissions.BasePermission):
 # PUBLIC INTERNSHIP LIST (InternshipsListPage.jsx)
 # ======================================================
 
+@read_replica
 class InternshipListView(ListAPIView):
     """
     GET /api/internships/
@@ -49,6 +52,10 @@ class InternshipListView(ListAPIView):
     queryset = Internship.objects.filter(is_active=True)
     serializer_class = InternshipListSerializer
 
+    @cached_response(tags=["internships"])
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
         qs = Internship.objects.filter(is_active=True)
 
@@ -80,6 +87,7 @@ class InternshipListView(ListAPIView):
 # PUBLIC INTERNSHIP DETAILS (InternshipDetailsPage.jsx)
 # ======================================================
 
+@read_replica
 class InternshipDetailView(RetrieveAPIView):
     """
     GET /api/internships/<id>/
@@ -149,6 +157,10 @@ class RecruiterInternshipListView(ListAPIView):
     permission_classes = [IsRecruiter]
     serializer_class = InternshipListSerializer
 
+    @cached_response(tags=["company:{user}"], per_user=True)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
         return Internship.objects.filter(
             recruiter=self.request.user
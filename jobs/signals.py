@@ -0,0 +1,14 @@
+# jobs/signals.py
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from tconnects_backend.cache import invalidate
+
+from .models import Job
+
+
+@receiver([post_save, post_delete], sender=Job)
+def invalidate_job_caches(sender, instance, **kwargs):
+    """Public listings, the job itself, and the recruiter's company page / dashboard"""
+    invalidate("jobs", f"job:{instance.pk}", f"company:{instance.recruiter_id}")
@@ -1,3 +1,82 @@
-from django.test import TestCase
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework.response import Response
 
-# Create your tests here.
+from tconnects_backend.cache import cached_response, get_cache
+from tconnects_backend.db_router import read_replica
+from tconnects_backend.middleware import ReplicaRoutingMiddleware
+
+from .models import Job
+
+
+@read_replica
+def listing_view(request):
+    return HttpResponse(router.db_for_read(Job))
+
+
+def dashboard_view(request):
+    return HttpResponse(router.db_for_read(Job))
+
+
+@read_replica
+def writing_view(request):
+    router.db_for_write(Job)
+    return HttpResponse(router.db_for_read(Job))
+
+
+@read_replica
+@cached_response(tags=["jobs"])
+def cached_listing_view(request):
+    return Response({"db": router.db_for_read(Job)})
+
+
+@read_replica
+def company_page_view(request):
+    db = get_cache().get_or_set("replica-test:company", lambda: router.db_for_read(Job), tags=["jobs"])
+    return HttpResponse(f"{db} {router.db_for_read(Job)}")
+
+
+@override_settings(DATABASE_REPLICA_ALIAS="replica", DATABASE_REPLICA_STICKY_SECONDS=10)
+class ReplicaRoutingTests(SimpleTestCase):
+    """Routing decisions only; no query reaches the (unconfigured) replica"""
+
+    def call(self, view, method="get", cookies=None):
+        request = getattr(RequestFactory(), method)("/api/jobs/")
+        request.COOKIES.update(cookies or {})
+        request.user = AnonymousUser()
+
+        def get_response(request):
+            return middleware.process_view(request, view, (), {}) or view(request)
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        return middleware(request)
+
+    def test_marked_views_read_from_replica_on_safe_methods(self):
+        self.assertEqual(self.call(listing_view).content, b"replica")
+        self.assertEqual(self.call(listing_view, "post").content, b"default")
+        self.assertEqual(self.call(dashboard_view).content, b"default")
+
+    def test_writes_pin_the_client_to_the_primary(self):
+        response = self.call(writing_view)
+        self.assertEqual(response.content, b"default")  # reads after the write, same request
+        self.assertEqual(response.cookies["db_primary"]["max-age"], 10)
+
+        pinned = self.call(listing_view, cookies={"db_primary": "1"})
+        self.assertEqual(pinned.content, b"default")
+        self.assertNotIn("db_primary", self.call(listing_view).cookies)
+
+    def test_no_routing_outside_requests(self):
+        self.assertEqual(router.db_for_read(Job), "default")
+
+    def test_cache_fills_read_from_the_primary(self):
+        cache.clear()
+        get_cache().clear_local()
+        self.addCleanup(cache.clear)
+        self.addCleanup(get_cache().clear_local)
+
+        self.assertEqual(self.call(cached_listing_view).data, {"db": "default"})
+        # the producer reads the primary; the rest of the view keeps the replica
+        self.assertEqual(self.call(company_page_view).content, b"default replica")
@@ -20,6 +20,8 @@ from .serializers import (
 )
 import logging
 from accounts.permissions import IsRecruiter
+from tconnects_backend.cache import cached_response
+from tconnects_backend.db_router import read_replica
 
 logger = logging.getLogger(__name__)
 
@@ -36,10 +38,15 @@ class IsRecruiter(permissions.BasePermission):
 # PUBLIC JOB LIST (JobsListPage.jsx)
 # ======================================================
 
+@read_replica
 class JobListView(ListAPIView):
     queryset = Job.objects.filter(is_active=True)
     serializer_class = JobListSerializer
 
+    @cached_response(tags=["jobs"])
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
         qs = Job.objects.filter(is_active=True)
 
@@ -71,6 +78,7 @@ class JobListView(ListAPIView):
 # PUBLIC JOB DETAILS (JobDetailsPage.jsx)
 # ======================================================
 
+@read_replica
 class JobDetailView(RetrieveAPIView):
     queryset = Job.objects.filter(is_active=True)
     serializer_class = JobDetailSerializer
@@ -139,5 +147,9 @@ class RecruiterJobListView(ListAPIView):
     permission_classes = [IsRecruiter]
     serializer_class = JobListSerializer
 
+    @cached_response(tags=["company:{user}"], per_user=True)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
         return Job.objects.filter(recruiter=self.request.user).order_by("-created_at")
@@ -3,6 +3,8 @@
 from django.contrib import admin
 from .models import (
     CandidateProfile,
+    ResumeBlob,
+    ResumeUpload,
     RecruiterBasicProfile,
     CompanyProfile,
     FreelancerBasicInfo,
@@ -32,6 +34,21 @@ class CandidateProfileAdmin(admin.ModelAdmin):
     readonly_fields = ("updated_at",)
 
 
+@admin.register(ResumeBlob)
+class ResumeBlobAdmin(admin.ModelAdmin):
+    list_display = ("sha256", "size", "content_type", "created_at")
+    search_fields = ("sha256",)
+    readonly_fields = ("sha256", "file", "size", "content_type", "created_at")
+
+
+@admin.register(ResumeUpload)
+class ResumeUploadAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "filename", "received_bytes", "total_size", "status", "updated_at")
+    list_filter = ("status",)
+    search_fields = ("user__email", "filename", "sha256")
+    readonly_fields = ("created_at", "updated_at")
+
+
 # ============================================================
 # Recruiter Basic Profile
 # ============================================================
@@ -0,0 +1,62 @@
+# profiles/company_page.py
+"""
+Composed public company page: company profile + open-postings summary.
+Cached per recruiter in the two-tier cache under the "company:<recruiter_id>"
+tag, which CompanyProfile / Job / Internship writes invalidate (see signals.py).
+"""
+
+from django.conf import settings
+
+from jobs.models import Job
+from jobs.serializers import JobListSerializer
+from internships.models import Internship
+from internships.serializers import InternshipListSerializer
+from tconnects_backend.cache import get_cache, invalidate
+
+from .models import CompanyProfile
+from .serializers import CompanyProfileSerializer
+
+
+def latest_postings_limit():
+    return getattr(settings, "COMPANY_PAGE_LATEST_POSTINGS", 5)
+
+
+def cache_key(recruiter_id):
+    return f"company_page:{recruiter_id}"
+
+
+def build_company_page(recruiter_id):
+    """Returns the page dict, or None if the recruiter has no company profile"""
+    company = CompanyProfile.objects.filter(recruiter_id=recruiter_id).first()
+    if company is None:
+        return None
+
+    limit = latest_postings_limit()
+    jobs = Job.objects.filter(recruiter_id=recruiter_id, is_active=True).order_by("-created_at")
+    internships = Internship.objects.filter(recruiter_id=recruiter_id, is_active=True).order_by("-created_at")
+
+    data = CompanyProfileSerializer(company).data
+    data["open_postings"] = {
+        "jobs_count": jobs.count(),
+        "internships_count": internships.count(),
+        "latest_jobs": JobListSerializer(jobs[:limit], many=True).data,
+        "latest_internships": InternshipListSerializer(internships[:limit], many=True).data,
+    }
+    return data
+
+
+def company_tag(recruiter_id):
+    return f"company:{recruiter_id}"
+
+
+def get_company_page(recruiter_id):
+    return get_cache().get_or_set(
+        cache_key(recruiter_id),
+        lambda: build_company_page(recruiter_id),
+        getattr(settings, "COMPANY_PAGE_CACHE_TIMEOUT", 300),
+        tags=[company_tag(recruiter_id)],
+    )
+
+
+def invalidate_company_page(recruiter_id):
+    invalidate(company_tag(recruiter_id))
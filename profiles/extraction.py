@@ -0,0 +1,121 @@
+# profiles/extraction.py
+"""
+Plain-text extraction from uploaded resumes, using only the standard library
+(plus defusedxml). Best-effort: text that can't be decoded is skipped.
+"""
+
+import re
+import zipfile
+import zlib
+
+from defusedxml import ElementTree
+
+MAX_TEXT_LENGTH = 100_000
+
+PDF_STREAM_RE = re.compile(rb"stream\r?\n(.*?)\r?\nendstream", re.S)
+PDF_TEXT_BLOCK_RE = re.compile(rb"BT(.*?)ET", re.S)
+PDF_STRING_OP_RE = re.compile(rb"(\((?:\\.|[^\\)])*\))\s*(?:Tj|'|\")|\[((?:\\.|[^\]])*)\]\s*TJ", re.S)
+PDF_ARRAY_ITEM_RE = re.compile(rb"(\((?:\\.|[^\\)])*\))|(-?\d+(?:\.\d+)?)", re.S)
+PDF_WORD_GAP = -200  # TJ offsets at or below this (thousandths of an em) read as a space
+PDF_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"", b"f": b"", b"(": b"(", b")": b")", b"\\": b"\\"}
+
+DOCX_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+PRINTABLE_RUN_RE = re.compile(rb"[\x20-\x7e]{4,}")
+
+
+def _unescape_pdf_literal(raw):
+    body = raw[1:-1]
+    out = bytearray()
+    i = 0
+    while i < len(body):
+        ch = body[i:i + 1]
+        if ch == b"\\" and i + 1 < len(body):
+            nxt = body[i + 1:i + 2]
+            if nxt in PDF_ESCAPES:
+                out += PDF_ESCAPES[nxt]
+                i += 2
+                continue
+            octal = re.match(rb"[0-7]{1,3}", body[i + 1:i + 4])
+            if octal:
+                out.append(int(octal.group(0), 8) & 0xFF)
+                i += 1 + len(octal.group(0))
+                continue
+            i += 1
+            continue
+        out += ch
+        i += 1
+    return out.decode("latin-1")
+
+
+def extract_pdf_text(data):
+    chunks = []
+    for match in PDF_STREAM_RE.finditer(data):
+        stream = match.group(1)
+        try:
+            stream = zlib.decompress(stream)
+        except zlib.error:
+            pass  # uncompressed or unsupported filter; scan as-is
+
+        for block in PDF_TEXT_BLOCK_RE.findall(stream):
+            parts = []
+            for single, array in PDF_STRING_OP_RE.findall(block):
+                if single:
+                    parts.append(_unescape_pdf_literal(single))
+                else:
+                    for literal, offset in PDF_ARRAY_ITEM_RE.findall(array):
+                        if literal:
+                            parts.append(_unescape_pdf_literal(literal))
+                        elif float(offset) <= PDF_WORD_GAP:
+                            parts.append(" ")
+                parts.append(" ")  # separate consecutive show-text operators
+            if parts:
+                chunks.append("".join(parts).strip())
+    return "\n".join(chunks)
+
+
+def extract_docx_text(fileobj):
+    with zipfile.ZipFile(fileobj) as archive:
+        xml = archive.read("word/document.xml")
+    root = ElementTree.fromstring(xml)
+    paragraphs = []
+    for para in root.iter(f"{DOCX_NS}p"):
+        text = "".join(node.text or "" for node in para.iter(f"{DOCX_NS}t"))
+        if text:
+            paragraphs.append(text)
+    return "\n".join(paragraphs)
+
+
+def extract_doc_text(data):
+    """Legacy .doc: pull readable ASCII and UTF-16LE runs out of the binary"""
+    runs = [m.decode("ascii") for m in PRINTABLE_RUN_RE.findall(data)]
+    utf16 = re.findall(rb"(?:[\x20-\x7e]\x00){4,}", data)
+    runs.extend(m.decode("utf-16-le") for m in utf16)
+    return "\n".join(runs)
+
+
+def extract_resume_text(field_file):
+    """
+    Extract plain text from a resume FileField.
+    Returns "" when the file is missing or its format is unsupported.
+    """
+    if not field_file:
+        return ""
+
+    name = field_file.name.lower()
+    try:
+        with field_file.open("rb") as fh:
+            if name.endswith(".docx"):
+                text = extract_docx_text(fh)
+            else:
+                data = fh.read()
+                if name.endswith(".pdf") or data.startswith(b"%PDF"):
+                    text = extract_pdf_text(data)
+                elif name.endswith(".doc"):
+                    text = extract_doc_text(data)
+                else:
+                    text = ""
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile, ElementTree.ParseError):
+        return ""
+
+    return re.sub(r"[ \t]+", " ", text)[:MAX_TEXT_LENGTH]
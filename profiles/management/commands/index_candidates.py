@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from profiles.search import index_pending
+
+
+class Command(BaseCommand):
+    help = "Extract resume text and update the candidate search index for changed profiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep running and poll for changes.")
+        parser.add_argument("--interval", type=float, default=30.0, help="Seconds between polls with --loop.")
+        parser.add_argument("--batch-size", type=int, default=100)
+
+    def handle(self, *args, **options):
+        while True:
+            processed = index_pending(batch_size=options["batch_size"])
+            if processed:
+                self.stdout.write(f"Indexed {processed} candidate profile(s).")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from profiles.uploads import sweep_stale_uploads
+
+
+class Command(BaseCommand):
+    help = "Delete abandoned chunked resume uploads and their partial files."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep running and sweep periodically.")
+        parser.add_argument("--interval", type=float, default=3600.0, help="Seconds between sweeps with --loop.")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = sweep_stale_uploads(batch_size=options["batch_size"])
+            if deleted:
+                self.stdout.write(f"Deleted {deleted} abandoned upload(s).")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0003_resume_uploads'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateSearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resume_name', models.CharField(blank=True, max_length=255)),
+                ('resume_text', models.TextField(blank=True)),
+                ('is_dirty', models.BooleanField(db_index=True, default=True)),
+                ('indexed_at', models.DateTimeField(blank=True, null=True)),
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='search_document', to='profiles.candidateprofile')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CandidateSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.FloatField()),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='profiles.candidatesearchdocument')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term'], name='profiles_ca_term_1bb8bb_idx')],
+                'unique_together': {('document', 'term')},
+            },
+        ),
+    ]
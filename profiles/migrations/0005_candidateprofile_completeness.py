@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:29
+
+from django.db import migrations, models
+
+
+def backfill_completeness(apps, schema_editor):
+    CandidateProfile = apps.get_model('profiles', 'CandidateProfile')
+    # Same bit order as profiles.models.PROFILE_COMPLETENESS_FIELDS
+    fields = ('phone_number', 'location', 'skills', 'bio', 'resume')
+
+    profiles = list(CandidateProfile.objects.select_related('user'))
+    for profile in profiles:
+        mask = 1 if profile.user.full_name else 0
+        for i, attr in enumerate(fields, start=1):
+            if getattr(profile, attr):
+                mask |= 1 << i
+        profile.completeness = mask
+    CandidateProfile.objects.bulk_update(profiles, ['completeness'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0004_candidate_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidateprofile',
+            name='completeness',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_completeness, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0005_candidateprofile_completeness'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidatesearchdocument',
+            name='dirty_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
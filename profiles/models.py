@@ -2,6 +2,7 @@
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
+import uuid
 
 User = settings.AUTH_USER_MODEL
 
@@ -21,6 +22,19 @@ PAYMENT_TYPE_CHOICES = (
     ("bank_transfer", "Bank Transfer"),
 )
 
+# Apply-gate fields, stored as a bitmask on CandidateProfile.completeness
+# (attribute on profile or user, label shown to the candidate, bit)
+PROFILE_COMPLETENESS_FIELDS = (
+    ("full_name", "full name", 1 << 0),
+    ("phone_number", "phone number", 1 << 1),
+    ("location", "location", 1 << 2),
+    ("skills", "skills", 1 << 3),
+    ("bio", "bio", 1 << 4),
+    ("resume", "resume", 1 << 5),
+)
+PROFILE_COMPLETE_MASK = (1 << len(PROFILE_COMPLETENESS_FIELDS)) - 1
+
+
 # ---------------------------
 # Candidate Profile
 # ---------------------------
@@ -34,16 +48,134 @@ class CandidateProfile(models.Model):
     bio = models.TextField(blank=True, null=True)
     resume = models.FileField(upload_to="resumes/", blank=True, null=True)
     profile_picture = models.ImageField(upload_to="profile_pictures/", blank=True, null=True)
+    # Bitmask of PROFILE_COMPLETENESS_FIELDS that are filled in; recomputed on save
+    completeness = models.PositiveSmallIntegerField(default=0)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"CandidateProfile: {self.user.email}"
 
+    def compute_completeness(self):
+        mask = 0
+        for attr, _, bit in PROFILE_COMPLETENESS_FIELDS:
+            source = self.user if attr == "full_name" else self
+            if getattr(source, attr):
+                mask |= bit
+        return mask
+
+    def save(self, *args, **kwargs):
+        self.completeness = self.compute_completeness()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "completeness" not in update_fields:
+            kwargs["update_fields"] = list(update_fields) + ["completeness"]
+        super().save(*args, **kwargs)
+
+    @property
+    def is_complete(self):
+        return self.completeness == PROFILE_COMPLETE_MASK
+
+    @property
+    def completeness_score(self):
+        """Percentage of apply-gate fields filled in"""
+        filled = sum(1 for _, _, bit in PROFILE_COMPLETENESS_FIELDS if self.completeness & bit)
+        return int(filled * 100 / len(PROFILE_COMPLETENESS_FIELDS))
+
+    @property
+    def missing_fields(self):
+        return [label for _, label, bit in PROFILE_COMPLETENESS_FIELDS if not self.completeness & bit]
+
     class Meta:
         verbose_name = "Candidate Profile"
         verbose_name_plural = "Candidate Profiles"
 
 
+# ---------------------------
+# Resume uploads (chunked + deduplicated by SHA-256)
+# ---------------------------
+
+RESUME_UPLOAD_STATUS_CHOICES = (
+    ("pending", "Pending"),
+    ("complete", "Complete"),
+)
+
+
+class ResumeBlob(models.Model):
+    """
+    One stored resume file per unique content hash.
+    Profiles uploading identical bytes point at the same file.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to="resumes/")
+    size = models.PositiveBigIntegerField()
+    content_type = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"ResumeBlob: {self.sha256[:12]} ({self.size} bytes)"
+
+
+class ResumeUpload(models.Model):
+    """
+    A resumable chunked upload session.
+    Chunks are appended to a partial file; `received_bytes` is the resume offset.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="resume_uploads")
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    total_size = models.PositiveBigIntegerField()
+    sha256 = models.CharField(max_length=64)
+    received_bytes = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=RESUME_UPLOAD_STATUS_CHOICES, default="pending")
+    blob = models.ForeignKey(ResumeBlob, on_delete=models.SET_NULL, blank=True, null=True, related_name="uploads")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"ResumeUpload: {self.user} {self.filename} ({self.received_bytes}/{self.total_size})"
+
+    @property
+    def partial_path(self):
+        """Storage-relative path of the in-progress file"""
+        return f"resumes/partial/{self.id}.part"
+
+
+# ---------------------------
+# Candidate search index (built offline by `manage.py index_candidates`)
+# ---------------------------
+
+class CandidateSearchDocument(models.Model):
+    """
+    Per-candidate search state. Marked dirty whenever the profile is saved;
+    the indexer re-extracts the resume only when the file changed.
+    """
+    profile = models.OneToOneField(CandidateProfile, on_delete=models.CASCADE, related_name="search_document")
+    resume_name = models.CharField(max_length=255, blank=True)  # file the text below was extracted from
+    resume_text = models.TextField(blank=True)
+    is_dirty = models.BooleanField(default=True, db_index=True)
+    dirty_version = models.PositiveIntegerField(default=0)  # bumped on every mark; the indexer only clears the version it read
+    indexed_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"CandidateSearchDocument: {self.profile_id}"
+
+
+class CandidateSearchTerm(models.Model):
+    """Inverted index posting: term -> candidate document with a field-weighted score"""
+    document = models.ForeignKey(CandidateSearchDocument, on_delete=models.CASCADE, related_name="terms")
+    term = models.CharField(max_length=64)
+    weight = models.FloatField()
+
+    class Meta:
+        unique_together = ("document", "term")
+        indexes = [
+            models.Index(fields=["term"]),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> {self.document_id} ({self.weight:.2f})"
+
+
 # ---------------------------
 # Recruiter (Basic) Profile
 # ---------------------------
@@ -0,0 +1,180 @@
+# profiles/search.py
+"""
+Recruiter-side candidate search.
+
+Each CandidateProfile has a CandidateSearchDocument and a set of
+CandidateSearchTerm postings built from skills, location, bio and the
+extracted resume text. Queries are ranked with field-weighted TF x IDF.
+"""
+
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from django.utils import timezone
+
+from .extraction import extract_resume_text
+from .models import CandidateProfile, CandidateSearchDocument, CandidateSearchTerm
+
+
+FIELD_WEIGHTS = {
+    "skills": 3.0,
+    "location": 2.0,
+    "bio": 1.0,
+    "resume": 1.0,
+}
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or the to was were will with".split()
+)
+
+MAX_TERM_LENGTH = 64
+
+logger = logging.getLogger(__name__)
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return [
+        token for token in TOKEN_RE.findall(text.lower())
+        if token not in STOPWORDS and len(token) <= MAX_TERM_LENGTH
+    ]
+
+
+def mark_dirty(profile):
+    """Queue a profile for re-indexing (called from the post_save signal)"""
+    updated = CandidateSearchDocument.objects.filter(profile=profile).update(
+        is_dirty=True, dirty_version=F("dirty_version") + 1
+    )
+    if not updated:
+        CandidateSearchDocument.objects.get_or_create(profile=profile)
+
+
+def _field_texts(profile, resume_text):
+    skills = profile.skills or []
+    if isinstance(skills, list):
+        skills = " ".join(str(s) for s in skills)
+    return {
+        "skills": str(skills),
+        "location": profile.location or "",
+        "bio": profile.bio or "",
+        "resume": resume_text,
+    }
+
+
+def build_term_weights(profile, resume_text):
+    weights = defaultdict(float)
+    for field, text in _field_texts(profile, resume_text).items():
+        for term, tf in Counter(tokenize(text)).items():
+            weights[term] += FIELD_WEIGHTS[field] * (1.0 + math.log(tf))
+    return weights
+
+
+def index_document(document):
+    """
+    Re-extract (if the resume changed) and rebuild postings for one document.
+    The document stays dirty if the profile was marked again since it was read.
+    """
+    profile = document.profile
+    resume_name = profile.resume.name if profile.resume else ""
+
+    if resume_name != document.resume_name:
+        document.resume_text = extract_resume_text(profile.resume) if resume_name else ""
+        document.resume_name = resume_name
+
+    weights = build_term_weights(profile, document.resume_text)
+
+    with transaction.atomic():
+        CandidateSearchTerm.objects.filter(document=document).delete()
+        CandidateSearchTerm.objects.bulk_create(
+            CandidateSearchTerm(document=document, term=term, weight=weight)
+            for term, weight in weights.items()
+        )
+        document.indexed_at = timezone.now()
+        document.save(update_fields=["resume_name", "resume_text", "indexed_at"])
+        CandidateSearchDocument.objects.filter(
+            pk=document.pk, dirty_version=document.dirty_version
+        ).update(is_dirty=False)
+
+    return len(weights)
+
+
+def index_pending(batch_size=100):
+    """
+    Index every dirty document (and create documents for profiles that have none).
+    A document that fails stays dirty for the next run; the rest are still indexed.
+    """
+    missing = CandidateProfile.objects.filter(search_document__isnull=True).values_list("id", flat=True)
+    CandidateSearchDocument.objects.bulk_create(
+        [CandidateSearchDocument(profile_id=pk) for pk in missing],
+        ignore_conflicts=True,
+    )
+
+    processed = 0
+    failed = []
+    while True:
+        batch = list(
+            CandidateSearchDocument.objects.filter(is_dirty=True)
+            .exclude(id__in=failed)
+            .select_related("profile")
+            .order_by("id")[:batch_size]
+        )
+        if not batch:
+            return processed
+        for document in batch:
+            try:
+                index_document(document)
+            except Exception:
+                logger.exception("Indexing candidate profile %s failed", document.profile_id)
+                failed.append(document.id)
+                continue
+            processed += 1
+
+
+def search_candidates(query, page=1, page_size=20):
+    """
+    Returns (total, [(profile, score), ...]) for the requested page,
+    ranked by sum over query terms of posting weight x IDF.
+    Scoring, ordering and paging run in the database.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return 0, []
+
+    searchable = {"profile__user__is_active": True, "profile__user__role": "candidate"}
+    postings = CandidateSearchTerm.objects.filter(
+        term__in=terms,
+        **{f"document__{lookup}": value for lookup, value in searchable.items()},
+    ).order_by()
+
+    # IDF over the same population the postings come from
+    doc_freq = dict(postings.values("term").annotate(n=Count("id")).values_list("term", "n"))
+    if not doc_freq:
+        return 0, []
+    total_docs = CandidateSearchDocument.objects.filter(**searchable).count()
+    idf = {term: math.log(1 + total_docs / df) for term, df in doc_freq.items()}
+
+    ranked = (
+        postings.values("document__profile_id")
+        .annotate(score=Sum(Case(
+            *[When(term=term, then=F("weight") * Value(weight)) for term, weight in idf.items()],
+            default=Value(0.0),
+            output_field=FloatField(),
+        )))
+        .order_by("-score", "document__profile_id")
+    )
+
+    total = postings.values("document__profile_id").distinct().count()
+    start = (page - 1) * page_size
+    page_items = list(ranked.values_list("document__profile_id", "score")[start:start + page_size])
+
+    profiles = CandidateProfile.objects.select_related("user").in_bulk(
+        [profile_id for profile_id, _ in page_items]
+    )
+    return total, [(profiles[pid], score) for pid, score in page_items if pid in profiles]
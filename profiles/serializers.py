@@ -4,6 +4,7 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import (
     CandidateProfile,
+    ResumeUpload,
     RecruiterBasicProfile,
     CompanyProfile,
     FreelancerBasicInfo,
@@ -46,9 +47,10 @@ class CandidateProfileSerializer(serializers.ModelSerializer):
             "bio",
             "resume",
             "profile_picture",
+            "completeness",
             "updated_at",
         ]
-        read_only_fields = ["updated_at"]
+        read_only_fields = ["completeness", "updated_at"]
 
 
 class CandidateResumeUploadSerializer(serializers.ModelSerializer):
@@ -57,12 +59,54 @@ class CandidateResumeUploadSerializer(serializers.ModelSerializer):
         fields = ["resume"]
 
 
+class ResumeUploadInitSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
+    sha256 = serializers.CharField(min_length=64, max_length=64)
+    content_type = serializers.CharField(max_length=100, required=False, allow_blank=True)
+
+    def validate_sha256(self, value):
+        return value.lower()
+
+
+class ResumeUploadSerializer(serializers.ModelSerializer):
+    upload_id = serializers.UUIDField(source="id", read_only=True)
+    offset = serializers.IntegerField(source="received_bytes", read_only=True)
+    size = serializers.IntegerField(source="total_size", read_only=True)
+
+    class Meta:
+        model = ResumeUpload
+        fields = ["upload_id", "filename", "size", "offset", "status"]
+        read_only_fields = fields
+
+
 class CandidateProfilePictureSerializer(serializers.ModelSerializer):
     class Meta:
         model = CandidateProfile
         fields = ["profile_picture"]
 
 
+class CandidateSearchResultSerializer(serializers.ModelSerializer):
+    user = UserMiniSerializer(read_only=True)
+    score = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CandidateProfile
+        fields = [
+            "user",
+            "location",
+            "experience_level",
+            "skills",
+            "bio",
+            "resume",
+            "score",
+        ]
+        read_only_fields = fields
+
+    def get_score(self, obj):
+        return round(self.context["scores"].get(obj.pk, 0.0), 4)
+
+
 # ============================================================
 # RECRUITER BASIC PROFILE SERIALIZER
 # ============================================================
@@ -0,0 +1,63 @@
+# profiles/signals.py
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from tconnects_backend.cache import invalidate
+
+from .company_page import invalidate_company_page
+from .models import (
+    CandidateProfile,
+    CompanyProfile,
+    FreelancerBasicInfo,
+    FreelancerProfessionalDetails,
+    FreelancerEducation,
+    FreelancerAvailability,
+    FreelancerPaymentMethod,
+    FreelancerSocialLinks,
+)
+from .search import mark_dirty
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=CandidateProfile)
+def queue_candidate_reindex(sender, instance, raw=False, **kwargs):
+    """Incremental search indexing: the indexer only revisits dirty documents"""
+    if raw:
+        return
+    mark_dirty(instance)
+
+
+# Job / Internship writes invalidate the company page from jobs/ and internships/signals.py
+@receiver([post_save, post_delete], sender=CompanyProfile)
+def invalidate_company_page_for_profile(sender, instance, **kwargs):
+    invalidate_company_page(instance.recruiter_id)
+
+
+@receiver([post_save, post_delete], sender=FreelancerBasicInfo)
+def invalidate_freelancer_for_basic_info(sender, instance, **kwargs):
+    invalidate("freelancers", f"freelancer:{instance.pk}")
+
+
+@receiver([post_save, post_delete], sender=FreelancerProfessionalDetails)
+@receiver([post_save, post_delete], sender=FreelancerEducation)
+@receiver([post_save, post_delete], sender=FreelancerAvailability)
+@receiver([post_save, post_delete], sender=FreelancerPaymentMethod)
+@receiver([post_save, post_delete], sender=FreelancerSocialLinks)
+def invalidate_freelancer_for_section(sender, instance, **kwargs):
+    invalidate("freelancers", f"freelancer:{instance.freelancer_id}")
+
+
+@receiver(post_save, sender=User)
+def refresh_candidate_completeness(sender, instance, raw=False, update_fields=None, **kwargs):
+    """full_name lives on User, so keep the profile's completeness bit in sync"""
+    if raw or (update_fields is not None and "full_name" not in update_fields):
+        return
+    profile = CandidateProfile.objects.filter(user=instance).first()
+    if profile is None:
+        return
+    profile.user = instance
+    if profile.compute_completeness() != profile.completeness:
+        profile.save(update_fields=["completeness"])
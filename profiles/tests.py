@@ -1,3 +1,484 @@
-from django.test import TestCase
+import hashlib
+import importlib
+import io
+import os
+import tempfile
+import zipfile
+import zlib
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from internships.models import Internship
+from jobs.models import Job
+from tconnects_backend.cache import MISSING, TieredCache, get_cache
+
+from . import uploads
+from .company_page import build_company_page, get_company_page
+from .extraction import extract_docx_text, extract_pdf_text
+from .models import (
+    PROFILE_COMPLETE_MASK,
+    CandidateProfile,
+    CandidateSearchDocument,
+    CompanyProfile,
+    FreelancerBasicInfo,
+    FreelancerProfessionalDetails,
+    ResumeBlob,
+    ResumeUpload,
+)
+from .search import index_document, index_pending, search_candidates
+
+
+RESUME = b"%PDF-1.4\n" + b"resume body " * 200
+
+
+class ResumeUploadTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media.name, RESUME_UPLOAD_CHUNK_SIZE=1024)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(email="candidate@example.com", full_name="Can Didate")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def init(self, content=RESUME, client=None):
+        return (client or self.client).post("/api/profiles/candidate/resume-upload/", {
+            "filename": "cv.pdf",
+            "size": len(content),
+            "sha256": hashlib.sha256(content).hexdigest(),
+            "content_type": "application/pdf",
+        }, format="json")
+
+    def put(self, upload_id, chunk, offset, client=None):
+        return (client or self.client).put(
+            f"/api/profiles/candidate/resume-upload/{upload_id}/",
+            data=chunk,
+            content_type="application/octet-stream",
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def finalize(self, upload_id, client=None):
+        return (client or self.client).post(f"/api/profiles/candidate/resume-upload/{upload_id}/finalize/")
+
+    def upload(self, content=RESUME, client=None):
+        upload_id = self.init(content, client).data["upload_id"]
+        for offset in range(0, len(content), 1024):
+            self.assertEqual(self.put(upload_id, content[offset:offset + 1024], offset, client).status_code, 200)
+        return upload_id
+
+    def test_chunked_upload_resumes_and_finalizes(self):
+        upload_id = self.init().data["upload_id"]
+        self.put(upload_id, RESUME[:1024], 0)
+
+        mismatch = self.put(upload_id, RESUME[:1024], 0)
+        self.assertEqual((mismatch.status_code, mismatch.data["offset"]), (409, 1024))
+        self.assertEqual(self.client.get(f"/api/profiles/candidate/resume-upload/{upload_id}/").data["offset"], 1024)
+
+        for offset in range(1024, len(RESUME), 1024):
+            self.put(upload_id, RESUME[offset:offset + 1024], offset)
+        response = self.finalize(upload_id)
+        self.assertEqual((response.status_code, response.data["deduplicated"]), (200, False))
+
+        blob = ResumeBlob.objects.get()
+        with default_storage.open(blob.file.name) as fh:
+            self.assertEqual(fh.read(), RESUME)
+        self.assertEqual(CandidateProfile.objects.get(user=self.user).resume.name, blob.file.name)
+        self.assertEqual(self.finalize(upload_id).status_code, 409)
+
+    def test_wrong_magic_bytes_and_hash_are_rejected(self):
+        upload_id = self.init(b"GIF89a" + RESUME[6:]).data["upload_id"]
+        self.assertEqual(self.put(upload_id, b"GIF89a" + RESUME[6:1024], 0).status_code, 400)
+
+        content = RESUME[:-1] + b"!"
+        upload_id = self.init(content).data["upload_id"]
+        for offset in range(0, len(RESUME), 1024):
+            self.put(upload_id, RESUME[offset:offset + 1024], offset)  # not the declared bytes
+        response = self.finalize(upload_id)
+        self.assertEqual((response.status_code, response.data["offset"]), (400, 0))
+        self.assertFalse(ResumeBlob.objects.exists())
+
+    def test_identical_resumes_share_one_blob(self):
+        self.finalize(self.upload())
+
+        other = User.objects.create_user(email="other@example.com", full_name="Other")
+        client = APIClient()
+        client.force_authenticate(other)
+        # knowing the hash is not enough: the bytes must be sent
+        self.assertEqual(self.init(client=client).status_code, 201)
+        self.assertFalse(CandidateProfile.objects.filter(user=other).exclude(resume="").exists())
+
+        response = self.finalize(self.upload(client=client), client=client)
+        self.assertEqual((response.status_code, response.data["deduplicated"]), (200, True))
+
+        self.assertEqual(ResumeBlob.objects.count(), 1)
+        self.assertEqual(
+            CandidateProfile.objects.get(user=other).resume.name,
+            CandidateProfile.objects.get(user=self.user).resume.name,
+        )
+
+    def test_reupload_of_own_resume_skips_the_bytes(self):
+        self.finalize(self.upload())
+        response = self.init()
+        self.assertEqual((response.status_code, response.data["deduplicated"]), (200, True))
+        self.assertEqual(ResumeUpload.objects.count(), 1)
+
+    def test_concurrent_finalize_of_the_same_file_reuses_the_winners_blob(self):
+        upload_id = self.upload()
+        real_replace = os.replace
+
+        def replace_after_competitor(src, dst):
+            # another upload of the same bytes commits its blob between our lookup and insert
+            real_replace(src, dst)
+            ResumeBlob.objects.create(sha256=hashlib.sha256(RESUME).hexdigest(), file="resumes/x.pdf", size=len(RESUME))
+
+        with mock.patch("profiles.uploads.os.replace", replace_after_competitor):
+            response = self.finalize(upload_id)
+
+        self.assertEqual((response.status_code, response.data["deduplicated"]), (200, True))
+        self.assertEqual(ResumeBlob.objects.count(), 1)
+        self.assertEqual(ResumeUpload.objects.get().status, "complete")
+
+    def test_abandoned_uploads_are_swept(self):
+        stale_id = self.init().data["upload_id"]
+        self.put(stale_id, RESUME[:1024], 0)
+        fresh_id = self.init(RESUME + b" ").data["upload_id"]
+
+        stale = ResumeUpload.objects.get(id=stale_id)
+        ResumeUpload.objects.filter(id=stale_id).update(updated_at=timezone.now() - timedelta(days=2))
+
+        self.assertEqual(uploads.sweep_stale_uploads(), 1)
+        self.assertFalse(default_storage.exists(stale.partial_path))
+        self.assertEqual([str(pk) for pk in ResumeUpload.objects.values_list("id", flat=True)], [fresh_id])
+
+
+class ProfileCompletenessTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="candidate@example.com", full_name="Can Didate")
+        self.profile = CandidateProfile.objects.create(
+            user=self.user, phone_number="99999", location="Chennai", skills=["Python"], bio="Hi",
+        )
+
+    def completeness(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        return client.get("/api/profiles/candidate/completeness/").data
+
+    def test_save_keeps_the_bitmask_current(self):
+        self.assertEqual(self.completeness()["missing"], ["resume"])
+
+        self.profile.resume.name = "resumes/cv.pdf"
+        self.profile.save(update_fields=["resume"])
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.completeness, PROFILE_COMPLETE_MASK)
+        self.assertEqual(self.completeness(), {
+            "completeness": PROFILE_COMPLETE_MASK, "score": 100, "complete": True, "missing": [],
+        })
+
+    def test_user_name_change_updates_the_profile(self):
+        self.user.full_name = ""
+        self.user.save()
+        data = self.completeness()
+        self.assertEqual((data["score"], data["missing"]), (66, ["full name", "resume"]))
+
+        self.user.is_active = True
+        self.user.save(update_fields=["is_active"])  # unrelated fields don't touch the profile
+        self.user.full_name = "Back Again"
+        self.user.save(update_fields=["full_name"])
+        self.assertEqual(self.completeness()["missing"], ["resume"])
+
+    def test_no_profile_yet_reports_everything_missing(self):
+        self.profile.delete()
+        data = self.completeness()
+        self.assertEqual((data["completeness"], data["complete"], len(data["missing"])), (0, False, 6))
+
+    def test_migration_backfill_matches_model(self):
+        migration = importlib.import_module("profiles.migrations.0005_candidateprofile_completeness")
+        CandidateProfile.objects.update(completeness=0)
+
+        migration.backfill_completeness(apps, None)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.completeness, self.profile.compute_completeness())
+
+
+class ResumeExtractionTests(TestCase):
+
+    def test_pdf_text_from_compressed_streams_and_tj_arrays(self):
+        content = b"BT (Senior) Tj [(Python)-250(dev\\(ops\\))] TJ ET"
+        pdf = b"%PDF-1.4\n1 0 obj\nstream\n" + zlib.compress(content) + b"\nendstream\n"
+        self.assertEqual(extract_pdf_text(pdf), "Senior Python dev(ops)")
+
+    def test_docx_paragraphs(self):
+        xml = (
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+            "<w:p><w:r><w:t>Django</w:t></w:r><w:r><w:t> developer</w:t></w:r></w:p>"
+            "<w:p><w:r><w:t>Chennai</w:t></w:r></w:p>"
+            "</w:body></w:document>"
+        )
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("word/document.xml", xml)
+        buffer.seek(0)
+        self.assertEqual(extract_docx_text(buffer), "Django developer\nChennai")
+
+
+class CandidateSearchTests(TestCase):
+
+    def candidate(self, email, **fields):
+        user = User.objects.create_user(email=email, full_name=email.split("@")[0])
+        return CandidateProfile.objects.create(user=user, **fields)
+
+    def setUp(self):
+        self.pythonista = self.candidate("py@example.com", skills=["Python", "Django"], location="Chennai")
+        self.mentions = self.candidate("bio@example.com", skills=["Excel"], bio="Learning python", location="Pune")
+        self.other = self.candidate("other@example.com", skills=["Tally"], location="Chennai")
+        index_pending()
+
+    def test_skills_outrank_bio_and_terms_add_up(self):
+        total, hits = search_candidates("python")
+        self.assertEqual(total, 2)
+        self.assertEqual([profile for profile, _ in hits], [self.pythonista, self.mentions])
+
+        total, hits = search_candidates("python chennai")
+        self.assertEqual(total, 3)
+        self.assertEqual(hits[0][0], self.pythonista)
+
+        total, hits = search_candidates("python chennai", page=2, page_size=2)
+        self.assertEqual((total, len(hits)), (3, 1))
+
+    def test_inactive_candidates_are_not_found(self):
+        self.pythonista.user.is_active = False
+        self.pythonista.user.save()
+        total, hits = search_candidates("django")
+        self.assertEqual((total, hits), (0, []))
+        self.assertEqual(search_candidates("python")[1][0][0], self.mentions)
+
+    def test_one_failing_document_does_not_stop_the_run(self):
+        self.pythonista.resume.name = "resumes/broken.pdf"
+        self.pythonista.save()
+        self.other.bio = "Python intern"
+        self.other.save()
+
+        with mock.patch("profiles.search.extract_resume_text", side_effect=RuntimeError("bad file")):
+            with self.assertLogs("profiles.search", "ERROR"):
+                self.assertEqual(index_pending(), 1)
+
+        self.assertTrue(CandidateSearchDocument.objects.get(profile=self.pythonista).is_dirty)
+        self.assertIn(self.other, [profile for profile, _ in search_candidates("python")[1]])
+
+
+    def test_edit_during_indexing_keeps_the_document_dirty(self):
+        document = CandidateSearchDocument.objects.select_related("profile").get(profile=self.other)
+        self.other.bio = "Python intern"
+        self.other.save()
+        # the profile was saved after the indexer read it
+        index_document(document)
+
+        self.assertTrue(CandidateSearchDocument.objects.get(profile=self.other).is_dirty)
+        index_pending()
+        self.assertIn(self.other, [profile for profile, _ in search_candidates("python")[1]])
+
+
+class CompanyPageTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        get_cache().clear_local()
+        self.addCleanup(cache.clear)
+        self.addCleanup(get_cache().clear_local)
+        self.recruiter = User.objects.create_user(email="talent@example.com", full_name="Talent", role="recruiter")
+        self.company = CompanyProfile.objects.create(recruiter=self.recruiter, company_name="Acme")
+        self.url = f"/api/profiles/company/{self.recruiter.pk}/"
+
+    def post_job(self, title="Analyst"):
+        return Job.objects.create(
+            recruiter=self.recruiter,
+            title=title,
+            company_name="Acme",
+            location="Chennai",
+            experience_range="1-3 Years",
+            short_description="Short",
+            full_description="Full",
+        )
+
+    def post_internship(self, title="Audit intern"):
+        return Internship.objects.create(
+            recruiter=self.recruiter,
+            title=title,
+            company_name="Acme",
+            location="Chennai",
+            duration="3 months",
+            stipend="10000",
+            short_description="Short",
+            full_description="Full",
+        )
+
+    def test_page_queries_do_not_grow_with_postings(self):
+        self.post_job()
+        self.post_internship()
+        with self.assertNumQueries(5):
+            build_company_page(self.recruiter.pk)
+
+        for n in range(4):
+            self.post_job(f"Job {n}")
+            self.post_internship(f"Internship {n}")
+        with self.assertNumQueries(5):
+            build_company_page(self.recruiter.pk)
+
+        get_company_page(self.recruiter.pk)
+        with self.assertNumQueries(0):
+            get_company_page(self.recruiter.pk)
+
+    def test_posting_writes_refresh_the_page(self):
+        client = APIClient()
+        postings = client.get(self.url).data["open_postings"]
+        self.assertEqual((postings["jobs_count"], postings["internships_count"]), (0, 0))
+
+        job = self.post_job()
+        internship = self.post_internship()
+        postings = client.get(self.url).data["open_postings"]
+        self.assertEqual((postings["jobs_count"], postings["internships_count"]), (1, 1))
+
+        job.title = "Senior Analyst"
+        job.save()
+        internship.is_active = False
+        internship.save()
+        postings = client.get(self.url).data["open_postings"]
+        self.assertEqual(postings["latest_jobs"][0]["title"], "Senior Analyst")
+        self.assertEqual(postings["internships_count"], 0)
+
+        job.delete()
+        self.assertEqual(client.get(self.url).data["open_postings"]["latest_jobs"], [])
+
+    def test_company_profile_edits_refresh_the_page(self):
+        client = APIClient()
+        self.assertEqual(client.get(self.url).data["company_name"], "Acme")
+        self.company.company_name = "Acme Audit"
+        self.company.save()
+        self.assertEqual(client.get(self.url).data["company_name"], "Acme Audit")
+
+        self.company.delete()
+        self.assertEqual(client.get(self.url).status_code, 404)
+
+
+class TieredCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.tiered = TieredCache(l1_size=10, l1_ttl=60)
+
+    def test_l1_then_l2_then_miss(self):
+        self.tiered.set("answer", 42, tags=["numbers"])
+
+        self.assertEqual(self.tiered.get("answer"), 42)
+        self.tiered.clear_local()
+        self.assertEqual(self.tiered.get("answer"), 42)
+        self.assertIs(self.tiered.get("question"), MISSING)
+
+        stats = self.tiered.stats()
+        self.assertEqual((stats["l1_hits"], stats["l2_hits"], stats["misses"]), (1, 1, 1))
+
+    def test_tag_invalidation_across_processes(self):
+        other = TieredCache(l1_size=10, l1_ttl=60)  # a second worker sharing L2
+        self.tiered.set("page", "v1", tags=["jobs", "company:1"])
+        self.assertEqual(other.get("page"), "v1")
+
+        self.tiered.invalidate("company:1")
+        self.assertIs(self.tiered.get("page"), MISSING)
+
+        # the other worker keeps its L1 copy until it ages out, then sees the bump
+        self.assertEqual(other.get("page"), "v1")
+        other.clear_local()
+        self.assertIs(other.get("page"), MISSING)
+
+    def test_non_local_entries_skip_l1(self):
+        other = TieredCache(l1_size=10, l1_ttl=60)
+        self.tiered.set("dashboard", "v1", tags=["company:1"], local=False)
+        self.assertEqual(other.get("dashboard", local=False), "v1")
+        self.assertEqual(self.tiered.stats()["l1_size"], 0)
+        self.assertEqual(other.stats()["l1_size"], 0)
+
+        self.tiered.invalidate("company:1")
+        self.assertIs(other.get("dashboard", local=False), MISSING)
+
+    def test_lru_is_bounded(self):
+        for n in range(25):
+            self.tiered.set(f"key{n}", n)
+        self.assertEqual(self.tiered.stats()["l1_size"], 10)
+
+
+class CachedPublicViewsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        get_cache().clear_local()
+        self.addCleanup(cache.clear)
+        self.addCleanup(get_cache().clear_local)
+
+        user = User.objects.create_user(email="freelancer@example.com", full_name="Free Lancer")
+        self.basic = FreelancerBasicInfo.objects.create(user=user, full_name="Free Lancer", is_published=True)
+        self.details = FreelancerProfessionalDetails.objects.create(freelancer=self.basic, area_of_expertise="Audit")
+
+        self.recruiter = User.objects.create_user(email="hr@example.com", full_name="HR", role="recruiter")
+        CompanyProfile.objects.create(recruiter=self.recruiter, company_name="Acme")
+
+    def test_freelancer_pages_are_cached_until_a_section_changes(self):
+        client = APIClient()
+        url = f"/api/profiles/freelancers/{self.basic.pk}/"
+        self.assertEqual(client.get(url)["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            response = client.get(url)
+        self.assertEqual(response["X-Cache"], "HIT")
+
+        self.details.area_of_expertise = "Forensics"
+        self.details.save()
+
+        response = client.get(url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertIn("Forensics", str(response.data))
+
+    def test_company_page_follows_postings(self):
+        client = APIClient()
+        url = f"/api/profiles/company/{self.recruiter.pk}/"
+        self.assertEqual(client.get(url).data["open_postings"]["jobs_count"], 0)
+
+        Job.objects.create(
+            recruiter=self.recruiter,
+            title="Analyst",
+            company_name="Acme",
+            location="Chennai",
+            experience_range="1-3 Years",
+            short_description="Short",
+            full_description="Full",
+        )
+        self.assertEqual(client.get(url).data["open_postings"]["jobs_count"], 1)
+
+    def test_recruiter_dashboard_is_fresh_on_every_worker(self):
+        client = APIClient()
+        client.force_authenticate(self.recruiter)
+        self.assertEqual(len(client.get("/api/jobs/my-jobs/").data), 0)
+
+        # another worker creates a job: the invalidation reaches L2 only
+        with mock.patch("tconnects_backend.cache._tiered", TieredCache(l1_size=10, l1_ttl=60)):
+            Job.objects.create(
+                recruiter=self.recruiter,
+                title="Analyst",
+                company_name="Acme",
+                location="Chennai",
+                experience_range="1-3 Years",
+                short_description="Short",
+                full_description="Full",
+            )
+        self.assertEqual(len(client.get("/api/jobs/my-jobs/").data), 1)
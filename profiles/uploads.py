@@ -0,0 +1,215 @@
+# profiles/uploads.py
+"""
+Chunked, resumable resume uploads.
+
+Protocol (all endpoints are candidate-only):
+    1. init     -> declare filename, size and SHA-256; a blob this user already uploaded is reused at once
+    2. append   -> raw bytes written straight to the partial file at the current offset
+    3. finalize -> verify SHA-256, promote the partial file to a ResumeBlob, attach it to the profile
+
+Storage is shared between users only at finalize, once the bytes have been
+sent and verified: knowing a file's hash must not be enough to get another
+candidate's resume attached.
+
+Pending uploads idle for RESUME_UPLOAD_EXPIRY are removed by `manage.py sweep_resume_uploads`.
+"""
+
+import hashlib
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import ResumeBlob, ResumeUpload
+
+
+# extension -> (content types, magic-byte prefixes)
+ALLOWED_RESUME_TYPES = {
+    ".pdf": (("application/pdf",), (b"%PDF",)),
+    ".doc": (("application/msword",), (b"\xd0\xcf\x11\xe0",)),
+    ".docx": (
+        ("application/vnd.openxmlformats-officedocument.wordprocessingml.document",),
+        (b"PK\x03\x04",),
+    ),
+}
+
+READ_BLOCK_SIZE = 64 * 1024
+
+
+def max_resume_size():
+    return getattr(settings, "RESUME_MAX_UPLOAD_SIZE", 10 * 1024 * 1024)
+
+
+def max_chunk_size():
+    return getattr(settings, "RESUME_UPLOAD_CHUNK_SIZE", 1024 * 1024)
+
+
+def upload_expiry():
+    return getattr(settings, "RESUME_UPLOAD_EXPIRY", 24 * 60 * 60)
+
+
+def resume_extension(filename):
+    return os.path.splitext(filename or "")[1].lower()
+
+
+def validate_resume_declaration(filename, size, content_type, sha256):
+    """Reject an upload before any bytes are sent"""
+    ext = resume_extension(filename)
+    if ext not in ALLOWED_RESUME_TYPES:
+        raise serializers.ValidationError(
+            {"filename": f"Unsupported file type. Allowed: {', '.join(sorted(ALLOWED_RESUME_TYPES))}"}
+        )
+
+    content_types, _ = ALLOWED_RESUME_TYPES[ext]
+    if content_type and content_type not in content_types:
+        raise serializers.ValidationError({"content_type": "Content type does not match file extension."})
+
+    if size <= 0:
+        raise serializers.ValidationError({"size": "File is empty."})
+    if size > max_resume_size():
+        raise serializers.ValidationError({"size": f"File too large. Maximum is {max_resume_size()} bytes."})
+
+    if len(sha256) != 64 or any(c not in "0123456789abcdef" for c in sha256):
+        raise serializers.ValidationError({"sha256": "Expected a hex-encoded SHA-256 digest."})
+
+
+def owned_blob(user, sha256, size):
+    """A stored blob with this digest that `user` has uploaded in full before, or None"""
+    return ResumeBlob.objects.filter(
+        sha256=sha256, size=size, uploads__user=user, uploads__status="complete"
+    ).first()
+
+
+def attach_blob(profile, blob):
+    """Point the candidate's resume at a stored blob without copying the file"""
+    profile.resume.name = blob.file.name
+    profile.save()
+    return profile
+
+
+def _storage_path(name):
+    path = default_storage.path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def append_chunk(upload, stream, offset, length):
+    """
+    Write `length` bytes from `stream` to the partial file at `offset`.
+    Caller must hold a row lock on `upload` and have checked offset/length.
+    """
+    path = _storage_path(upload.partial_path)
+    ext = resume_extension(upload.filename)
+    _, magic_prefixes = ALLOWED_RESUME_TYPES[ext]
+
+    mode = "r+b" if os.path.exists(path) else "wb"
+    with open(path, mode) as fh:
+        # drop bytes from any earlier append that never got recorded
+        fh.truncate(offset)
+        fh.seek(offset)
+
+        remaining = length
+        first = offset == 0
+        while remaining > 0:
+            block = stream.read(min(READ_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            if first:
+                if not any(block.startswith(prefix) for prefix in magic_prefixes):
+                    fh.truncate(0)
+                    raise serializers.ValidationError("File contents do not match the declared type.")
+                first = False
+            fh.write(block)
+            remaining -= len(block)
+
+    written = length - remaining
+    upload.received_bytes = offset + written
+    upload.save(update_fields=["received_bytes", "updated_at"])
+    return written
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(READ_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def discard_partial(upload):
+    if default_storage.exists(upload.partial_path):
+        default_storage.delete(upload.partial_path)
+
+
+class ResumeHashMismatch(Exception):
+    pass
+
+
+def finalize_upload(upload, profile):
+    """
+    Verify the assembled file and attach it to the profile.
+    Caller must hold a row lock on `upload`.
+    Returns (blob, deduplicated); raises ResumeHashMismatch after resetting the upload to offset 0.
+    """
+    if upload.received_bytes != upload.total_size:
+        raise serializers.ValidationError(
+            f"Upload incomplete: received {upload.received_bytes} of {upload.total_size} bytes."
+        )
+
+    path = default_storage.path(upload.partial_path)
+    if _hash_file(path) != upload.sha256:
+        discard_partial(upload)
+        upload.received_bytes = 0
+        upload.save(update_fields=["received_bytes", "updated_at"])
+        raise ResumeHashMismatch()
+
+    blob = ResumeBlob.objects.select_for_update().filter(sha256=upload.sha256).first()
+    deduplicated = blob is not None
+
+    if blob:
+        discard_partial(upload)
+    else:
+        name = f"resumes/{upload.sha256}{resume_extension(upload.filename)}"
+        # a concurrent finalize of the same bytes writes the same name, so replacing is harmless
+        os.replace(path, _storage_path(name))
+        try:
+            with transaction.atomic():
+                blob = ResumeBlob.objects.create(
+                    sha256=upload.sha256,
+                    file=name,
+                    size=upload.total_size,
+                    content_type=upload.content_type,
+                )
+        except IntegrityError:
+            # lost the race to another upload of the same file; share its blob
+            blob = ResumeBlob.objects.get(sha256=upload.sha256)
+            deduplicated = True
+
+    upload.blob = blob
+    upload.status = "complete"
+    upload.save(update_fields=["blob", "status", "updated_at"])
+
+    attach_blob(profile, blob)
+    return blob, deduplicated
+
+
+def sweep_stale_uploads(batch_size=500):
+    """
+    Delete pending uploads untouched for RESUME_UPLOAD_EXPIRY seconds, with
+    their partial files, in chunks of `batch_size`; returns uploads deleted.
+    """
+    cutoff = timezone.now() - timedelta(seconds=upload_expiry())
+    stale = ResumeUpload.objects.filter(status="pending", updated_at__lt=cutoff).order_by()
+
+    deleted = 0
+    while True:
+        batch = list(stale[:batch_size])
+        if not batch:
+            return deleted
+        for upload in batch:
+            discard_partial(upload)
+        deleted += ResumeUpload.objects.filter(id__in=[upload.id for upload in batch]).delete()[0]
@@ -4,13 +4,18 @@ from django.urls import path
 from .views import (
     # Candidate
     CandidateProfileView,
+    CandidateProfileCompletenessView,
     CandidateResumeUploadView,
+    ResumeUploadInitView,
+    ResumeUploadChunkView,
+    ResumeUploadFinalizeView,
     CandidateProfilePictureUploadView,
 
     # Recruiter
     RecruiterBasicProfileView,
     CompanyProfileView,
     PublicCompanyProfileView,
+    RecruiterCandidateSearchView,
 
     # Freelancer
     FreelancerBasicInfoView,
@@ -36,7 +41,11 @@ urlpatterns = [
     # CANDIDATE PROFILE ROUTES
     # ================================
     path("candidate/me/", CandidateProfileView.as_view(), name="candidate-profile"),
+    path("candidate/completeness/", CandidateProfileCompletenessView.as_view(), name="candidate-profile-completeness"),
     path("candidate/upload-resume/", CandidateResumeUploadView.as_view(), name="candidate-upload-resume"),
+    path("candidate/resume-upload/", ResumeUploadInitView.as_view(), name="candidate-resume-upload-init"),
+    path("candidate/resume-upload/<uuid:upload_id>/", ResumeUploadChunkView.as_view(), name="candidate-resume-upload-chunk"),
+    path("candidate/resume-upload/<uuid:upload_id>/finalize/", ResumeUploadFinalizeView.as_view(), name="candidate-resume-upload-finalize"),
     path("candidate/upload-profile-picture/", CandidateProfilePictureUploadView.as_view(), name="candidate-upload-picture"),
 
     # ================================
@@ -44,6 +53,7 @@ urlpatterns = [
     # ================================
     path("recruiter/basic/", RecruiterBasicProfileView.as_view(), name="recruiter-basic-profile"),
     path("recruiter/company/", CompanyProfileView.as_view(), name="company-profile"),
+    path("candidates/search/", RecruiterCandidateSearchView.as_view(), name="recruiter-candidate-search"),
     path("company/<int:recruiter_id>/", PublicCompanyProfileView.as_view(), name="public-company-profile"),
 
     # ================================
@@ -10,11 +10,13 @@ from rest_framework.generics import (
     ListAPIView,
 )
 from django.shortcuts import get_object_or_404
+from django.db import transaction
 
 from django.contrib.auth import get_user_model
 
 from .models import (
     CandidateProfile,
+    ResumeUpload,
     RecruiterBasicProfile,
     CompanyProfile,
     FreelancerBasicInfo,
@@ -28,7 +30,10 @@ from .models import (
 from .serializers import (
     CandidateProfileSerializer,
     CandidateResumeUploadSerializer,
+    ResumeUploadInitSerializer,
+    ResumeUploadSerializer,
     CandidateProfilePictureSerializer,
+    CandidateSearchResultSerializer,
 
     RecruiterBasicProfileSerializer,
     CompanyProfileSerializer,
@@ -40,6 +45,11 @@ from .serializers import (
     FreelancerPaymentMethodSerializer,
     FreelancerSocialLinksSerializer,
 )
+from . import uploads
+from .search import search_candidates
+from .company_page import get_company_page
+from tconnects_backend.cache import cached_response
+from tconnects_backend.db_router import read_replica
 
 User = get_user_model()
 
@@ -84,6 +94,27 @@ class CandidateProfileView(RetrieveUpdateAPIView):
         return profile
 
 
+class CandidateProfileCompletenessView(APIView):
+    """
+    GET /api/profiles/candidate/completeness/
+    Reads only the stored bitmask — no full profile serialization.
+    """
+    permission_classes = [IsCandidate]
+
+    def get(self, request):
+        profile = (
+            CandidateProfile.objects.filter(user=request.user).only("completeness").first()
+            or CandidateProfile(completeness=0)
+        )
+
+        return Response({
+            "completeness": profile.completeness,
+            "score": profile.completeness_score,
+            "complete": profile.is_complete,
+            "missing": profile.missing_fields,
+        })
+
+
 class CandidateResumeUploadView(APIView):
     """
     POST /api/profiles/candidate/upload-resume/
@@ -102,6 +133,143 @@ class CandidateResumeUploadView(APIView):
         return Response(serializer.errors, status=400)
 
 
+# ============================================================
+# CANDIDATE RESUME — CHUNKED / RESUMABLE UPLOAD
+# ============================================================
+
+class ResumeUploadInitView(APIView):
+    """
+    POST /api/profiles/candidate/resume-upload/
+    { "filename": "cv.pdf", "size": 123456, "sha256": "<hex>", "content_type": "application/pdf" }
+
+    If this candidate already uploaded a resume with the same SHA-256 it is
+    attached immediately and no bytes need to be sent.
+    """
+    permission_classes = [IsCandidate]
+
+    def post(self, request):
+        serializer = ResumeUploadInitSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        uploads.validate_resume_declaration(
+            data["filename"], data["size"], data.get("content_type", ""), data["sha256"]
+        )
+
+        profile, _ = CandidateProfile.objects.get_or_create(user=request.user)
+
+        blob = uploads.owned_blob(request.user, data["sha256"], data["size"])
+        if blob:
+            uploads.attach_blob(profile, blob)
+            return Response({
+                "status": "complete",
+                "deduplicated": True,
+                "resume_url": profile.resume.url,
+            }, status=200)
+
+        upload = ResumeUpload.objects.create(
+            user=request.user,
+            filename=data["filename"],
+            content_type=data.get("content_type", ""),
+            total_size=data["size"],
+            sha256=data["sha256"],
+        )
+
+        response = ResumeUploadSerializer(upload).data
+        response["chunk_size"] = uploads.max_chunk_size()
+        return Response(response, status=201)
+
+
+class ResumeUploadChunkView(APIView):
+    """
+    GET /api/profiles/candidate/resume-upload/<upload_id>/
+        -> current offset (use it to resume an interrupted upload)
+
+    PUT /api/profiles/candidate/resume-upload/<upload_id>/
+        Upload-Offset: <offset>
+        Content-Length: <bytes in this chunk>
+        <raw bytes>
+    """
+    permission_classes = [IsCandidate]
+
+    def get(self, request, upload_id):
+        upload = get_object_or_404(ResumeUpload, id=upload_id, user=request.user)
+        return Response(ResumeUploadSerializer(upload).data)
+
+    def put(self, request, upload_id):
+        # Validate headers first: the body is only read once the chunk is acceptable
+        try:
+            offset = int(request.headers.get("Upload-Offset", request.query_params.get("offset", "")))
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            return Response({"detail": "Upload-Offset and Content-Length are required."}, status=400)
+
+        if length <= 0:
+            return Response({"detail": "Empty chunk."}, status=400)
+        if length > uploads.max_chunk_size():
+            return Response({"detail": f"Chunk too large. Maximum is {uploads.max_chunk_size()} bytes."}, status=413)
+
+        with transaction.atomic():
+            upload = get_object_or_404(
+                ResumeUpload.objects.select_for_update(), id=upload_id, user=request.user
+            )
+
+            if upload.status != "pending":
+                return Response({"detail": "Upload already finalized."}, status=409)
+            if offset != upload.received_bytes:
+                return Response(
+                    {"detail": "Offset mismatch.", "offset": upload.received_bytes},
+                    status=409,
+                )
+            if offset + length > upload.total_size:
+                return Response({"detail": "Chunk exceeds declared file size."}, status=413)
+
+            written = uploads.append_chunk(upload, request.stream, offset, length)
+
+        if written < length:
+            # client disconnected mid-chunk; the partial offset is kept so it can resume
+            return Response(
+                {"detail": "Chunk was truncated.", "offset": upload.received_bytes},
+                status=400,
+            )
+
+        return Response(ResumeUploadSerializer(upload).data)
+
+
+class ResumeUploadFinalizeView(APIView):
+    """
+    POST /api/profiles/candidate/resume-upload/<upload_id>/finalize/
+    Verifies the SHA-256 and attaches the resume to the profile.
+    """
+    permission_classes = [IsCandidate]
+
+    def post(self, request, upload_id):
+        with transaction.atomic():
+            upload = get_object_or_404(
+                ResumeUpload.objects.select_for_update(), id=upload_id, user=request.user
+            )
+            if upload.status != "pending":
+                return Response({"detail": "Upload already finalized."}, status=409)
+
+            profile, _ = CandidateProfile.objects.get_or_create(user=request.user)
+            try:
+                blob, deduplicated = uploads.finalize_upload(upload, profile)
+            except uploads.ResumeHashMismatch:
+                blob = None
+
+        if blob is None:
+            return Response(
+                {"detail": "SHA-256 mismatch. Upload discarded; start again from offset 0.", "offset": 0},
+                status=400,
+            )
+
+        return Response({
+            "status": "complete",
+            "deduplicated": deduplicated,
+            "resume_url": profile.resume.url,
+        }, status=200)
+
+
 class CandidateProfilePictureUploadView(APIView):
     """
     POST /api/profiles/candidate/upload-profile-picture/
@@ -153,22 +321,56 @@ class CompanyProfileView(RetrieveUpdateAPIView):
         return profile
 
 
+# ============================================================
+# RECRUITER — CANDIDATE SEARCH
+# ============================================================
+
+class RecruiterCandidateSearchView(APIView):
+    """
+    GET /api/profiles/candidates/search/?q=python+chennai&page=1&page_size=20
+    Ranked search over candidate skills, location, bio and resume text.
+    """
+    permission_classes = [IsRecruiter]
+    max_page_size = 100
+
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        try:
+            page = max(int(request.query_params.get("page", 1)), 1)
+            page_size = min(max(int(request.query_params.get("page_size", 20)), 1), self.max_page_size)
+        except ValueError:
+            return Response({"detail": "page and page_size must be integers"}, status=400)
+
+        total, hits = search_candidates(query, page=page, page_size=page_size)
+        profiles = [profile for profile, _ in hits]
+        scores = {profile.pk: score for profile, score in hits}
+
+        return Response({
+            "count": total,
+            "page": page,
+            "page_size": page_size,
+            "results": CandidateSearchResultSerializer(
+                profiles, many=True, context={"request": request, "scores": scores}
+            ).data,
+        })
+
+
 # Public endpoint to view a company by recruiter ID
+@read_replica
 class PublicCompanyProfileView(APIView):
     """
     GET /api/profiles/company/<recruiter_id>/
+    Company profile plus open job/internship counts and the latest postings (cached).
     """
     permission_classes = [permissions.AllowAny]
 
     def get(self, request, recruiter_id):
-        recruiter = get_object_or_404(User, id=recruiter_id)
-        company = getattr(recruiter, "company_profile", None)
+        data = get_company_page(recruiter_id)
 
-        if not company:
+        if data is None:
             return Response({"detail": "Company profile not found"}, status=404)
 
-        serializer = CompanyProfileSerializer(company)
-        return Response(serializer.data, status=200)
+        return Response(data, status=200)
 
 
 # ============================================================
@@ -436,13 +638,15 @@ class DeleteFreelancerProfileView(APIView):
 # ----------------------------------------
 # In profiles/views.py, replace FreelancerPublicListView with this:
 
+@read_replica
 class FreelancerPublicListView(APIView):
     """
     GET /api/profiles/freelancers/
-    Returns list of all published freelancer profiles
+    Returns list of all published freelancer profiles (cached)
     """
     permission_classes = [permissions.AllowAny]
 
+    @cached_response(tags=["freelancers"])
     def get(self, request):
         # Get only published freelancers
         freelancers = FreelancerBasicInfo.objects.filter(is_published=True)
@@ -470,13 +674,15 @@ class FreelancerPublicListView(APIView):
 # ========================================
 # PUBLIC FREELANCER DETAIL (Single profile)
 # ========================================
+@read_replica
 class FreelancerPublicDetailView(APIView):
     """
     GET /api/profiles/freelancers/<pk>/
-    Returns detailed view of a single published freelancer profile
+    Returns detailed view of a single published freelancer profile (cached)
     """
     permission_classes = [permissions.AllowAny]
 
+    @cached_response(tags=["freelancer:{pk}"])
     def get(self, request, pk):
         # Try to get the freelancer
         try:
@@ -0,0 +1,26 @@
+from allauth.account.apps import AccountConfig
+from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+class TconnectsBackendConfig(AppConfig):
+    """The project package as an app, for project-wide management commands (e.g. benchmarks)"""
+    name = "tconnects_backend"
+
+
+class AllauthAccountConfig(AccountConfig):
+    """
+    allauth.account, accepting its middleware from SESSION_MIDDLEWARE: allauth
+    only looks for it in MIDDLEWARE, but here it runs behind
+    SessionRoutingMiddleware.
+    """
+
+    def ready(self):
+        required_mw = "allauth.account.middleware.AccountMiddleware"
+        if required_mw not in getattr(settings, "SESSION_MIDDLEWARE", []):
+            super().ready()
+        elif "tconnects_backend.middleware.SessionRoutingMiddleware" not in settings.MIDDLEWARE:
+            raise ImproperlyConfigured(
+                "SESSION_MIDDLEWARE needs tconnects_backend.middleware.SessionRoutingMiddleware in settings.MIDDLEWARE"
+            )
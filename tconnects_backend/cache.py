@@ -0,0 +1,288 @@
+# tconnects_backend/cache.py
+"""
+Two-tier cache with tag invalidation.
+
+L1 is a bounded per-process LRU (TIERED_CACHE_L1_SIZE entries, each kept at
+most TIERED_CACHE_L1_TTL seconds); L2 is the shared Django cache
+TIERED_CACHE_ALIAS (Redis when REDIS_URL is set, else the local LocMemCache
+stand-in). A read tries L1, then L2 (and copies the value into L1), then
+calls the producer and writes both tiers.
+
+Tags: every entry records the version of each of its tags at write time;
+`invalidate(tag)` bumps the tag's version in L2, so older entries stop
+matching on their next L2 read. The invalidating process also drops matching
+L1 entries at once; other processes see the change once their L1 copy ages
+out (at most TIERED_CACHE_L1_TTL seconds). Model signals call `invalidate`
+(jobs/, internships/, courses/ and profiles/signals.py).
+
+Values are produced with reads on the primary (db_router.primary_reads), so
+a replica that has not caught up with the write behind an invalidation can't
+refill the entry with the old rows.
+
+`cached_response` caches the data of 200 GET responses of DRF views.
+Per-user responses (private dashboards) skip L1 and go straight to L2, so
+the owner sees their own edits on every worker at once. Hit/miss counters are per process; see `stats()`.
+"""
+
+import functools
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter
+
+from cachetools import TTLCache
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpRequest
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from .db_router import primary_reads
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+TAG_PREFIX = "cachetag:"
+ENTRY_PREFIX = "tiered:"
+
+
+def new_tag_version():
+    # never reused, so a tag evicted from L2 can't bring stale entries back
+    return time.time_ns()
+
+
+class TieredCache:
+
+    def __init__(self, alias="default", l1_size=1024, l1_ttl=5):
+        self.alias = alias
+        self.l1_enabled = l1_size > 0 and l1_ttl > 0
+        self._l1 = TTLCache(maxsize=max(l1_size, 1), ttl=max(l1_ttl, 0.001))
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._last_error_log = 0.0
+
+    @property
+    def l2(self):
+        return caches[self.alias]
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _l2_failed(self):
+        self._count("l2_errors")
+        now = time.monotonic()
+        if now - self._last_error_log > 60:
+            self._last_error_log = now
+            logger.warning("Shared cache %r unavailable; serving uncached", self.alias, exc_info=True)
+
+    # ---------------------------------------------------------
+    # TAGS
+    # ---------------------------------------------------------
+
+    def tag_versions(self, tags):
+        """{tag: current version}; creates versions for unseen tags"""
+        if not tags:
+            return {}
+        keys = {tag: TAG_PREFIX + tag for tag in tags}
+        stored = self.l2.get_many(keys.values())
+        versions = {}
+        for tag, key in keys.items():
+            version = stored.get(key)
+            if version is None:
+                version = new_tag_version()
+                if not self.l2.add(key, version, timeout=None):
+                    version = self.l2.get(key, version)  # lost the race to another writer
+            versions[tag] = version
+        return versions
+
+    def invalidate(self, *tags):
+        """Bump each tag's version (L2) and drop matching entries from this process's L1"""
+        tags = set(tags)
+        if not tags:
+            return
+        self._count("invalidations")
+        with self._lock:
+            for key, (_, entry_tags) in list(self._l1.items()):
+                if tags & entry_tags.keys():
+                    self._l1.pop(key, None)
+        try:
+            for tag in tags:
+                self.l2.set(TAG_PREFIX + tag, new_tag_version(), timeout=None)
+        except Exception:
+            self._l2_failed()
+
+    # ---------------------------------------------------------
+    # READ / WRITE
+    # ---------------------------------------------------------
+
+    def get(self, key, local=True):
+        """Cached value or MISSING; local=False skips L1"""
+        if self.l1_enabled and local:
+            with self._lock:
+                entry = self._l1.get(key)
+            if entry is not None:
+                self._count("l1_hits")
+                return entry[0]
+
+        try:
+            entry = self.l2.get(ENTRY_PREFIX + key)
+            if entry is not None:
+                value, entry_tags = entry
+                if self.tag_versions(entry_tags) == entry_tags:
+                    self._count("l2_hits")
+                    if local:
+                        self._set_l1(key, value, entry_tags)
+                    return value
+        except Exception:
+            self._l2_failed()
+
+        self._count("misses")
+        return MISSING
+
+    def set(self, key, value, timeout=300, tags=(), local=True):
+        try:
+            versions = self.tag_versions(tags)
+            self.l2.set(ENTRY_PREFIX + key, (value, versions), timeout=timeout)
+        except Exception:
+            self._l2_failed()
+            return
+        if local:
+            self._set_l1(key, value, versions)
+
+    def _set_l1(self, key, value, versions):
+        if self.l1_enabled:
+            with self._lock:
+                self._l1[key] = (value, versions)
+
+    def get_or_set(self, key, producer, timeout=300, tags=()):
+        """Cached value, or producer() stored under `tags`. None results are not cached."""
+        value = self.get(key)
+        if value is MISSING:
+            with primary_reads():
+                value = producer()
+            if value is not None:
+                self.set(key, value, timeout, tags)
+        return value
+
+    def clear_local(self):
+        with self._lock:
+            self._l1.clear()
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+            counts["l1_size"] = len(self._l1)
+        hits = counts.get("l1_hits", 0) + counts.get("l2_hits", 0)
+        lookups = hits + counts.get("misses", 0)
+        counts["hit_ratio"] = round(hits / lookups, 4) if lookups else None
+        return counts
+
+    def reset_stats(self):
+        with self._lock:
+            self._counts.clear()
+
+
+_tiered = None
+_tiered_lock = threading.Lock()
+
+
+def get_cache():
+    global _tiered
+    if _tiered is None:
+        with _tiered_lock:
+            if _tiered is None:
+                _tiered = TieredCache(
+                    alias=getattr(settings, "TIERED_CACHE_ALIAS", "default"),
+                    l1_size=getattr(settings, "TIERED_CACHE_L1_SIZE", 1024),
+                    l1_ttl=getattr(settings, "TIERED_CACHE_L1_TTL", 5),
+                )
+    return _tiered
+
+
+def invalidate(*tags):
+    """
+    Invalidate now and again once the surrounding transaction commits, so a
+    reader that cached the pre-commit rows in between doesn't keep them.
+    """
+    tags = [tag for tag in tags if tag]
+    if not tags:
+        return
+    get_cache().invalidate(*tags)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: get_cache().invalidate(*tags))
+
+
+def stats():
+    return get_cache().stats()
+
+
+# ---------------------------------------------------------
+# DRF VIEWS
+# ---------------------------------------------------------
+
+def _request_from(args):
+    for arg in args[:2]:
+        if isinstance(arg, (Request, HttpRequest)):
+            return arg
+    raise TypeError("cached_response needs a view method or function view taking a request")
+
+
+def _plain(data):
+    """Serializer output as plain dicts/lists (ReturnDict/ReturnList keep the serializer alive)"""
+    if isinstance(data, dict):
+        return {key: _plain(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_plain(value) for value in data]
+    return data
+
+
+def response_cache_key(request, name, per_user=False):
+    # host included: paginated responses embed absolute next/previous links
+    path = request.get_host() + request.path + "?" + "&".join(sorted(f"{k}={v}" for k, v in request.GET.lists()))
+    user = f":u{request.user.pk}" if per_user and request.user.is_authenticated else ""
+    return f"view:{name}{user}:" + hashlib.sha1(path.encode()).hexdigest()
+
+
+def cached_response(tags=(), timeout=None, per_user=False):
+    """
+    Cache the data of 200 GET responses. Works on APIView methods and
+    @api_view functions (place it below @api_view). `tags` may use the URL
+    kwargs and {user}, e.g. "freelancer:{pk}" or "company:{user}" (with
+    per_user=True; such entries are kept in L2 only). Responses carry
+    X-Cache: HIT or MISS.
+    """
+    def decorator(view):
+        name = view.__qualname__
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            request = _request_from(args)
+            if request.method != "GET":
+                return view(*args, **kwargs)
+
+            cache = get_cache()
+            key = response_cache_key(request, name, per_user)
+            data = cache.get(key, local=not per_user)
+            if data is not MISSING:
+                response = Response(data)
+                response["X-Cache"] = "HIT"
+                return response
+
+            with primary_reads():
+                response = view(*args, **kwargs)
+            if response.status_code == 200 and getattr(response, "data", None) is not None:
+                cache.set(
+                    key,
+                    _plain(response.data),
+                    timeout if timeout is not None else getattr(settings, "TIERED_CACHE_TIMEOUT", 300),
+                    [tag.format(user=request.user.pk, **kwargs) for tag in tags],
+                    local=not per_user,
+                )
+            response["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+    return decorator
@@ -0,0 +1,99 @@
+# tconnects_backend/db_router.py
+"""
+Read-replica routing.
+
+With REPLICA_DATABASE_URL set, DATABASES gains a "replica" alias
+(DATABASE_REPLICA_ALIAS). ReplicaRoutingMiddleware opens a routing state per
+request; for GET/HEAD/OPTIONS requests to views marked @read_replica it lets
+ReplicaRouter send reads to the replica. Everything else (writes, unmarked
+views, reads inside transaction.atomic, management commands) stays on
+default.
+
+Replication lag: once a request writes, the response sets the
+DATABASE_REPLICA_STICKY_COOKIE for DATABASE_REPLICA_STICKY_SECONDS, and that
+client's reads stay on the primary until it expires, so users see their own
+writes.
+
+Reads whose result outlives the request (filling the shared cache, see
+tconnects_backend/cache.py) run under `primary_reads()`: a lagging replica
+would otherwise store pre-write rows under the freshly invalidated tag
+version for the whole cache timeout, far beyond the sticky window.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class RoutingState:
+    __slots__ = ("use_replica", "wrote")
+
+    def __init__(self):
+        self.use_replica = False
+        self.wrote = False
+
+
+routing_state = ContextVar("db_routing_state", default=None)
+
+
+def replica_alias():
+    return getattr(settings, "DATABASE_REPLICA_ALIAS", None)
+
+
+def sticky_cookie():
+    return getattr(settings, "DATABASE_REPLICA_STICKY_COOKIE", "db_primary")
+
+
+def sticky_seconds():
+    return getattr(settings, "DATABASE_REPLICA_STICKY_SECONDS", 10)
+
+
+def read_replica(view):
+    """Mark an APIView class or view function as safe to serve GETs from the replica"""
+    view.read_replica = True
+    return view
+
+
+@contextmanager
+def primary_reads():
+    """Send the reads in this block to the primary even in a @read_replica view"""
+    state = routing_state.get()
+    if state is None or not state.use_replica:
+        yield
+        return
+    state.use_replica = False
+    try:
+        yield
+    finally:
+        state.use_replica = True
+
+
+def is_read_replica_view(view_func):
+    # as_view() keeps the class on .cls (also for @api_view functions)
+    return getattr(view_func, "read_replica", False) or getattr(getattr(view_func, "cls", None), "read_replica", False)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        state = routing_state.get()
+        if state is None or not state.use_replica or state.wrote:
+            return None
+        alias = replica_alias()
+        if not alias or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        state = routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica holds the same rows as the primary
+        return True
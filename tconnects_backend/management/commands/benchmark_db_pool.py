@@ -0,0 +1,94 @@
+import copy
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import connection, connections
+
+from jobs.models import Job
+
+MODES = ("per-request", "persistent", "pool")
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test request-shaped database access (request_started, a listing query, "
+        "request_finished) with per-request, persistent (CONN_MAX_AGE=600) and pooled connections."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=settings.GUNICORN_THREADS * 2,
+                            help="Concurrent request threads (default: twice GUNICORN_THREADS)")
+        parser.add_argument("--requests", type=int, default=500, help="Requests per thread")
+        parser.add_argument("--pool-size", type=int, default=settings.GUNICORN_THREADS)
+        parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("benchmark_db_pool needs a PostgreSQL default database")
+
+        for mode in options["modes"]:
+            alias = self.configure(mode, options["pool_size"])
+            try:
+                latencies, elapsed = self.run(alias, options["threads"], options["requests"])
+                stats = connections[alias].pool.get_stats() if mode == "pool" else {}
+            finally:
+                if mode == "pool":
+                    connections[alias].close_pool()
+
+            p50, p99 = self.percentiles(latencies)
+            line = f"{mode:>11}: {len(latencies) / elapsed:8.0f} req/s, p50 {p50:6.2f} ms, p99 {p99:6.2f} ms"
+            if stats:
+                line += (
+                    f", waited {stats.get('requests_waiting', 0)} now / "
+                    f"{stats.get('requests_wait_ms', 0)} ms total, connections made {stats.get('connections_num', 0)}"
+                )
+            self.stdout.write(line)
+
+    def configure(self, mode, pool_size):
+        alias = f"benchmark_{mode.replace('-', '_')}"
+        settings_dict = copy.deepcopy(connections.settings["default"])
+        settings_dict["OPTIONS"].pop("pool", None)
+        settings_dict["CONN_MAX_AGE"] = 600 if mode == "persistent" else 0
+        settings_dict["CONN_HEALTH_CHECKS"] = True
+        if mode == "pool":
+            settings_dict["OPTIONS"]["pool"] = {"min_size": pool_size, "max_size": pool_size, "timeout": 30}
+        connections.settings[alias] = settings_dict
+        return alias
+
+    def run(self, alias, thread_count, requests):
+        latencies = []
+        lock = threading.Lock()
+        start = threading.Barrier(thread_count + 1)
+
+        def worker():
+            own = []
+            start.wait()
+            try:
+                for _ in range(requests):
+                    began = time.perf_counter()
+                    request_started.send(sender=self.__class__, environ={})
+                    list(Job.objects.using(alias).filter(is_active=True).order_by("-created_at")[:20])
+                    request_finished.send(sender=self.__class__)
+                    own.append((time.perf_counter() - began) * 1000)
+            finally:
+                connections[alias].close()
+            with lock:
+                latencies.extend(own)
+
+        threads = [threading.Thread(target=worker) for _ in range(thread_count)]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        began = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        return latencies, time.perf_counter() - began
+
+    @staticmethod
+    def percentiles(latencies):
+        cuts = statistics.quantiles(latencies, n=100)
+        return cuts[49], cuts[98]
@@ -0,0 +1,69 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+class PingView(APIView):
+    authentication_classes = []
+
+    def get(self, request):
+        return Response({"ok": True})
+
+
+urlpatterns = [path("api/ping/", PingView.as_view())]
+
+# the stack as it was before SessionRoutingMiddleware
+FULL_MIDDLEWARE = [
+    "corsheaders.middleware.CorsMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "allauth.account.middleware.AccountMiddleware",
+]
+
+
+class Command(BaseCommand):
+    help = "Measure per-request middleware overhead on an /api/ route with the full and the path-routed stack."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        count = options["requests"]
+
+        # browsers send the admin's session cookie to the API host too
+        with transaction.atomic():
+            session = SessionStore()
+            session["benchmark"] = True
+            session.create()
+
+            def run(middleware):
+                with override_settings(MIDDLEWARE=middleware, ROOT_URLCONF=__name__, ALLOWED_HOSTS=["*"]):
+                    client = Client()
+                    client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+                    client.get("/api/ping/")  # builds the middleware chain
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        for _ in range(count):
+                            response = client.get("/api/ping/")
+                            assert response.status_code == 200, response.status_code
+                        elapsed = time.perf_counter() - started
+                return elapsed / count * 1e6, len(queries) / count
+
+            for label, middleware in (("full", FULL_MIDDLEWARE), ("routed", settings.MIDDLEWARE)):
+                micros, per_request = run(middleware)
+                self.stdout.write(f"{label:>6}: {micros:7.1f} µs/request, {per_request:.2f} queries/request")
+
+            transaction.set_rollback(True)
@@ -0,0 +1,103 @@
+# tconnects_backend/middleware.py
+"""
+Path-routed session middleware, and per-request read-replica routing
+(ReplicaRoutingMiddleware; see db_router.py).
+
+The /api/ routes authenticate with JWT cookies only (CookieJWTAuthentication),
+so they have no use for the session, auth, messages, clickjacking and allauth
+middleware. SessionRoutingMiddleware builds that stack (SESSION_MIDDLEWARE)
+around the rest of the chain and runs it only for paths under
+SESSION_MIDDLEWARE_PATHS (the admin and allauth); every other request goes
+straight on, without parsing the session cookie or touching the session store.
+"""
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.utils.module_loading import import_string
+
+from accounts.cookies import cookie_options
+
+from . import db_router
+
+
+class SessionRoutingMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefixes = tuple(getattr(settings, "SESSION_MIDDLEWARE_PATHS", ("/admin/",)))
+
+        # same wrapping as BaseHandler.load_middleware
+        self.view_middleware = []
+        self.exception_middleware = []
+        handler = convert_exception_to_response(get_response)
+        for path in reversed(getattr(settings, "SESSION_MIDDLEWARE", [])):
+            instance = import_string(path)(handler)
+            if hasattr(instance, "process_view"):
+                self.view_middleware.insert(0, instance.process_view)
+            if hasattr(instance, "process_exception"):
+                self.exception_middleware.append(instance.process_exception)
+            handler = convert_exception_to_response(instance)
+        self.session_handler = handler
+
+    def uses_session(self, request):
+        return request.path_info.startswith(self.prefixes)
+
+    def __call__(self, request):
+        if self.uses_session(request):
+            return self.session_handler(request)
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.uses_session(request):
+            for method in self.view_middleware:
+                response = method(request, view_func, view_args, view_kwargs)
+                if response is not None:
+                    return response
+        return None
+
+    def process_exception(self, request, exception):
+        if self.uses_session(request):
+            for method in self.exception_middleware:
+                response = method(request, exception)
+                if response is not None:
+                    return response
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Lets @read_replica views read from the replica; pins writers to the primary for a while"""
+
+    def __init__(self, get_response):
+        if not db_router.replica_alias():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = db_router.RoutingState()
+        token = db_router.routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            db_router.routing_state.reset(token)
+
+        if state.wrote:
+            response.set_cookie(
+                db_router.sticky_cookie(),
+                "1",
+                max_age=db_router.sticky_seconds(),
+                httponly=True,
+                **cookie_options()
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = db_router.routing_state.get()
+        if (
+            state is not None
+            and request.method in db_router.SAFE_METHODS
+            and db_router.sticky_cookie() not in request.COOKIES
+            and db_router.is_read_replica_view(view_func)
+        ):
+            state.use_replica = True
+        return None
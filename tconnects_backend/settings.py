@@ -31,7 +31,8 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'allauth',
-    'allauth.account',
+    'tconnects_backend.apps.AllauthAccountConfig',  # allauth.account, see SESSION_MIDDLEWARE
+    'tconnects_backend.apps.TconnectsBackendConfig',  # project-wide management commands
     'allauth.socialaccount',
     'allauth.socialaccount.providers.google',
 
@@ -80,15 +81,27 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'tconnects_backend.middleware.ReplicaRoutingMiddleware',
     # CSRF DISABLED for API-only backend
     # 'django.middleware.csrf.CsrfViewMiddleware',
+    'accounts.middleware.TokenRefreshMiddleware',
+    'tconnects_backend.middleware.SessionRoutingMiddleware',
+]
+
+# Run only for SESSION_MIDDLEWARE_PATHS (tconnects_backend/middleware.py);
+# the /api/ routes use JWT cookies and skip the session lookup entirely.
+SESSION_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
 ]
+SESSION_MIDDLEWARE_PATHS = ['/admin/', '/accounts/']
+
+# The admin checks look for these in MIDDLEWARE; they run via SESSION_MIDDLEWARE
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
 
 if DEBUG:
     print("="*60)
@@ -247,14 +260,102 @@ if DEBUG:
 # DATABASE
 # ===========================
 
+# Gunicorn sizing, shared with gunicorn.conf.py: each worker process has its
+# own connection pool, so the app holds at most
+# WEB_CONCURRENCY x DB_POOL_MAX_SIZE connections (keep under max_connections).
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', default=2, cast=int)
+GUNICORN_THREADS = config('GUNICORN_THREADS', default=4, cast=int)
+
+# DB_POOL=True uses Django's psycopg 3 connection pool instead of one
+# persistent connection per thread (CONN_MAX_AGE must then be 0).
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+
 DATABASES = {
     'default': dj_database_url.config(
         default=config('DATABASE_URL'),
-        conn_max_age=600,
+        conn_max_age=0 if DB_POOL else 600,
+        conn_health_checks=True,
         ssl_require=True
     )
 }
 
+
+# Threads besides the request threads that check out a pooled connection:
+# the outbox sender (accounts/outbox.py), the blacklist filter rebuild
+# (accounts/tokens.py) and the watch-time flusher (courses/watchtime.py)
+DB_POOL_BACKGROUND_THREADS = 3
+
+
+def db_pool_options():
+    # CONN_HEALTH_CHECKS makes Django check each connection on checkout, so a
+    # failover's dead connections are replaced instead of handed out
+    return {
+        'min_size': config('DB_POOL_MIN_SIZE', default=1, cast=int),
+        # one connection per request thread plus the background threads, so
+        # a burst of background work never makes requests wait for a connection
+        'max_size': config('DB_POOL_MAX_SIZE', default=GUNICORN_THREADS + DB_POOL_BACKGROUND_THREADS, cast=int),
+        # seconds a request waits for a free connection before erroring
+        'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+        'max_idle': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+        'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=1800, cast=float),
+    }
+
+
+if DB_POOL:
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = db_pool_options()
+
+# Optional read replica (tconnects_backend/db_router.py): GETs to @read_replica
+# views read from it; clients that just wrote stay on the primary for
+# DATABASE_REPLICA_STICKY_SECONDS. Locally, two SQLite files work, e.g.
+# REPLICA_DATABASE_URL=sqlite:///replica.sqlite3
+REPLICA_DATABASE_URL = config('REPLICA_DATABASE_URL', default='')
+DATABASE_REPLICA_ALIAS = None
+if REPLICA_DATABASE_URL:
+    DATABASE_REPLICA_ALIAS = 'replica'
+    DATABASES[DATABASE_REPLICA_ALIAS] = dj_database_url.parse(
+        REPLICA_DATABASE_URL,
+        conn_max_age=0 if DB_POOL else 600,
+        conn_health_checks=True,
+        ssl_require=not REPLICA_DATABASE_URL.startswith('sqlite'),
+    )
+    if DB_POOL and not REPLICA_DATABASE_URL.startswith('sqlite'):
+        DATABASES[DATABASE_REPLICA_ALIAS].setdefault('OPTIONS', {})['pool'] = db_pool_options()
+    # tests run against one database; the replica alias reads the same one
+    DATABASES[DATABASE_REPLICA_ALIAS]['TEST'] = {'MIRROR': 'default'}
+DATABASE_ROUTERS = ['tconnects_backend.db_router.ReplicaRouter']
+DATABASE_REPLICA_STICKY_SECONDS = config('DATABASE_REPLICA_STICKY_SECONDS', default=10, cast=int)
+
+# ===========================
+# CACHES
+# ===========================
+# Shared cache: Redis when REDIS_URL is set, else a per-process LocMemCache
+# stand-in (fine for one worker / development).
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'tconnects',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'tconnects',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+# Two-tier cache (tconnects_backend/cache.py): per-process LRU in front of
+# TIERED_CACHE_ALIAS. L1 entries live at most L1_TTL seconds, which bounds how
+# long another worker can serve an entry invalidated elsewhere.
+TIERED_CACHE_ALIAS = config('TIERED_CACHE_ALIAS', default='default')
+TIERED_CACHE_L1_SIZE = config('TIERED_CACHE_L1_SIZE', default=1024, cast=int)
+TIERED_CACHE_L1_TTL = config('TIERED_CACHE_L1_TTL', default=5, cast=int)
+TIERED_CACHE_TIMEOUT = config('TIERED_CACHE_TIMEOUT', default=300, cast=int)
+
 # ===========================
 # EMAIL SETTINGS
 # ===========================
@@ -268,6 +369,15 @@ EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default=EMAIL_HOST_USER)
 EMAIL_TIMEOUT = 30
 
+# Unused OTP codes kept per email; issuing another drops the oldest (accounts/utils.py)
+OTP_MAX_OUTSTANDING = config('OTP_MAX_OUTSTANDING', default=5, cast=int)
+
+# Email outbox (accounts/outbox.py, delivered by `manage.py send_outbox --loop`)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+EMAIL_OUTBOX_BACKOFF = config('EMAIL_OUTBOX_BACKOFF', default=30, cast=int)  # seconds, doubled per attempt
+EMAIL_OUTBOX_BACKOFF_MAX = config('EMAIL_OUTBOX_BACKOFF_MAX', default=3600, cast=int)
+EMAIL_OUTBOX_LEASE = config('EMAIL_OUTBOX_LEASE', default=300, cast=int)
+
 if DEBUG:
     print("="*60)
     print("📧 EMAIL CONFIGURATION:")
@@ -288,6 +398,20 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.AllowAny",
     ],
     "EXCEPTION_HANDLER": "rest_framework.views.exception_handler",
+    # proxies in front of the app (Render's load balancer: 1); the client IP for rate
+    # limiting is the address that many hops back in X-Forwarded-For. 0 uses REMOTE_ADDR.
+    "NUM_PROXIES": config('NUM_PROXIES', default=1, cast=int),
+}
+
+# Sliding-window rate limits per view scope (accounts/throttling.py).
+# Keys: "ip", "email" (request body) or "user"; rates like "10/m" or "5/15m".
+RATELIMIT_ENABLED = config('RATELIMIT_ENABLED', default=True, cast=bool)
+RATELIMIT_CACHE = config('RATELIMIT_CACHE', default='default')
+RATELIMIT_POLICIES = {
+    "login": {"ip": "30/10m", "email": "10/10m"},
+    "otp_send": {"ip": "20/h", "email": "5/15m"},
+    "otp_verify": {"ip": "30/10m", "email": "10/10m"},
+    "apply": {"ip": "60/h", "user": "30/h"},
 }
 
 # JWT CONFIG - Enhanced for Safari
@@ -313,6 +437,30 @@ SIMPLE_JWT = {
     'AUTH_COOKIE_PATH': '/',
     'AUTH_COOKIE_SAMESITE': 'None' if not DEBUG else 'Lax',
 }
+# Per-process bloom filter of blacklisted refresh-token JTIs (accounts/tokens.py);
+# the capacity is a floor, each rebuild sizes the filter for twice the live rows
+TOKEN_BLACKLIST_BLOOM_CAPACITY = config('TOKEN_BLACKLIST_BLOOM_CAPACITY', default=100000, cast=int)
+TOKEN_BLACKLIST_SYNC_INTERVAL = config('TOKEN_BLACKLIST_SYNC_INTERVAL', default=5, cast=int)
+TOKEN_BLACKLIST_REBUILD_INTERVAL = config('TOKEN_BLACKLIST_REBUILD_INTERVAL', default=3600, cast=int)
+
+# Google sign-in (accounts/google.py): certs are cached per Cache-Control and
+# refreshed in the background this many seconds before they expire
+GOOGLE_CLIENT_ID = config('GOOGLE_CLIENT_ID', default='')
+GOOGLE_CERTS_URL = config('GOOGLE_CERTS_URL', default='https://www.googleapis.com/oauth2/v1/certs')
+GOOGLE_CERTS_REFRESH_MARGIN = config('GOOGLE_CERTS_REFRESH_MARGIN', default=300, cast=int)
+
+# Refresh an expired access cookie in-line when a valid refresh cookie is sent
+# (accounts/middleware.py); the new pair is reused for this many seconds by
+# the concurrent requests that carried the same refresh token, which also lets
+# the old token be replayed for that long (accounts/tokens.py). Sharing the
+# pair across workers needs the Redis cache (REDIS_URL).
+AUTH_COOKIE_AUTO_REFRESH = config('AUTH_COOKIE_AUTO_REFRESH', default=True, cast=bool)
+AUTH_COOKIE_REFRESH_GRACE = config('AUTH_COOKIE_REFRESH_GRACE', default=10, cast=int)
+
+# Per-process cache of authenticated users (accounts/authentication.py); size 0 disables
+AUTH_USER_CACHE_SIZE = config('AUTH_USER_CACHE_SIZE', default=1024, cast=int)
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=60, cast=int)
+
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
 USE_I18N = True
@@ -325,4 +473,32 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Chunked resume uploads (profiles/uploads.py)
+RESUME_MAX_UPLOAD_SIZE = config('RESUME_MAX_UPLOAD_SIZE', default=10 * 1024 * 1024, cast=int)
+RESUME_UPLOAD_CHUNK_SIZE = config('RESUME_UPLOAD_CHUNK_SIZE', default=1024 * 1024, cast=int)
+RESUME_UPLOAD_EXPIRY = config('RESUME_UPLOAD_EXPIRY', default=24 * 60 * 60, cast=int)  # seconds; see sweep_resume_uploads
+
+# Public company page (profiles/company_page.py)
+COMPANY_PAGE_LATEST_POSTINGS = config('COMPANY_PAGE_LATEST_POSTINGS', default=5, cast=int)
+COMPANY_PAGE_CACHE_TIMEOUT = config('COMPANY_PAGE_CACHE_TIMEOUT', default=300, cast=int)
+
+# Course outline cache (courses/outline.py); entries are keyed by content version
+COURSE_OUTLINE_CACHE_TIMEOUT = config('COURSE_OUTLINE_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Course funnel rollups (courses/funnel.py): assignment score counted as a pass
+COURSE_ASSIGNMENT_PASS_SCORE = config('COURSE_ASSIGNMENT_PASS_SCORE', default=60.0, cast=float)
+
+# Completion certificates (courses/certificates.py, rendered by `manage.py render_certificates`);
+# empty template/font paths use a built-in layout and Pillow's default font
+CERTIFICATE_TEMPLATE = config('CERTIFICATE_TEMPLATE', default='')
+CERTIFICATE_FONT = config('CERTIFICATE_FONT', default='')
+CERTIFICATE_MAX_ATTEMPTS = config('CERTIFICATE_MAX_ATTEMPTS', default=3, cast=int)
+CERTIFICATE_RENDER_TIMEOUT = config('CERTIFICATE_RENDER_TIMEOUT', default=300, cast=int)
+
+# Buffered video watch time (courses/watchtime.py); ratio 0 disables auto-completion
+WATCH_TIME_FLUSH_INTERVAL = config('WATCH_TIME_FLUSH_INTERVAL', default=30, cast=int)
+WATCH_TIME_FLUSH_MAX_KEYS = config('WATCH_TIME_FLUSH_MAX_KEYS', default=1000, cast=int)
+WATCH_TIME_MAX_HEARTBEAT_SECONDS = config('WATCH_TIME_MAX_HEARTBEAT_SECONDS', default=60, cast=int)
+WATCH_TIME_COMPLETE_RATIO = config('WATCH_TIME_COMPLETE_RATIO', default=0.9, cast=float)
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
\ No newline at end of file
@@ -0,0 +1,50 @@
+import os
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from tconnects_backend import settings as project_settings
+
+
+class DbPoolSettingsTests(SimpleTestCase):
+
+    def test_pool_leaves_room_for_background_threads(self):
+        options = project_settings.db_pool_options()
+        self.assertEqual(
+            options["max_size"],
+            project_settings.GUNICORN_THREADS + project_settings.DB_POOL_BACKGROUND_THREADS,
+        )
+        self.assertLessEqual(options["min_size"], options["max_size"])
+
+    def test_pool_options_follow_the_environment(self):
+        with mock.patch.dict(os.environ, {"DB_POOL_MAX_SIZE": "20", "DB_POOL_TIMEOUT": "2.5"}):
+            options = project_settings.db_pool_options()
+        self.assertEqual((options["max_size"], options["timeout"]), (20, 2.5))
+
+
+class DbPoolStatsViewTests(TestCase):
+    url = "/api/db/pool-stats/"
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_admins_only(self):
+        self.assertIn(self.client.get(self.url).status_code, (401, 403))
+        user = User.objects.create_user(email="member@example.com", full_name="Member")
+        self.client.force_authenticate(user)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_reports_each_pooled_alias(self):
+        admin = User.objects.create_user(email="staff@example.com", full_name="Staff", is_staff=True)
+        self.client.force_authenticate(admin)
+        pooled = SimpleNamespace(pool=mock.Mock(get_stats=lambda: {"pool_size": 4, "requests_waiting": 0}))
+        unpooled = SimpleNamespace()
+
+        with mock.patch("tconnects_backend.views.connections", {"default": pooled, "replica": unpooled}):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"default": {"pool_size": 4, "requests_waiting": 0}})
@@ -19,6 +19,8 @@ from django.urls import path,include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from .views import cache_stats_view, db_pool_stats_view
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -29,6 +31,8 @@ urlpatterns = [
     path("api/applications/", include("applications.urls")),
     path("api/courses/", include("courses.urls")),
     path("api/mock-interview/", include("mockinterview.urls")),
+    path("api/cache/stats/", cache_stats_view, name="cache-stats"),
+    path("api/db/pool-stats/", db_pool_stats_view, name="db-pool-stats"),
     
 
 
@@ -0,0 +1,25 @@
+from django.db import connections
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from .cache import stats
+
+
+# GET /api/cache/stats/ — two-tier cache counters of the worker serving the request
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def cache_stats_view(request):
+    return Response(stats())
+
+
+# GET /api/db/pool-stats/ — psycopg pool counters (waits, usage, sizes) of the worker serving the request
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def db_pool_stats_view(request):
+    stats = {}
+    for alias in connections:
+        pool = getattr(connections[alias], "pool", None)
+        if pool is not None:
+            stats[alias] = pool.get_stats()
+    return Response(stats)